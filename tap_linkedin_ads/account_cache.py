@@ -0,0 +1,48 @@
+"""File-backed cache of the ad account list shared between tap runs."""
+
+from __future__ import annotations
+
+import time
+
+from tap_linkedin_ads.file_cache import JsonFileCache
+
+
+class AccountCache(JsonFileCache):
+    """Ad accounts stored in a local JSON file, keyed by credentials."""
+
+    def __init__(self, path: str, ttl: float) -> None:
+        """Initialize the cache.
+
+        Args:
+            path: The path of the cache file.
+            ttl: Seconds during which a cached account list is used.
+        """
+        super().__init__(path)
+        self.ttl = ttl
+
+    def get(self, key: str) -> list[dict] | None:
+        """Return the cached accounts for a key, unless they expired.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The accounts as returned by the API, or None.
+        """
+        with self.locked():
+            entry = self._read().get(key)
+        if entry is None or time.time() - entry["fetched_at"] > self.ttl:
+            return None
+        return entry["accounts"]
+
+    def set(self, key: str, accounts: list[dict]) -> None:
+        """Store the accounts, atomically replacing the cache file.
+
+        Args:
+            key: The cache key.
+            accounts: The accounts as returned by the API.
+        """
+        with self.locked():
+            entries = self._read()
+            entries[key] = {"fetched_at": time.time(), "accounts": accounts}
+            self._write(entries)
@@ -2,14 +2,36 @@
 
 from __future__ import annotations
 
+import threading
+import typing as t
+from datetime import datetime, timedelta, timezone
+
 from singer_sdk.authenticators import OAuthAuthenticator, SingletonMeta
 
+from tap_linkedin_ads.token_cache import TokenCache
+
+# Tokens are refreshed this long before they expire, or after 90% of their
+# lifetime for short-lived tokens.
+TOKEN_REFRESH_MARGIN = timedelta(minutes=10)
+
 
 # The SingletonMeta metaclass makes your streams reuse the same authenticator instance.
 # If this behaviour interferes with your use-case, you can remove the metaclass.
 class LinkedInAdsOAuthAuthenticator(OAuthAuthenticator, metaclass=SingletonMeta):
     """Authenticator class for LinkedInAds."""
 
+    def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
+        """Create a new authenticator.
+
+        Args:
+            *args: Positional arguments for the OAuth authenticator.
+            **kwargs: Keyword arguments for the OAuth authenticator.
+        """
+        super().__init__(*args, **kwargs)
+        self._token_lock = threading.Lock()
+        cache_path = self.config.get("oauth_token_cache_path")
+        self._token_cache = TokenCache(cache_path) if cache_path else None
+
     @property
     def oauth_request_body(self) -> dict:
         """Define the OAuth request body for the AutomaticTestTap API.
@@ -24,6 +46,77 @@ class LinkedInAdsOAuthAuthenticator(OAuthAuthenticator, metaclass=SingletonMeta)
             "refresh_token": self.config["oauth_credentials"]["refresh_token"],
         }
 
+    def is_token_valid(self) -> bool:
+        """Check if the token is valid, treating soon-to-expire tokens as stale.
+
+        Returns:
+            True if the token is valid (fresh).
+        """
+        if self.last_refreshed is None:
+            return False
+        if not self.expires_in:
+            return True
+        lifetime = timedelta(seconds=self.expires_in)
+        margin = min(TOKEN_REFRESH_MARGIN, lifetime / 10)
+        now = datetime.now(tz=timezone.utc)
+        return now < self.last_refreshed + lifetime - margin
+
+    def update_access_token(self) -> None:
+        """Update the access token, reusing a cached token when still valid.
+
+        With `oauth_token_cache_path` set, the token is shared through a locked
+        file, so concurrent runs refresh it only once.
+        """
+        with self._token_lock:
+            if self.is_token_valid():
+                # Another thread refreshed the token while we waited
+                return
+            if self._token_cache is None:
+                super().update_access_token()
+                return
+
+            credentials = self.config["oauth_credentials"]
+            key = TokenCache.cache_key(
+                credentials["client_id"],
+                credentials["refresh_token"],
+            )
+            with self._token_cache.locked():
+                cached = self._token_cache.get(key)
+                if cached and self._use_cached_token(cached):
+                    self.logger.info("Reusing cached OAuth access token.")
+                    return
+                super().update_access_token()
+                issued_at = self.last_refreshed.timestamp()
+                expires_at = issued_at + self.expires_in if self.expires_in else None
+                self._token_cache.set(key, self.access_token, issued_at, expires_at)
+
+    def _use_cached_token(self, cached: dict) -> bool:
+        """Load a cached token if it is still valid.
+
+        The token keeps the time it was issued at and its full lifetime, so it
+        is refreshed as early as a token requested by this run.
+
+        Args:
+            cached: The cache entry.
+
+        Returns:
+            True if the cached token was loaded.
+        """
+        issued_at = cached.get("issued_at")
+        expires_at = cached.get("expires_at")
+        if issued_at is None:
+            # Entries written before the issue time was kept
+            return False
+        self.access_token = cached["access_token"]
+        self.last_refreshed = datetime.fromtimestamp(issued_at, tz=timezone.utc)
+        self.expires_in = (
+            round(expires_at - issued_at) if expires_at is not None else None
+        )
+        if self.is_token_valid():
+            return True
+        self.last_refreshed = None
+        return False
+
     @classmethod
     def create_for_stream(cls, stream) -> LinkedInAdsOAuthAuthenticator:  # noqa: ANN001
         """Instantiate an authenticator for a specific Singer stream.
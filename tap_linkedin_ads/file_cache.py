@@ -0,0 +1,101 @@
+"""Locked JSON file caches shared between tap runs."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import typing as t
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+
+class JsonFileCache:
+    """Entries stored in a local JSON file, keyed by a hash of credentials.
+
+    Reads and writes hold a thread lock and, where supported, an exclusive lock
+    on a sidecar `.lock` file, so concurrent runs and worker threads see a
+    consistent cache. Credentials are only stored as a hash.
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        """Initialize the cache.
+
+        Args:
+            path: The path of the cache file.
+        """
+        self.path = Path(path).expanduser()
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+
+    @staticmethod
+    def cache_key(*credentials: str) -> str:
+        """Return the cache key for a set of credentials.
+
+        Args:
+            *credentials: Values identifying the entry, e.g. client ID and
+                refresh token.
+
+        Returns:
+            A hex digest of the credentials.
+        """
+        return hashlib.sha256("\0".join(credentials).encode()).hexdigest()
+
+    @contextlib.contextmanager
+    def locked(self) -> t.Iterator[None]:
+        """Hold the cache lock across threads and processes.
+
+        Yields:
+            None, while the lock is held.
+        """
+        with self._thread_lock:
+            if self._depth:
+                # The file lock is already held by this thread
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            lock_path = self.path.with_name(f"{self.path.name}.lock")
+            with lock_path.open("a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._depth = 1
+                try:
+                    yield
+                finally:
+                    self._depth = 0
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self) -> dict[str, dict]:
+        try:
+            return json.loads(self.path.read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write(self, entries: dict[str, dict]) -> None:
+        """Atomically replace the cache file, while holding the lock.
+
+        Args:
+            entries: All cache entries.
+        """
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}"
+        )
+        try:
+            with os.fdopen(fd, "w") as tmp_file:
+                json.dump(entries, tmp_file)
+            Path(tmp_path).replace(self.path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
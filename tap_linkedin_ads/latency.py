@@ -0,0 +1,259 @@
+"""Latency tracking, adaptive timeouts and hedged requests."""
+
+from __future__ import annotations
+
+import contextvars
+import math
+import queue
+import threading
+import time
+import typing as t
+from collections import defaultdict, deque
+
+import requests
+
+# Latencies kept per endpoint
+WINDOW_SIZE = 256
+# Samples needed before percentiles are trusted
+MIN_SAMPLES = 20
+# Adaptive timeouts are this multiple of the p99 latency, within the bounds below
+TIMEOUT_FACTOR = 5
+MIN_TIMEOUT = 30.0
+
+T = t.TypeVar("T")
+
+
+class LatencyTracker:
+    """Rolling latencies of each endpoint, shared by all streams of a run."""
+
+    def __init__(self, max_hedges: int = 4) -> None:
+        """Initialize the tracker.
+
+        Args:
+            max_hedges: Maximum number of hedged requests in flight, including
+                the ones that lost their race and are still running.
+        """
+        self.sent = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=WINDOW_SIZE),
+        )
+        self._hedge_slots = threading.BoundedSemaphore(max_hedges)
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        """Record the latency of a request.
+
+        Args:
+            endpoint: The endpoint path.
+            seconds: The request duration.
+        """
+        with self._lock:
+            self.sent += 1
+            self._samples[endpoint].append(seconds)
+
+    def percentile(self, endpoint: str, q: float) -> float | None:
+        """Return a latency percentile of an endpoint.
+
+        Args:
+            endpoint: The endpoint path.
+            q: The percentile, between 0 and 1.
+
+        Returns:
+            The latency in seconds, or None until enough requests were seen.
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint, ()))
+        if len(samples) < MIN_SAMPLES:
+            return None
+        rank = max(math.ceil(q * len(samples)) - 1, 0)
+        return samples[rank]
+
+    def mean(self, endpoint: str | None = None) -> float | None:
+        """Return the mean latency of an endpoint, or of all endpoints.
+
+        Args:
+            endpoint: The endpoint path, or None for all endpoints.
+
+        Returns:
+            The latency in seconds, or None if no request was seen.
+        """
+        with self._lock:
+            if endpoint is None:
+                samples = [s for window in self._samples.values() for s in window]
+            else:
+                samples = list(self._samples.get(endpoint, ()))
+        return sum(samples) / len(samples) if samples else None
+
+    def timeout(self, endpoint: str, default: float) -> float:
+        """Return the timeout of the next request to an endpoint.
+
+        Args:
+            endpoint: The endpoint path.
+            default: The timeout used until enough requests were seen, and the
+                upper bound of adaptive timeouts.
+
+        Returns:
+            The timeout in seconds.
+        """
+        p99 = self.percentile(endpoint, 0.99)
+        if p99 is None:
+            return default
+        return min(max(p99 * TIMEOUT_FACTOR, MIN_TIMEOUT), default)
+
+    def hedge(
+        self,
+        primary: t.Callable[[], T],
+        backup: t.Callable[[], T],
+        delay: float,
+    ) -> T:
+        """Run `primary`, starting `backup` if it is still running after `delay`.
+
+        The first call to succeed wins, and the other one is left to finish in
+        its own thread with its result discarded. A call cannot be abandoned by
+        the thread running it, so both calls run in their own threads, never
+        queued behind the losers of earlier races. Once `max_hedges` hedged
+        calls are in flight, `primary` runs on the calling thread unhedged.
+
+        Args:
+            primary: The call.
+            backup: An identical call, sent as the hedge.
+            delay: Seconds to wait for the primary call before hedging.
+
+        Returns:
+            The result of the first call to succeed.
+
+        Raises:
+            BaseException: The error of the primary call, once both calls failed.
+        """
+        if not self._hedge_slots.acquire(blocking=False):
+            return primary()
+
+        race = _Race(self._hedge_slots.release)
+        try:
+            race.start("primary", primary)
+            outcome = race.first(timeout=delay)
+            if outcome is None:
+                with self._lock:
+                    self.hedges += 1
+                race.start("backup", backup)
+        finally:
+            race.close()
+        if outcome is None:
+            outcome = race.first()
+            if outcome.error is not None:
+                # Errors only win once both calls failed, then the primary's
+                other = race.first()
+                if other.error is None or outcome.name == "backup":
+                    outcome = other
+        if outcome.error is not None:
+            raise outcome.error
+        if outcome.name == "backup":
+            with self._lock:
+                self.hedge_wins += 1
+        return outcome.result
+
+
+class _Outcome(t.NamedTuple):
+    name: str
+    result: t.Any
+    error: BaseException | None
+
+
+class _Race:
+    """Calls run in their own threads, reporting their outcome in turn."""
+
+    def __init__(self, on_done: t.Callable[[], None]) -> None:
+        """Initialize the race.
+
+        Args:
+            on_done: Called once, when the race is closed and every call started
+                has completed.
+        """
+        self._outcomes: queue.SimpleQueue[_Outcome] = queue.SimpleQueue()
+        # The calls running, and the race itself until it is closed
+        self._running = 1
+        self._lock = threading.Lock()
+        self._on_done = on_done
+
+    def start(self, name: str, call: t.Callable[[], t.Any]) -> None:
+        """Start a call, with a copy of the current context.
+
+        Args:
+            name: The name of the call.
+            call: The call.
+        """
+        with self._lock:
+            self._running += 1
+        threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(self._run, name, call),
+            name=f"hedge-{name}",
+            daemon=True,
+        ).start()
+
+    def first(self, timeout: float | None = None) -> _Outcome | None:
+        """Return the next outcome, or None if no call completed in time.
+
+        Args:
+            timeout: Seconds to wait, or None to wait until a call completes.
+
+        Returns:
+            The outcome of the next call to complete.
+        """
+        try:
+            return self._outcomes.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        """Stop starting calls, so the race is done once the started ones are."""
+        self._finish()
+
+    def _run(self, name: str, call: t.Callable[[], t.Any]) -> None:
+        try:
+            self._outcomes.put(_Outcome(name, call(), None))
+        except BaseException as exc:  # noqa: BLE001
+            self._outcomes.put(_Outcome(name, None, exc))
+        finally:
+            self._finish()
+
+    def _finish(self) -> None:
+        with self._lock:
+            self._running -= 1
+            done = not self._running
+        if done:
+            self._on_done()
+
+
+def timed_send(
+    tracker: LatencyTracker,
+    endpoint: str,
+    session: requests.Session,
+    prepared_request: requests.PreparedRequest,
+    **kwargs: t.Any,
+) -> requests.Response:
+    """Send a request, recording its latency.
+
+    Timed out requests count with their full timeout, so that timeouts which
+    are too short grow back.
+
+    Args:
+        tracker: The latency tracker.
+        endpoint: The endpoint path.
+        session: The HTTP session.
+        prepared_request: The prepared request.
+        **kwargs: Arguments of `Session.send`, including `timeout`.
+
+    Returns:
+        The HTTP response.
+    """
+    start = time.perf_counter()
+    try:
+        response = session.send(prepared_request, **kwargs)
+    except requests.exceptions.Timeout:
+        tracker.record(endpoint, kwargs.get("timeout") or 0)
+        raise
+    tracker.record(endpoint, time.perf_counter() - start)
+    return response
@@ -0,0 +1,201 @@
+"""Opt-in memory instrumentation of stream partitions."""
+
+from __future__ import annotations
+
+import contextlib
+import itertools
+import json
+import sys
+import threading
+import tracemalloc
+import typing as t
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
+if t.TYPE_CHECKING:
+    import os
+
+    from singer_sdk.helpers.types import Context
+
+# Frames kept per traced allocation
+TRACEBACK_FRAMES = 1
+
+# Allocations of the instrumentation itself, left out of the top sites
+_IGNORED_FILES = (
+    tracemalloc.__file__,
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    "<unknown>",
+)
+
+
+def rss_bytes() -> int | None:
+    """Return the resident set size of the process, where available."""
+    try:
+        pages = Path("/proc/self/statm").read_text().split()[1]
+    except (OSError, IndexError):
+        return None
+    return int(pages) * resource.getpagesize() if resource else None
+
+
+def peak_rss_bytes() -> int | None:
+    """Return the peak resident set size of the process, where available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Usage:
+    """The memory traced within a block, filled in when the block exits."""
+
+    __slots__ = ("allocated", "peak", "start")
+
+    def __init__(self, start: int) -> None:
+        """Initialize the usage.
+
+        Args:
+            start: The traced memory when the block started, in bytes.
+        """
+        self.start = start
+        # Highest traced memory within the block, in bytes
+        self.peak = start
+        # Traced memory left allocated by the block, in bytes
+        self.allocated = 0
+
+
+class MemoryProfiler:
+    """Peak and live memory of each stream partition, written to a report.
+
+    Allocations are traced with `tracemalloc`, which slows the sync down and
+    adds its own memory overhead. At the end of each partition, a JSON line is
+    appended to the report with the process RSS and peak RSS, the peak traced
+    memory during the partition, including its child partitions, and the top
+    allocation sites still holding memory. A last line summarizes the peaks of
+    each stream.
+    """
+
+    def __init__(self, path: str | os.PathLike, top: int = 10) -> None:
+        """Initialize the profiler.
+
+        Args:
+            path: The path of the report file.
+            top: The number of allocation sites reported per partition.
+        """
+        self.path = Path(path).expanduser()
+        self.top = top
+        self.streams: dict[str, dict[str, t.Any]] = {}
+        self._stack: list[Usage] = []
+        self._started_tracing = False
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start tracing allocations, and empty the report."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEBACK_FRAMES)
+            self._started_tracing = True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text("")
+
+    @contextlib.contextmanager
+    def measure(self) -> t.Iterator[Usage]:
+        """Measure the memory traced within a block.
+
+        Blocks may nest: the peak of an outer block includes the peaks of the
+        blocks within it.
+
+        Yields:
+            The usage of the block, complete once the block exits.
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            self._stack[-1].peak = max(self._stack[-1].peak, peak)
+        tracemalloc.reset_peak()
+        usage = Usage(current)
+        self._stack.append(usage)
+        try:
+            yield usage
+        finally:
+            self._stack.pop()
+            current, peak = tracemalloc.get_traced_memory()
+            usage.peak = max(usage.peak, peak)
+            usage.allocated = current - usage.start
+            if self._stack:
+                self._stack[-1].peak = max(self._stack[-1].peak, usage.peak)
+
+    @contextlib.contextmanager
+    def partition(self, stream: str, context: Context | None) -> t.Iterator[Usage]:
+        """Measure a stream partition and report it.
+
+        Args:
+            stream: The stream name.
+            context: The partition context.
+
+        Yields:
+            The usage of the partition.
+        """
+        with self.measure() as usage:
+            yield usage
+        entry = {
+            "stream": stream,
+            "context": context,
+            "rss_bytes": rss_bytes(),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "traced_bytes": usage.start + usage.allocated,
+            "peak_traced_bytes": usage.peak,
+            "allocated_bytes": usage.allocated,
+            "top_allocations": self.top_allocations(),
+        }
+        summary = self.streams.setdefault(
+            stream,
+            {"partitions": 0, "peak_traced_bytes": 0, "peak_rss_bytes": 0},
+        )
+        summary["partitions"] += 1
+        summary["peak_traced_bytes"] = max(summary["peak_traced_bytes"], usage.peak)
+        summary["peak_rss_bytes"] = max(
+            summary["peak_rss_bytes"],
+            entry["peak_rss_bytes"] or 0,
+        )
+        self._write(entry)
+
+    def top_allocations(self) -> list[dict[str, t.Any]]:
+        """Return the source lines holding the most traced memory.
+
+        Returns:
+            The `top` allocation sites, with their size and number of blocks,
+            none without taking a snapshot if `top` is 0.
+        """
+        if not self.top:
+            return []
+        # Grouping first is much faster than filtering every trace
+        statistics = tracemalloc.take_snapshot().statistics("lineno")
+        sites = (
+            stat
+            for stat in statistics
+            if stat.traceback[0].filename not in _IGNORED_FILES
+        )
+        return [
+            {
+                "site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "bytes": stat.size,
+                "blocks": stat.count,
+            }
+            for stat in itertools.islice(sites, self.top)
+        ]
+
+    def close(self) -> None:
+        """Write the peaks of each stream, and stop tracing allocations."""
+        self._write({"summary": self.streams, "peak_rss_bytes": peak_rss_bytes()})
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _write(self, entry: dict[str, t.Any]) -> None:
+        line = json.dumps(entry, default=str)
+        with self._lock, self.path.open("a", encoding="utf-8") as file:
+            file.write(line + "\n")
@@ -0,0 +1,146 @@
+"""Dry-run planning of the API requests of a sync."""
+
+from __future__ import annotations
+
+import typing as t
+from collections import Counter
+
+if t.TYPE_CHECKING:
+    from singer_sdk import Stream
+    from singer_sdk.helpers.types import Context
+
+    from tap_linkedin_ads.tap import TapLinkedInAds
+
+# Assumed duration of a request before any request of the run completed
+DEFAULT_REQUEST_SECONDS = 1.0
+
+
+class StreamPlan(t.NamedTuple):
+    """The requests a sync is expected to make for one stream."""
+
+    stream: str
+    partitions: int
+    requests: int
+    # Whether the requests were counted by listing rather than estimated
+    listed: bool
+    seconds: float
+
+
+def _latency(tap: TapLinkedInAds, stream: Stream) -> float:
+    """Return the expected duration of a request of a stream."""
+    return (
+        tap.latency.mean(stream.path) or tap.latency.mean() or DEFAULT_REQUEST_SECONDS
+    )
+
+
+def _list_records(
+    tap: TapLinkedInAds,
+    stream: Stream,
+    context: Context | None,
+    requests: Counter[str],
+) -> t.Iterator[dict]:
+    """List the records of a partition, counting the requests sent.
+
+    Requests are counted as actually sent, so cached and shared pages cost
+    nothing.
+
+    Args:
+        tap: The tap.
+        stream: The stream.
+        context: The partition context.
+        requests: The requests of each stream, updated in place.
+
+    Yields:
+        The post-processed records.
+    """
+    # Incremental streams filter records from their starting timestamp
+    stream._write_starting_replication_value(context)  # noqa: SLF001
+    pages = iter(stream.list_pages(context))
+    while True:
+        sent = tap.latency.sent
+        records = next(pages, None)
+        requests[stream.name] += tap.latency.sent - sent
+        if records is None:
+            return
+        for record in records:
+            row = stream.post_process(record, context)
+            if row is not None:
+                yield row
+
+
+def plan_sync(tap: TapLinkedInAds) -> list[StreamPlan]:
+    """Estimate the requests made by syncing the selected streams.
+
+    Streams with child streams, e.g. accounts, campaigns and creatives, are
+    listed, like a sync would, to find the partitions of their children. The
+    requests they send are counted. The requests of the other streams, e.g.
+    analytics, are estimated from their partitions.
+
+    Args:
+        tap: The tap, with its catalog and state.
+
+    Returns:
+        The plan of each selected stream, or stream with selected children.
+    """
+    partitions: Counter[str] = Counter()
+    requests: Counter[str] = Counter()
+    listed: set[str] = set()
+
+    def visit(stream: Stream, context: Context | None) -> None:
+        partitions[stream.name] += 1
+        children = [
+            child
+            for child in stream.child_streams
+            if child.selected or child.has_selected_descendents
+        ]
+        if not children:
+            requests[stream.name] += stream.estimate_requests(context)
+            return
+
+        listed.add(stream.name)
+        for row in _list_records(tap, stream, context, requests):
+            for child_context in stream.generate_child_contexts(row, context):
+                for child in children:
+                    visit(child, child_context)
+
+    for stream in tap.streams.values():
+        if stream.parent_stream_type is None and (
+            stream.selected or stream.has_selected_descendents
+        ):
+            visit(stream, None)
+
+    return [
+        StreamPlan(
+            stream=name,
+            partitions=partitions[name],
+            requests=requests[name],
+            listed=name in listed,
+            seconds=requests[name] * _latency(tap, tap.streams[name]),
+        )
+        for name in tap.streams
+        if name in partitions
+    ]
+
+
+def plan_report(tap: TapLinkedInAds, plans: list[StreamPlan]) -> dict[str, t.Any]:
+    """Summarize a plan, with its share of the daily request quota.
+
+    Args:
+        tap: The tap.
+        plans: The plan of each stream.
+
+    Returns:
+        A JSON-serializable report.
+    """
+    total = sum(plan.requests for plan in plans)
+    quota = tap.config.get("daily_request_quota")
+    return {
+        "streams": [
+            {**plan._asdict(), "seconds": round(plan.seconds, 1)} for plan in plans
+        ],
+        "requests": total,
+        "daily_request_quota": quota,
+        "quota_used": round(total / quota, 4) if quota else None,
+        # Requests are assumed to run one at a time
+        "seconds": round(sum(plan.seconds for plan in plans), 1),
+    }
@@ -0,0 +1,227 @@
+"""Background prefetching of response pages."""
+
+from __future__ import annotations
+
+import contextvars
+import queue
+import threading
+import typing as t
+
+T = t.TypeVar("T")
+
+_DONE = object()
+# Seconds between checks for a closed consumer while the queue is full
+_POLL_INTERVAL = 0.1
+
+
+class _Error:
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+def _size(item: object) -> int:
+    return len(item) if isinstance(item, t.Sized) else 1
+
+
+class FlowControl:
+    """Limits on the pages and records in flight across all prefetchers.
+
+    A page is in flight from the moment its producer is admitted until the
+    consumer moves on to the next page. Producers wait while the limits are
+    reached, so fetching never runs further ahead of emission than allowed,
+    however many prefetchers are active. Each prefetcher may always hold one
+    page, so nested streams can never deadlock.
+    """
+
+    def __init__(self, max_pages: int | None, max_records: int | None) -> None:
+        """Initialize the limits.
+
+        Args:
+            max_pages: Maximum number of pages in flight, or None for no limit.
+            max_records: Maximum number of records in flight, or None for no
+                limit.
+        """
+        self.max_pages = max_pages
+        self.max_records = max_records
+        self.pages = 0
+        self.records = 0
+        self.waits = 0
+        self._condition = threading.Condition()
+
+    def _fits(self, records: int) -> bool:
+        if self.max_pages is not None and self.pages + 1 > self.max_pages:
+            return False
+        return self.max_records is None or self.records + records <= self.max_records
+
+    def acquire(
+        self,
+        records: int,
+        idle: t.Callable[[], bool],
+        closed: threading.Event,
+    ) -> bool:
+        """Wait until a page of `records` records can be held.
+
+        Args:
+            records: The number of records of the page.
+            idle: Whether the caller holds no page, in which case it is
+                admitted regardless of the limits.
+            closed: Set when the caller should stop waiting.
+
+        Returns:
+            True if the page was admitted, False if `closed` was set first.
+        """
+        with self._condition:
+            waited = False
+            while not (self._fits(records) or idle()):
+                if closed.is_set():
+                    return False
+                waited = True
+                self._condition.wait(_POLL_INTERVAL)
+            self.waits += waited
+            self.pages += 1
+            self.records += records
+            return True
+
+    def release(self, pages: int, records: int) -> None:
+        """Release pages taken by `acquire`.
+
+        Args:
+            pages: The number of pages released.
+            records: The total number of records of the pages.
+        """
+        with self._condition:
+            self.pages -= pages
+            self.records -= records
+            self._condition.notify_all()
+
+
+class Prefetcher(t.Generic[T]):
+    """Items produced ahead of the consumer by a background thread.
+
+    The producer blocks once `depth` items are waiting or the flow control
+    limits are reached, stops as soon as the consumer closes the iterator, and
+    its exceptions are raised in the consumer.
+    """
+
+    def __init__(
+        self,
+        items: t.Iterable[T],
+        depth: int,
+        flow: FlowControl | None = None,
+    ) -> None:
+        """Initialize the prefetcher.
+
+        Args:
+            items: The items, typically one response page each.
+            depth: Maximum number of items produced ahead of the consumer.
+            flow: Limits shared with other prefetchers.
+        """
+        self.items = items
+        self.buffer: queue.Queue = queue.Queue(maxsize=depth)
+        self.closed = threading.Event()
+        self.flow = flow
+        self._lock = threading.Lock()
+        # Pages and records held in the flow control
+        self._held_pages = 0
+        self._held_records = 0
+
+    def __iter__(self) -> t.Iterator[T]:
+        """Start the producer and iterate over the items.
+
+        Yields:
+            The items, in order.
+
+        Raises:
+            BaseException: Any error raised while producing the items.
+        """
+        # The producer runs in the context of the consumer, e.g. its trace span
+        producer = threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(self._produce,),
+            name="prefetch",
+            daemon=True,
+        )
+        producer.start()
+        try:
+            while True:
+                item = self.buffer.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, _Error):
+                    raise item.exc
+                yield item
+                # The consumer asks for the next page, so this one was consumed
+                self._release(1, _size(item))
+        finally:
+            with self._lock:
+                self.closed.set()
+                pages, records = self._held_pages, self._held_records
+            self._release(pages, records)
+
+    def _release(self, pages: int, records: int) -> None:
+        if self.flow is None or not pages:
+            return
+        with self._lock:
+            self._held_pages -= pages
+            self._held_records -= records
+        self.flow.release(pages, records)
+
+    def _admit(self, item: object) -> bool:
+        if self.flow is None or item is _DONE or isinstance(item, _Error):
+            return True
+        records = _size(item)
+        if not self.flow.acquire(records, lambda: self._held_pages == 0, self.closed):
+            return False
+        with self._lock:
+            if not self.closed.is_set():
+                self._held_pages += 1
+                self._held_records += records
+                return True
+        # The consumer closed while this page was admitted
+        self.flow.release(1, records)
+        return False
+
+    def _put(self, item: object) -> bool:
+        if not self._admit(item):
+            return False
+        while not self.closed.is_set():
+            try:
+                self.buffer.put(item, timeout=_POLL_INTERVAL)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    def _produce(self) -> None:
+        try:
+            for item in self.items:
+                if not self._put(item):
+                    break
+            else:
+                self._put(_DONE)
+        except BaseException as exc:  # noqa: BLE001
+            self._put(_Error(exc))
+        finally:
+            close = getattr(self.items, "close", None)
+            if close is not None and self.closed.is_set():
+                close()
+
+
+def prefetch(
+    items: t.Iterable[T],
+    depth: int,
+    flow: FlowControl | None = None,
+) -> t.Iterator[T]:
+    """Iterate over `items`, producing up to `depth` items ahead in a thread.
+
+    Args:
+        items: The items, typically one response page each.
+        depth: Maximum number of items produced ahead of the consumer.
+        flow: Limits shared with other prefetchers.
+
+    Returns:
+        An iterator over the items, in order.
+    """
+    return iter(Prefetcher(items, depth, flow))
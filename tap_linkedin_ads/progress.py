@@ -0,0 +1,284 @@
+"""Progress and ETA reporting of a sync, per stream."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+import typing as t
+
+from singer_sdk import metrics
+
+# Name of the METRIC lines of progress reports
+PROGRESS_METRIC = "sync_progress"
+
+
+class StreamProgress:
+    """The partitions, records and requests of one stream so far."""
+
+    __slots__ = (
+        "consumed",
+        "discovered",
+        "done",
+        "fetched",
+        "parent",
+        "records",
+        "requests",
+        "started",
+    )
+
+    def __init__(self, parent: str | None) -> None:
+        """Initialize the counts.
+
+        Args:
+            parent: The name of the parent stream, or None for a root stream.
+        """
+        self.parent = parent
+        # Partitions announced by the parent stream, or the single partition
+        # of a root stream
+        self.discovered = 0 if parent else 1
+        self.started = 0
+        self.done = 0
+        self.records = 0
+        self.requests = 0
+        # Records fetched and processed so far, of streams with children
+        self.fetched = 0
+        self.consumed = 0
+
+
+class ProgressTracker:
+    """Counts of partitions, records and requests, reported periodically.
+
+    The partitions of a child stream are only known as its parent stream lists
+    their records, e.g. the campaigns of each account. Until the parent stream
+    is done, the total of a child stream adds to the partitions announced so
+    far the ones expected from the parent records fetched but not processed
+    yet, and from the parent partitions not started yet. The ETA assumes each
+    remaining partition costs the requests observed per partition so far, sent
+    at the request rate of the run.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        clock: t.Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the tracker.
+
+        Args:
+            interval: Seconds between reports, or 0 to never report.
+            clock: The clock, in seconds.
+        """
+        self.interval = interval
+        self.clock = clock
+        self.streams: dict[str, StreamProgress] = {}
+        self.logger = metrics.get_metrics_logger()
+        self._start = clock()
+        self._last_report = self._start
+        self._lock = threading.Lock()
+
+    def _stream(self, name: str, parent: str | None = None) -> StreamProgress:
+        progress = self.streams.get(name)
+        if progress is None:
+            progress = self.streams[name] = StreamProgress(parent)
+        return progress
+
+    def discover(self, stream: str, parent: str) -> None:
+        """Count a partition announced by a parent stream record.
+
+        Args:
+            stream: The child stream name.
+            parent: The parent stream name.
+        """
+        with self._lock:
+            self._stream(stream, parent).discovered += 1
+
+    def start(self, stream: str, parent: str | None) -> None:
+        """Count a partition starting to sync.
+
+        Args:
+            stream: The stream name.
+            parent: The parent stream name, or None for a root stream.
+        """
+        with self._lock:
+            self._stream(stream, parent).started += 1
+
+    def finish(self, stream: str) -> None:
+        """Count a partition done syncing, and report if due.
+
+        Args:
+            stream: The stream name.
+        """
+        with self._lock:
+            progress = self._stream(stream)
+            progress.done += 1
+            # Records fetched but left unprocessed are not pending anymore
+            progress.consumed = progress.fetched
+        self.maybe_report()
+
+    def fetch(self, stream: str, records: list[dict]) -> t.Iterator[dict]:
+        """Count the records of a page as fetched, then each one as processed.
+
+        Args:
+            stream: The name of a stream with child streams.
+            records: The records of a page.
+
+        Yields:
+            The records.
+        """
+        with self._lock:
+            self._stream(stream).fetched += len(records)
+        for record in records:
+            with self._lock:
+                self.streams[stream].consumed += 1
+            yield record
+
+    def record(self, stream: str) -> None:
+        """Count a record, and report if due.
+
+        Args:
+            stream: The stream name.
+        """
+        with self._lock:
+            self._stream(stream).records += 1
+        self.maybe_report()
+
+    def request(self, stream: str) -> None:
+        """Count a request, and report if due.
+
+        Args:
+            stream: The stream name.
+        """
+        with self._lock:
+            self._stream(stream).requests += 1
+        self.maybe_report()
+
+    def is_final(self, stream: str) -> bool:
+        """Return whether every partition of a stream is known.
+
+        Args:
+            stream: The stream name.
+
+        Returns:
+            True once the parent streams, if any, are done.
+        """
+        progress = self.streams[stream]
+        if progress.parent is None:
+            return True
+        parent = self.streams.get(progress.parent)
+        return (
+            parent is not None
+            and self.is_final(progress.parent)
+            and parent.done >= self.total(progress.parent)
+        )
+
+    def total(self, stream: str) -> float:
+        """Return the known or extrapolated number of partitions of a stream.
+
+        Args:
+            stream: The stream name.
+
+        Returns:
+            The partitions announced, plus the ones expected from the pending
+            parent records and parent partitions while the parent is not done.
+        """
+        progress = self.streams[stream]
+        parent = self.streams.get(progress.parent or "")
+        if parent is None or not parent.started or self.is_final(stream):
+            return progress.discovered
+        pending = 0.0
+        if parent.consumed:
+            pending = (
+                (parent.fetched - parent.consumed)
+                * progress.discovered
+                / parent.consumed
+            )
+        known = progress.discovered + pending
+        unstarted = max(self.total(t.cast(str, progress.parent)) - parent.started, 0)
+        return known + unstarted * known / parent.started
+
+    def maybe_report(self) -> None:
+        """Report progress if the interval passed since the last report."""
+        if not self.interval:
+            return
+        now = self.clock()
+        with self._lock:
+            if now - self._last_report < self.interval:
+                return
+            self._last_report = now
+        self.report()
+
+    def snapshot(self) -> list[dict[str, t.Any]]:
+        """Return the progress of each stream and of the run.
+
+        Returns:
+            One report per stream, then one for the run, without a stream.
+        """
+        with self._lock:
+            elapsed = max(self.clock() - self._start, 1e-9)
+            requests = sum(p.requests for p in self.streams.values())
+            request_rate = requests / elapsed
+            reports = []
+            remaining_requests = 0.0
+            for name, progress in self.streams.items():
+                total = self.total(name)
+                requests_per_partition = (
+                    progress.requests / progress.done if progress.done else 1
+                )
+                remaining = max(total - progress.done, 0) * requests_per_partition
+                remaining_requests += remaining
+                reports.append(
+                    {
+                        "stream": name,
+                        "fraction_done": _fraction(progress.done, total),
+                        "partitions_done": progress.done,
+                        "partitions_total": round(total),
+                        "partitions_total_final": self.is_final(name),
+                        "records": progress.records,
+                        "records_per_second": round(progress.records / elapsed, 2),
+                        "requests_per_second": round(progress.requests / elapsed, 2),
+                        "eta_seconds": _eta(remaining, request_rate),
+                    },
+                )
+            reports.append(
+                {
+                    "fraction_done": _fraction(
+                        sum(p.done for p in self.streams.values()),
+                        sum(report["partitions_total"] for report in reports),
+                    ),
+                    "elapsed_seconds": round(elapsed, 1),
+                    "requests": requests,
+                    "requests_per_second": round(request_rate, 2),
+                    "eta_seconds": _eta(remaining_requests, request_rate),
+                },
+            )
+        return reports
+
+    def report(self) -> None:
+        """Log the progress of each stream and of the run as METRIC lines.
+
+        The value of each line is the fraction of partitions done, the other
+        figures are tags.
+        """
+        for tags in self.snapshot():
+            point = {
+                "type": "gauge",
+                "metric": PROGRESS_METRIC,
+                "value": tags.pop("fraction_done"),
+                "tags": tags,
+            }
+            self.logger.info("METRIC: %s", json.dumps(point))
+
+
+def _fraction(done: int, total: float) -> float:
+    """Return the fraction of partitions done, at most 1."""
+    return round(min(done / total, 1.0), 4) if total else 1.0
+
+
+def _eta(remaining_requests: float, request_rate: float) -> float | None:
+    """Return the seconds left at the request rate, if any requests were sent."""
+    if not remaining_requests:
+        return 0.0
+    if not request_rate:
+        return None
+    return round(remaining_requests / request_rate, 1)
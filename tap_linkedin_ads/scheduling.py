@@ -0,0 +1,143 @@
+"""Request budget and priority scheduling of stream partitions."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import typing as t
+
+if t.TYPE_CHECKING:
+    from singer_sdk.helpers.types import Context
+
+    from tap_linkedin_ads.streams.base_stream import LinkedInAdsStreamBase
+
+
+class BudgetExhaustedError(Exception):
+    """Raised when a request would exceed the request budget of the run."""
+
+
+def partition_key(stream_name: str, context: Context | None) -> tuple:
+    """Return a hashable identity of a stream partition.
+
+    Args:
+        stream_name: The stream name.
+        context: The partition context.
+
+    Returns:
+        The stream name and sorted context items.
+    """
+    return (stream_name, repr(sorted((context or {}).items())))
+
+
+class RequestBudget:
+    """The number of requests a run may send, shared by all streams."""
+
+    def __init__(self, limit: int) -> None:
+        """Initialize the budget.
+
+        Args:
+            limit: The maximum number of requests.
+        """
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> int:
+        """Return the number of requests left."""
+        return max(self.limit - self.used, 0)
+
+    def spend(self) -> None:
+        """Count a request about to be sent.
+
+        Raises:
+            BudgetExhaustedError: If the budget is spent.
+        """
+        with self._lock:
+            if self.used >= self.limit:
+                msg = f"The request budget of {self.limit} requests is spent."
+                raise BudgetExhaustedError(msg)
+            self.used += 1
+
+
+class Scheduler:
+    """Child stream partitions, synced highest priority first.
+
+    Instead of syncing the children of each record right away, streams queue
+    them here. Partitions deferred by the previous run are queued up front, so
+    they run even if their parent record is not synced again. Partitions then
+    run by stream priority, then partition priority, with partitions deferred
+    by the previous run first among equals. A partition is queued at most once
+    per run. Once a partition does not fit in the remaining budget, it and all
+    the partitions after it are deferred.
+    """
+
+    def __init__(
+        self,
+        budget: RequestBudget,
+        previously_deferred: t.Iterable[
+            tuple[LinkedInAdsStreamBase, Context | None]
+        ] = (),
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            budget: The request budget of the run.
+            previously_deferred: The streams and partition contexts deferred by
+                the previous run.
+        """
+        self.budget = budget
+        self.deferred: list[tuple[LinkedInAdsStreamBase, Context | None]] = []
+        self._queue: list[tuple] = []
+        self._queued: set[tuple] = set()
+        self._order = itertools.count()
+        for stream, context in previously_deferred:
+            self._push(stream, context, previously_deferred=True)
+
+    def push(self, stream: LinkedInAdsStreamBase, context: Context | None) -> None:
+        """Queue a partition, unless it was already queued in this run.
+
+        Args:
+            stream: The stream.
+            context: The partition context.
+        """
+        self._push(stream, context, previously_deferred=False)
+
+    def _push(
+        self,
+        stream: LinkedInAdsStreamBase,
+        context: Context | None,
+        *,
+        previously_deferred: bool,
+    ) -> None:
+        key = partition_key(stream.name, context)
+        if key in self._queued:
+            return
+        self._queued.add(key)
+        stream_priority, priority = stream.partition_priority(context)
+        heapq.heappush(
+            self._queue,
+            (
+                -stream_priority,
+                -priority,
+                not previously_deferred,
+                next(self._order),
+                stream,
+                context,
+            ),
+        )
+
+    def run(self) -> None:
+        """Sync the queued partitions, including the ones queued meanwhile."""
+        while self._queue:
+            *_, stream, context = heapq.heappop(self._queue)
+            if self.deferred or self.budget.remaining < stream.estimate_requests(
+                context,
+            ):
+                self.deferred.append((stream, context))
+                continue
+            try:
+                stream.sync(context)
+            except BudgetExhaustedError:
+                self.deferred.append((stream, context))
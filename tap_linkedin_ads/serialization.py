@@ -0,0 +1,77 @@
+"""Fast Singer message serialization backed by orjson, when installed."""
+
+from __future__ import annotations
+
+import typing as t
+from decimal import Decimal
+
+from singer_sdk._singerlib import RecordMessage
+from singer_sdk._singerlib.json import serialize_json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+if t.TYPE_CHECKING:
+    from singer_sdk._singerlib.encoding._simple import Message
+
+
+def _default(obj: t.Any) -> t.Any:  # noqa: ANN401
+    """Encode values orjson does not support natively.
+
+    Decimals are written as raw JSON numbers, which requires `orjson.Fragment`.
+
+    Args:
+        obj: The object to encode.
+
+    Returns:
+        The encoded object.
+
+    Raises:
+        TypeError: If the object cannot be encoded without losing precision.
+    """
+    if isinstance(obj, Decimal) and hasattr(orjson, "Fragment"):
+        return orjson.Fragment(str(obj))
+    msg = f"Type is not JSON serializable: {type(obj).__name__}"
+    raise TypeError(msg)
+
+
+def serialize_message(message: Message) -> str:
+    """Serialize a Singer message into a line of JSON.
+
+    Record messages skip the deep copy made by `Message.to_dict`, and are encoded
+    with orjson when it is installed. Datetimes such as the analytics `day` are
+    written in the same ISO 8601 format as the SDK encoder. Messages orjson cannot
+    encode fall back to the SDK encoder.
+
+    Args:
+        message: A Singer message object.
+
+    Returns:
+        A string of serialized JSON.
+    """
+    if orjson is None:
+        return serialize_json(message.to_dict())
+
+    if isinstance(message, RecordMessage):
+        data: dict[str, t.Any] = {
+            "type": message.type,
+            "stream": message.stream,
+            "record": message.record,
+        }
+        if message.version is not None:
+            data["version"] = message.version
+        if message.time_extracted is not None:
+            data["time_extracted"] = message.time_extracted
+    else:
+        data = message.to_dict()
+
+    try:
+        return orjson.dumps(
+            data,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS,
+        ).decode()
+    except orjson.JSONEncodeError:
+        return serialize_json(message.to_dict())
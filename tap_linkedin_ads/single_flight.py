@@ -0,0 +1,74 @@
+"""Coalescing of identical requests made during a run."""
+
+from __future__ import annotations
+
+import threading
+import typing as t
+
+T = t.TypeVar("T")
+
+
+class _Call:
+    """A call in flight, awaited by every caller with the same key."""
+
+    __slots__ = ("done", "error", "result")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: t.Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Run at most one call at a time per key, sharing its result.
+
+    Callers asking for a key that is already in flight wait for that call and
+    get its result, or its exception, instead of repeating it. Nothing is kept
+    once the call completes: later callers run the call again.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the group."""
+        # Callers that waited for a call in flight instead of running it
+        self.shared = 0
+        self._lock = threading.Lock()
+        self._calls: dict[t.Hashable, _Call] = {}
+
+    def do(self, key: t.Hashable, fn: t.Callable[[], T]) -> T:
+        """Return the result of `fn`, or of the call with the same key in flight.
+
+        Args:
+            key: The identity of the call, e.g. a request URL.
+            fn: The call.
+
+        Returns:
+            The result of this call, or of the identical call it was merged with.
+
+        Raises:
+            BaseException: The error of the call, raised in every waiter.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        else:
+            return call.result
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
@@ -0,0 +1,94 @@
+"""Local store of record content hashes, to emit only changed records."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import typing as t
+from collections import Counter
+from pathlib import Path
+
+if t.TYPE_CHECKING:
+    import os
+
+
+def content_hash(record: t.Mapping[str, t.Any]) -> bytes:
+    """Return a stable hash of a record's content.
+
+    Args:
+        record: The record, or the subset of its fields to compare.
+
+    Returns:
+        A 16-byte digest.
+    """
+    data = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(data.encode(), digest_size=16).digest()
+
+
+class SnapshotStore:
+    """Content hashes of the last emitted version of each record.
+
+    Hashes are kept in a SQLite file, keyed by stream and primary key, and are
+    shared by all streams of a run. The hashes of a run are only committed once
+    the run succeeds: records of a failed or killed run may not have reached
+    the target, so the next run emits them again. Deleting the file makes the
+    next run emit every record again.
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        """Open or create the store.
+
+        Args:
+            path: The path of the SQLite file.
+        """
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.unchanged: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            "stream TEXT NOT NULL, key TEXT NOT NULL, hash BLOB NOT NULL, "
+            "PRIMARY KEY (stream, key)) WITHOUT ROWID",
+        )
+
+    def changed(self, stream: str, key: t.Sequence[t.Any], digest: bytes) -> bool:
+        """Check whether a record changed since it was last seen, and record it.
+
+        Args:
+            stream: The stream name.
+            key: The primary key values of the record.
+            digest: The content hash of the record.
+
+        Returns:
+            False if the stored hash equals `digest`, True otherwise.
+        """
+        key_text = json.dumps(list(key), separators=(",", ":"), default=str)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT hash FROM snapshots WHERE stream = ? AND key = ?",
+                (stream, key_text),
+            ).fetchone()
+            if row is not None and row[0] == digest:
+                self.unchanged[stream] += 1
+                return False
+            self._db.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)",
+                (stream, key_text, digest),
+            )
+            return True
+
+    def close(self, *, commit: bool = True) -> None:
+        """Save or discard the hashes of this run, and close the store.
+
+        Args:
+            commit: Whether the run succeeded and its hashes are saved.
+        """
+        with self._lock:
+            if commit:
+                self._db.commit()
+            else:
+                self._db.rollback()
+            self._db.close()
@@ -2,45 +2,351 @@
 
 from __future__ import annotations
 
+import datetime
+import sys
 import typing as t
-from datetime import datetime, timezone
+from collections import deque
+from decimal import Decimal
+from functools import cached_property
 from importlib import resources
+from urllib.parse import quote
 
+import pendulum
+from singer_sdk.batch import Batcher
+from singer_sdk.helpers._batch import BatchConfig
 from singer_sdk.streams.core import REPLICATION_FULL_TABLE
 
+from tap_linkedin_ads.streams.ad_analytics.batching import (
+    DECIMAL_METRICS,
+    TypedParquetBatcher,
+    typed_schema,
+)
+from tap_linkedin_ads.streams.ad_analytics.rows import (
+    NON_ADDITIVE_METRICS,
+    AnalyticsRow,
+    PeriodTotals,
+    RowLayout,
+    start_of_day,
+)
+from tap_linkedin_ads.streams.ad_analytics.spill import SpilledRows
+from tap_linkedin_ads.streams.ad_analytics.windows import (
+    DateRange,
+    add_range,
+    date_windows,
+    is_covered,
+    parse_ranges,
+)
 from tap_linkedin_ads.streams.base_stream import LinkedInAdsStreamBase
+from tap_linkedin_ads.urn import intern_urn, make_urn
+
+if t.TYPE_CHECKING:
+    import requests
+    from singer_sdk.helpers._batch import BaseBatchFileEncoding
+    from singer_sdk.helpers.types import Context
 
 SCHEMAS_DIR = resources.files(__package__) / "schemas"
-UTC = timezone.utc
+UTC = datetime.timezone.utc
+
+# The adAnalytics finders return at most 20 fields per request, so the metrics
+# are requested in groups. Only the first group includes `dateRange`; the groups
+# are merged by position.
+ANALYTICS_COLUMN_GROUPS = (
+    "viralLandingPageClicks,viralExternalWebsitePostClickConversions,externalWebsiteConversions,viralVideoFirstQuartileCompletions,leadGenerationMailContactInfoShares,clicks,viralClicks,shares,viralFullScreenPlays,videoMidpointCompletions,viralCardClicks,viralExternalWebsitePostViewConversions,viralTotalEngagements,viralCompanyPageClicks,actionClicks,viralShares,videoCompletions,comments,externalWebsitePostViewConversions,dateRange",
+    "costInUsd,landingPageClicks,oneClickLeadFormOpens,talentLeads,sends,viralOneClickLeadFormOpens,conversionValueInLocalCurrency,viralFollows,otherEngagements,viralVideoCompletions,cardImpressions,leadGenerationMailInterestedClicks,opens,totalEngagements,videoViews,viralImpressions,viralVideoViews,commentLikes,viralDocumentThirdQuartileCompletions,viralLikes",
+    "adUnitClicks,videoThirdQuartileCompletions,cardClicks,likes,viralComments,viralVideoMidpointCompletions,viralVideoThirdQuartileCompletions,oneClickLeads,fullScreenPlays,viralCardImpressions,follows,videoStarts,videoFirstQuartileCompletions,textUrlClicks,reactions,viralReactions,externalWebsitePostClickConversions,viralOtherEngagements,costInLocalCurrency",
+    "viralVideoStarts,viralRegistrations,viralJobApplyClicks,viralJobApplications,jobApplications,jobApplyClicks,viralExternalWebsiteConversions,postViewRegistrations,companyPageClicks,documentCompletions,documentFirstQuartileCompletions,documentMidpointCompletions,documentThirdQuartileCompletions,downloadClicks,viralDocumentCompletions,viralDocumentFirstQuartileCompletions,viralDocumentMidpointCompletions,approximateUniqueImpressions,viralDownloadClicks,impressions",
+)
 
 
 class AdAnalyticsBase(LinkedInAdsStreamBase):
-    """LinkedInAds stream class for ad analytics."""
+    """Ad analytics stream for one pivot of the adAnalytics finder.
+
+    Subclasses only declare the pivot, the facet used to select entities, and
+    the parent stream whose context holds the entity ID, e.g.:
+
+        class AdAnalyticsByCampaignGroupStream(AdAnalyticsBase):
+            name = "ad_analytics_by_campaign_group"
+            parent_stream_type = CampaignGroupsStream
+            pivot = "CAMPAIGN_GROUP"
+            facet = "campaignGroups"
+            facet_urn_type = "sponsoredCampaignGroup"
+            context_key = "campaign_group_id"
+            schema = ...
+
+    Each column group is requested in turn and merged into full rows, keyed by
+    the entity ID and `day`.
+    """
 
     path = "/adAnalytics"
     replication_method = REPLICATION_FULL_TABLE
+    priority = 3
 
     substreams: t.ClassVar[list] = []
 
-    def post_process(self, row: dict, context: dict | None = None) -> dict | None:
-        """Post-process each record returned by the API.
+    # The `q` finder of the adAnalytics endpoint
+    finder: t.ClassVar[str] = "analytics"
+    # The `pivot` of the report, e.g. `CAMPAIGN`
+    pivot: t.ClassVar[str]
+    # The facet selecting the reported entities, e.g. `campaigns`
+    facet: t.ClassVar[str]
+    # The URN entity type of the facet values, e.g. `sponsoredCampaign`
+    facet_urn_type: t.ClassVar[str]
+    # The context key holding the entity ID
+    context_key: t.ClassVar[str]
+    # The context key holding the entity status, e.g. `ACTIVE`
+    status_key: t.ClassVar[str | None] = None
+    column_groups: t.ClassVar[tuple[str, ...]] = ANALYTICS_COLUMN_GROUPS
+
+    def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
+        """Initialize the stream, typing metrics when written as batch files."""
+        super().__init__(*args, **kwargs)
+        if self.get_batch_config(self.config):
+            self.schema = typed_schema(self.schema)
+        self._rollups: dict[tuple, dict[str, PeriodTotals]] = {}
+
+    @cached_property
+    def metric_casts(self) -> dict[str, t.Callable[[str], t.Any]]:
+        """Return the casts of metrics the API returns as strings.
+
+        Metrics are cast to the type declared in the stream schema, so they stay
+        strings unless the schema is numeric.
+        """
+        properties = self.schema.get("properties", {})
+        casts: dict[str, t.Callable[[str], t.Any]] = {}
+        for name in DECIMAL_METRICS & properties.keys():
+            types = properties[name].get("type", [])
+            if "integer" in types:
+                casts[name] = int
+            elif "number" in types:
+                casts[name] = Decimal
+        return casts
+
+    @property
+    def change_detection(self) -> bool:  # type: ignore[override]
+        """Return whether rows equal to the ones last emitted are skipped.
+
+        Off unless `analytics_change_detection` is set. Rows of days already
+        loaded, e.g. by overlapping runs or backfills, are then only emitted
+        again once their metrics change.
+        """
+        return self.config.get("analytics_change_detection", False)
+
+    def get_url_params(
+        self,
+        context: Context | None,
+        next_page_token: t.Any | None,  # noqa: ANN401
+    ) -> dict[str, t.Any]:
+        """Return a dictionary of values to be used in URL parameterization.
 
         Args:
-            row: Individual record in the stream.
-            context: Stream partition or context dictionary.
+            context: The stream context.
+            next_page_token: The next page index or value.
 
         Returns:
-            The resulting record dict, or `None` if the record should be excluded.
+            A dictionary of URL query parameters.
         """
-        start_date = row.get("dateRange", {}).get("start", {})
+        return {
+            "q": self.finder,
+            **super().get_url_params(context, next_page_token),
+        }
 
-        if start_date:
-            row["day"] = datetime.strptime(
-                f'{start_date.get("year")}-{start_date.get("month")}-{start_date.get("day")}',
-                "%Y-%m-%d",
-            ).astimezone(UTC)
+    def facet_urns(self, context: Context | None) -> list[str]:
+        """Return the URNs of the entities reported on for a partition.
 
-        return super().post_process(row, context)
+        Args:
+            context: The stream context.
+
+        Returns:
+            The facet values.
+        """
+        return [make_urn(self.facet_urn_type, (context or {})[self.context_key])]
+
+    def get_unencoded_params(
+        self,
+        context: Context,
+        date_range: DateRange | None = None,
+    ) -> dict:
+        """Return a dictionary of unencoded params.
+
+        Args:
+            context: The stream context.
+            date_range: The first and last day requested, defaults to the
+                configured date range.
+
+        Returns:
+            A dictionary of URL query parameters, requesting the first column
+            group.
+        """
+        start_date, end_date = date_range or self.configured_range
+        facet_values = ",".join(quote(urn, safe="") for urn in self.facet_urns(context))
+        return {
+            "pivot": f"(value:{self.pivot})",
+            "timeGranularity": f"(value:{self.time_granularity})",
+            self.facet: f"List({facet_values})",
+            "dateRange": (
+                f"(start:(year:{start_date.year},month:{start_date.month},day:{start_date.day}),"
+                f"end:(year:{end_date.year},month:{end_date.month},day:{end_date.day}))"
+            ),
+            "fields": self.column_groups[0],
+        }
+
+    @property
+    def configured_range(self) -> DateRange:
+        """Return the first and last day of the configured date range."""
+        return (
+            pendulum.parse(self.config["start_date"]).date(),
+            pendulum.parse(self.config["end_date"]).date(),
+        )
+
+    @property
+    def needs_full_range(self) -> bool:
+        """Return whether every window is synced, e.g. to sum rollups."""
+        return bool(self.rollup_periods)
+
+    def pending_windows(self, context: Context | None) -> list[DateRange]:
+        """Return the date windows to sync for a partition, newest first.
+
+        With `analytics_window_days`, the date range is split into windows of
+        that many days. With `analytics_lookback_days` too, windows synced by
+        previous runs are skipped, except for the recent ones.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The first and last day of each window.
+        """
+        start, end = self.configured_range
+        days = self.config.get("analytics_window_days")
+        if self.time_granularity != "DAILY":
+            # Monthly and lifetime rows must not be split across windows
+            days = None
+        windows = date_windows(start, end, days)
+        lookback = self.config.get("analytics_lookback_days")
+        if lookback is None or self.needs_full_range:
+            return windows
+        synced = parse_ranges(self.get_context_state(context).get("synced_ranges", []))
+        horizon = end - datetime.timedelta(days=lookback)
+        return [
+            window
+            for window in windows
+            if window[1] > horizon or not is_covered(synced, window)
+        ]
+
+    def mark_synced(self, context: Context | None, window: DateRange) -> None:
+        """Record in the partition state that a window was synced.
+
+        Args:
+            context: The stream context.
+            window: The first and last day of the window.
+        """
+        state = self.get_context_state(context)
+        ranges = add_range(parse_ranges(state.get("synced_ranges", [])), window)
+        state["synced_ranges"] = [
+            [first.isoformat(), last.isoformat()] for first, last in ranges
+        ]
+
+    def partition_priority(self, context: Context | None) -> tuple[int, int]:
+        """Return the scheduling priority of a partition, active entities first.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The stream priority, and 1 for active entities, 0 otherwise.
+        """
+        stream_priority, _ = super().partition_priority(context)
+        status = (context or {}).get(self.status_key) if self.status_key else None
+        return stream_priority, int(status == "ACTIVE")
+
+    def estimate_requests(self, context: Context | None) -> int:
+        """Estimate the requests made to sync a partition, for `--plan`.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            One request per column group and date window.
+        """
+        return len(self.column_groups) * len(self.pending_windows(context))
+
+    def get_records(self, context: Context | None) -> t.Iterable[dict[str, t.Any]]:
+        """Return full analytics rows, requesting each column group in turn.
+
+        Date windows are synced newest first, so an interrupted run still
+        delivers the most recent days.
+
+        Args:
+            context: The stream context.
+
+        Yields:
+            The merged and post-processed records.
+        """
+        yield from self.accumulate_rollups(self.get_window_records(context), context)
+
+    def get_window_records(self, context: Context | None) -> t.Iterator[dict]:
+        """Return the rows of each pending date window, recording it as synced.
+
+        Args:
+            context: The stream context.
+
+        Yields:
+            The merged and post-processed records.
+        """
+        for window in self.pending_windows(context):
+            params = self.get_unencoded_params(context, window)
+            column_groups = (
+                self.request_records(context, {**params, "fields": fields})
+                for fields in self.column_groups
+            )
+            for record in self.merge_column_groups(*column_groups):
+                row = self.post_process(record, context)
+                if row is not None:
+                    yield row
+            # Every row of the window was processed once the next one is asked
+            self.mark_synced(context, window)
+
+    def parse_response(self, response: requests.Response) -> t.Iterable[dict]:
+        """Parse an analytics response, transforming the whole page at once.
+
+        Args:
+            response: The HTTP ``requests.Response`` object.
+
+        Returns:
+            The transformed records of the page.
+        """
+        return self.transform_page(list(super().parse_response(response)))
+
+    def transform_page(self, records: list[dict]) -> list[dict]:
+        """Derive `day`, cast string metrics and intern URNs for a page of rows.
+
+        Each transform runs column by column over the page, and dates are built
+        once per distinct day.
+
+        Args:
+            records: The analytics elements of one response page.
+
+        Returns:
+            The transformed records.
+        """
+        for name, cast in self.metric_casts.items():
+            for row in records:
+                value = row.get(name)
+                if isinstance(value, str):
+                    row[name] = cast(value)
+
+        for row in records:
+            start_date = row.get("dateRange", {}).get("start", {})
+            if start_date:
+                row["day"] = start_of_day(
+                    start_date.get("year"),
+                    start_date.get("month"),
+                    start_date.get("day"),
+                )
+            if "pivotValues" in row:
+                row["pivotValues"] = [intern_urn(urn) for urn in row["pivotValues"]]
+
+        return records
 
     def merge_dicts(self, *dict_args: dict) -> dict:
         """Return a merged dictionary of adAnalytics responses.
@@ -51,7 +357,261 @@ class AdAnalyticsBase(LinkedInAdsStreamBase):
         Returns:
             A merged dictionary of adAnalytics responses
         """
-        result = {}
+        row = self.row_layout.new_row()
         for dictionary in dict_args:
-            result.update(dictionary)
-        return result
+            row.update(dictionary)
+        return row.to_dict()
+
+    @cached_property
+    def row_layout(self) -> RowLayout:
+        """Return the slot layout of merged rows for this stream."""
+        return RowLayout.from_schema(self.schema)
+
+    def merge_column_groups(
+        self,
+        *column_groups: t.Iterable[dict],
+    ) -> t.Iterator[dict]:
+        """Merge the records of each column group into full analytics rows.
+
+        Records are matched by position, like `zip`. Each group is copied into
+        compact rows as it is read, so only one dict per row is built, at emit
+        time. Once the rows outgrow `analytics_merge_memory_mb`, they are moved
+        to a temporary on-disk store and read back in the same order.
+
+        Args:
+            *column_groups: the records returned for each column subset.
+
+        Yields:
+            The merged records.
+        """
+        if not column_groups:
+            return
+        rows: deque = deque()
+        spilled = self._read_first_group(column_groups[0], rows)
+        try:
+            for records in column_groups[1:]:
+                if spilled is not None:
+                    spilled.update(records)
+                    continue
+                matched = 0
+                for row, record in zip(rows, records):
+                    row.update(record)
+                    matched += 1
+                while len(rows) > matched:
+                    rows.pop()
+            if spilled is not None:
+                yield from spilled.rows()
+            while rows:
+                yield rows.popleft().to_dict()
+        finally:
+            if spilled is not None:
+                spilled.close()
+
+    def _read_first_group(
+        self,
+        records: t.Iterable[dict],
+        rows: deque,
+    ) -> SpilledRows | None:
+        """Create a row for each record of the first column group.
+
+        Args:
+            records: The records of the first column group.
+            rows: The rows in memory, filled in place.
+
+        Returns:
+            The on-disk store holding the rows instead, if they outgrew memory.
+        """
+        records = iter(records)
+        max_rows = None
+        for record in records:
+            row = self.row_layout.new_row()
+            row.update(record)
+            rows.append(row)
+            if max_rows is None:
+                max_rows = self._max_rows_in_memory(row, record)
+            if len(rows) > max_rows:
+                spilled = self._spill(rows)
+                try:
+                    spilled.extend(records)
+                except BaseException:
+                    spilled.close()
+                    raise
+                return spilled
+        return None
+
+    def _max_rows_in_memory(self, row: AnalyticsRow, record: dict) -> int:
+        """Estimate how many merged rows fit in `analytics_merge_memory_mb`.
+
+        Args:
+            row: The first row, holding the first column group.
+            record: The first record.
+
+        Returns:
+            The number of rows kept in memory before spilling to disk.
+        """
+        limit = self.config.get("analytics_merge_memory_mb")
+        if not limit:
+            return sys.maxsize
+        group_bytes = sum(sys.getsizeof(value) for value in record.values())
+        row_bytes = sys.getsizeof(row.values) + group_bytes * len(self.column_groups)
+        return max(int(limit * 1024 * 1024 / row_bytes), 1)
+
+    def _spill(self, rows: deque) -> SpilledRows:
+        """Move rows of the first column group to an on-disk store.
+
+        Args:
+            rows: The rows in memory, emptied.
+
+        Returns:
+            The on-disk store.
+        """
+        self.logger.info(
+            "Merging analytics rows on disk after %d rows exceeded "
+            "analytics_merge_memory_mb.",
+            len(rows) - 1,
+        )
+        spilled = SpilledRows(self.config.get("analytics_spill_dir"))
+        spilled.extend(rows.popleft().to_dict() for _ in range(len(rows)))
+        return spilled
+
+    @property
+    def time_granularity(self) -> str:
+        """Return the `timeGranularity` requested from the API."""
+        return self.config.get("time_granularity") or "DAILY"
+
+    @cached_property
+    def rollup_metrics(self) -> dict[str, bool]:
+        """Return the metrics summed by rollups.
+
+        Returns:
+            The additive metrics, mapped to whether the schema types them as
+            strings.
+        """
+        metrics = {}
+        for name, prop in self.schema.get("properties", {}).items():
+            types = prop.get("type", [])
+            if name in NON_ADDITIVE_METRICS:
+                continue
+            if name in DECIMAL_METRICS or "integer" in types or "number" in types:
+                metrics[name] = "string" in types
+        return metrics
+
+    def new_rollup(self, period: str) -> PeriodTotals:
+        """Return empty totals of this stream's metrics.
+
+        Args:
+            period: `MONTHLY` or `ALL`.
+
+        Returns:
+            The period totals.
+        """
+        return PeriodTotals(period, self.rollup_metrics)
+
+    @property
+    def rollup_periods(self) -> list[str]:
+        """Return the periods of the selected rollups of this stream."""
+        return [
+            stream.period
+            for stream in self._tap.streams.values()
+            if getattr(stream, "source_stream_name", None) == self.name
+            and stream.selected
+        ]
+
+    def accumulate_rollups(
+        self,
+        records: t.Iterable[dict],
+        context: Context | None,
+        *,
+        force: bool = False,
+    ) -> t.Iterator[dict]:
+        """Pass records through, adding them to the totals of selected rollups.
+
+        Args:
+            records: The records of the stream.
+            context: The stream context.
+            force: Accumulate even if this stream is not selected.
+
+        Yields:
+            The records, unchanged.
+        """
+        periods = self.rollup_periods if self.selected or force else []
+        if not periods:
+            yield from records
+            return
+        totals = {period: self.new_rollup(period) for period in periods}
+        for record in records:
+            for rollup in totals.values():
+                rollup.add(record)
+            yield record
+        self._rollups[self._rollup_key(context)] = totals
+
+    def pop_rollup(self, context: Context | None, period: str) -> PeriodTotals | None:
+        """Return and forget the totals accumulated for a partition.
+
+        Args:
+            context: The stream context.
+            period: The rollup period.
+
+        Returns:
+            The totals, or None if the partition was not synced by this stream.
+        """
+        key = self._rollup_key(context)
+        totals = self._rollups.get(key, {})
+        rollup = totals.pop(period, None)
+        if not totals:
+            self._rollups.pop(key, None)
+        return rollup
+
+    @staticmethod
+    def _rollup_key(context: Context | None) -> tuple:
+        return tuple(sorted((context or {}).items()))
+
+    def get_batch_config(self, config: t.Mapping) -> BatchConfig | None:
+        """Return the batch config for this stream.
+
+        `analytics_batch_config` takes precedence over the tap-wide
+        `batch_config`, so analytics can be batched on their own.
+
+        Args:
+            config: Tap configuration dictionary.
+
+        Returns:
+            Batch config for this stream.
+        """
+        raw = config.get("analytics_batch_config") or config.get("batch_config")
+        return BatchConfig.from_dict(raw) if raw else None
+
+    def get_batches(
+        self,
+        batch_config: BatchConfig,
+        context: Context | None = None,
+    ) -> t.Iterable[tuple[BaseBatchFileEncoding, list[str]]]:
+        """Write typed batch files of analytics rows.
+
+        Args:
+            batch_config: Batch config for this stream.
+            context: Stream partition or context dictionary.
+
+        Yields:
+            A tuple of (encoding, manifest) for each batch.
+        """
+        if batch_config.encoding.format == "parquet":
+            batcher = TypedParquetBatcher(
+                tap_name=self.tap_name,
+                stream_name=self.name,
+                batch_config=batch_config,
+                schema=self.schema,
+            )
+        else:
+            batcher = Batcher(
+                tap_name=self.tap_name,
+                stream_name=self.name,
+                batch_config=batch_config,
+            )
+        records = (
+            record
+            for record in self._sync_records(context, write_messages=False)
+            if not self.is_unchanged(record)
+        )
+        for manifest in batcher.get_batches(records=records):
+            yield batch_config.encoding, manifest
@@ -6,7 +6,6 @@ import typing as t
 from datetime import timezone
 from importlib import resources
 
-import pendulum
 from singer_sdk.typing import (
     IntegerType,
     ObjectType,
@@ -16,21 +15,27 @@ from singer_sdk.typing import (
 )
 
 from tap_linkedin_ads.streams.ad_analytics.ad_analytics_base import AdAnalyticsBase
+from tap_linkedin_ads.streams.ad_analytics.rollups import AdAnalyticsRollupStream
 from tap_linkedin_ads.streams.streams import CampaignsStream
 
-if t.TYPE_CHECKING:
-    from singer_sdk.helpers.types import Context
-
 SCHEMAS_DIR = resources.files(__package__) / "schemas"
 UTC = timezone.utc
 
 
-class _AdAnalyticsByCampaignInit(AdAnalyticsBase):
+class AdAnalyticsByCampaignStream(AdAnalyticsBase):
     """https://docs.microsoft.com/en-us/linkedin/marketing/integrations/ads-reporting/ads-reporting#analytics-finder."""
 
-    name = "AdAnalyticsByCampaignInit"
+    name = "ad_analytics_by_campaign"
     parent_stream_type = CampaignsStream
 
+    pivot = "CAMPAIGN"
+    facet = "campaigns"
+    facet_urn_type = "sponsoredCampaign"
+    context_key = "campaign_id"
+    status_key = "campaign_status"
+    state_partitioning_keys: t.ClassVar[list[str]] = ["campaign_id"]
+    primary_keys: t.ClassVar[list[str]] = ["campaign_id", "day"]
+
     schema = PropertiesList(
         Property("campaign_id", StringType),
         Property("documentCompletions", IntegerType),
@@ -141,152 +146,24 @@ class _AdAnalyticsByCampaignInit(AdAnalyticsBase):
         Property("viralVideoViews", IntegerType),
     ).to_dict()
 
-    @property
-    def adanalyticscolumns(self) -> list[str]:
-        return [
-            "viralLandingPageClicks,viralExternalWebsitePostClickConversions,externalWebsiteConversions,viralVideoFirstQuartileCompletions,leadGenerationMailContactInfoShares,clicks,viralClicks,shares,viralFullScreenPlays,videoMidpointCompletions,viralCardClicks,viralExternalWebsitePostViewConversions,viralTotalEngagements,viralCompanyPageClicks,actionClicks,viralShares,videoCompletions,comments,externalWebsitePostViewConversions,dateRange",
-            "costInUsd,landingPageClicks,oneClickLeadFormOpens,talentLeads,sends,viralOneClickLeadFormOpens,conversionValueInLocalCurrency,viralFollows,otherEngagements,viralVideoCompletions,cardImpressions,leadGenerationMailInterestedClicks,opens,totalEngagements,videoViews,viralImpressions,viralVideoViews,commentLikes,viralDocumentThirdQuartileCompletions,viralLikes",
-            "adUnitClicks,videoThirdQuartileCompletions,cardClicks,likes,viralComments,viralVideoMidpointCompletions,viralVideoThirdQuartileCompletions,oneClickLeads,fullScreenPlays,viralCardImpressions,follows,videoStarts,videoFirstQuartileCompletions,textUrlClicks,reactions,viralReactions,externalWebsitePostClickConversions,viralOtherEngagements,costInLocalCurrency",
-            "viralVideoStarts,viralRegistrations,viralJobApplyClicks,viralJobApplications,jobApplications,jobApplyClicks,viralExternalWebsiteConversions,postViewRegistrations,companyPageClicks,documentCompletions,documentFirstQuartileCompletions,documentMidpointCompletions,documentThirdQuartileCompletions,downloadClicks,viralDocumentCompletions,viralDocumentFirstQuartileCompletions,viralDocumentMidpointCompletions,approximateUniqueImpressions,viralDownloadClicks,impressions",
-        ]
-
-    def get_url_params(
-        self,
-        context: dict | None,
-        next_page_token: t.Any | None,  # noqa: ANN401
-    ) -> dict[str, t.Any]:
-        """Return a dictionary of values to be used in URL parameterization.
-
-        Args:
-            context: The stream context.
-            next_page_token: The next page index or value.
-
-        Returns:
-            A dictionary of URL query parameters.
-        """
-        return {
-            "q": "analytics",
-            **super().get_url_params(context, next_page_token),
-        }
-
-    def get_unencoded_params(self, context: Context) -> dict:
-        """Return a dictionary of unencoded params.
-
-        Args:
-            context: The stream context.
-
-        Returns:
-            A dictionary of URL query parameters.
-        """
-        start_date = pendulum.parse(self.config["start_date"])
-        end_date = pendulum.parse(self.config["end_date"])
-        return {
-            "pivot": "(value:CAMPAIGN)",
-            "timeGranularity": "(value:DAILY)",
-            "campaigns": (
-                f"List(urn%3Ali%3AsponsoredCampaign%3A{context['campaign_id']})"
-            ),
-            "dateRange": (
-                f"(start:(year:{start_date.year},month:{start_date.month},day:{start_date.day}),"
-                f"end:(year:{end_date.year},month:{end_date.month},day:{end_date.day}))"
-            ),
-            "fields": self.adanalyticscolumns[0],
-        }
-
-
-class _AdAnalyticsByCampaignSecond(_AdAnalyticsByCampaignInit):
-    name = "adanalyticsbycampaign_second"
-
-    def get_unencoded_params(self, context: Context) -> dict:
-        """Return a dictionary of unencoded params.
-
-        Args:
-            context: The stream context.
-
-        Returns:
-            A dictionary of URL query parameters.
-        """
-        return {
-            **super().get_unencoded_params(context),
-            # Overwrite fields with this column subset
-            "fields": self.adanalyticscolumns[0],
-        }
-
-
-class _AdAnalyticsByCampaignThird(_AdAnalyticsByCampaignInit):
-    name = "adanalyticsbycampaign_third"
-
-    def get_unencoded_params(self, context: Context) -> dict:
-        """Return a dictionary of unencoded params.
-
-        Args:
-            context: The stream context.
-
-        Returns:
-            A dictionary of URL query parameters.
-        """
-        return {
-            **super().get_unencoded_params(context),
-            # Overwrite fields with this column subset
-            "fields": self.adanalyticscolumns[3],
-        }
-
-
-class AdAnalyticsByCampaignStream(_AdAnalyticsByCampaignInit):
-    """https://docs.microsoft.com/en-us/linkedin/marketing/integrations/ads-reporting/ads-reporting#analytics-finder."""
-
-    name = "ad_analytics_by_campaign"
-
-    def get_unencoded_params(self, context: Context) -> dict:
-        """Return a dictionary of unencoded params.
-
-        Args:
-            context: The stream context.
-
-        Returns:
-            A dictionary of URL query parameters.
-        """
-        return {
-            **super().get_unencoded_params(context),
-            # Overwrite fields with this column subset
-            "fields": self.adanalyticscolumns[1],
-        }
 
-    def get_records(self, context: dict | None) -> t.Iterable[dict[str, t.Any]]:
-        """Return a dictionary of records from adAnalytics classes.
+class AdAnalyticsByCampaignMonthlyStream(
+    AdAnalyticsRollupStream,
+    AdAnalyticsByCampaignStream,
+):
+    """Monthly totals of `ad_analytics_by_campaign`."""
 
-        Combines request columns from multiple calls to the api, which are limited to 20
-        columns each.
+    name = "ad_analytics_by_campaign_monthly"
+    source_stream_name = "ad_analytics_by_campaign"
+    period = "MONTHLY"
 
-        Uses `merge_dicts` to combine responses from each class
-        super().get_records calls only the records from the adAnalyticsByCampaign class
-        zip() Iterates over the records of adAnalytics classes and merges them with
-        merge_dicts() function list() converts each stream context into lists
 
-        Args:
-            context: The stream context.
+class AdAnalyticsByCampaignLifetimeStream(
+    AdAnalyticsRollupStream,
+    AdAnalyticsByCampaignStream,
+):
+    """Totals of `ad_analytics_by_campaign` over the whole date range."""
 
-        Returns:
-            A dictionary of records given from adAnalytics streams
-        """
-        adanalyticsinit_stream = _AdAnalyticsByCampaignInit(
-            self._tap,
-            schema={"properties": {}},
-        )
-        adanalyticsecond_stream = _AdAnalyticsByCampaignSecond(
-            self._tap,
-            schema={"properties": {}},
-        )
-        adanalyticsthird_stream = _AdAnalyticsByCampaignThird(
-            self._tap,
-            schema={"properties": {}},
-        )
-        return [
-            self.merge_dicts(x, y, z, p)
-            for x, y, z, p in zip(
-                list(adanalyticsinit_stream.get_records(context)),
-                list(super().get_records(context)),
-                list(adanalyticsecond_stream.get_records(context)),
-                list(adanalyticsthird_stream.get_records(context)),
-            )
-        ]
+    name = "ad_analytics_by_campaign_lifetime"
+    source_stream_name = "ad_analytics_by_campaign"
+    period = "ALL"
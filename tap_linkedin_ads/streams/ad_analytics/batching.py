@@ -0,0 +1,203 @@
+"""Typed batch files for the ad analytics streams."""
+
+from __future__ import annotations
+
+import copy
+import decimal
+import typing as t
+from uuid import uuid4
+
+from singer_sdk.batch import BaseBatcher, lazy_chunked_generator
+
+if t.TYPE_CHECKING:
+    import pyarrow as pa
+    from singer_sdk.helpers._batch import BatchConfig
+
+# Metrics the API returns as strings even though they hold numbers.
+DECIMAL_METRICS = frozenset(
+    {
+        "conversionValueInLocalCurrency",
+        "costInLocalCurrency",
+        "costInUsd",
+        "jobApplications",
+        "jobApplyClicks",
+        "postViewJobApplications",
+        "postViewRegistrations",
+        "registrations",
+        "viralJobApplications",
+        "viralJobApplyClicks",
+        "viralRegistrations",
+    },
+)
+
+# Precision and scale of decimal Parquet columns. Costs often have 16 decimal
+# places, and longer values are rounded half to even.
+DECIMAL_PRECISION = 38
+DECIMAL_SCALE = 18
+_DECIMAL_QUANTUM = decimal.Decimal(1).scaleb(-DECIMAL_SCALE)
+_DECIMAL_CONTEXT = decimal.Context(
+    prec=DECIMAL_PRECISION,
+    rounding=decimal.ROUND_HALF_EVEN,
+)
+
+
+def round_decimal(value: decimal.Decimal) -> decimal.Decimal:
+    """Round a decimal to the scale of decimal Parquet columns, if longer.
+
+    Args:
+        value: The decimal.
+
+    Returns:
+        The decimal, with at most `DECIMAL_SCALE` decimal places.
+    """
+    exponent = value.as_tuple().exponent
+    if not isinstance(exponent, int) or exponent >= -DECIMAL_SCALE:
+        return value
+    return value.quantize(_DECIMAL_QUANTUM, context=_DECIMAL_CONTEXT)
+
+
+def typed_schema(schema: dict) -> dict:
+    """Return a copy of an analytics schema with numeric and date types.
+
+    Args:
+        schema: The JSON schema of an analytics stream.
+
+    Returns:
+        The schema used when the stream is written as batch files.
+    """
+    schema = copy.deepcopy(schema)
+    properties = schema.get("properties", {})
+    for name in DECIMAL_METRICS & properties.keys():
+        if "string" in properties[name].get("type", []):
+            properties[name] = {"type": ["number", "null"]}
+    if "day" in properties:
+        properties["day"] = {"type": ["string", "null"], "format": "date-time"}
+    return schema
+
+
+def _arrow_type(prop: dict) -> pa.DataType:
+    """Return the Arrow type of a JSON schema property.
+
+    Args:
+        prop: The JSON schema of a single property.
+
+    Returns:
+        The matching Arrow data type.
+    """
+    import pyarrow as pa
+
+    types = prop.get("type", [])
+    types = [types] if isinstance(types, str) else types
+    if "object" in types:
+        return pa.struct(
+            [
+                pa.field(name, _arrow_type(sub))
+                for name, sub in prop.get("properties", {}).items()
+            ],
+        )
+    if "array" in types:
+        return pa.list_(_arrow_type(prop.get("items", {})))
+    if prop.get("format") == "date-time":
+        return pa.timestamp("us", tz="UTC")
+    scalars = {
+        "integer": pa.int64(),
+        "number": pa.decimal128(DECIMAL_PRECISION, DECIMAL_SCALE),
+        "boolean": pa.bool_(),
+    }
+    return next((scalars[name] for name in types if name in scalars), pa.string())
+
+
+def arrow_schema(schema: dict) -> pa.Schema:
+    """Return the Arrow schema matching a stream's JSON schema.
+
+    Args:
+        schema: The JSON schema of the stream.
+
+    Returns:
+        An Arrow schema with one field per stream property.
+    """
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            pa.field(name, _arrow_type(prop))
+            for name, prop in schema.get("properties", {}).items()
+        ],
+    )
+
+
+class TypedParquetBatcher(BaseBatcher):
+    """Parquet batcher writing columns typed from the stream schema.
+
+    The SDK Parquet batcher infers column types from each chunk, which leaves
+    numeric metrics as strings and may change types between files.
+    """
+
+    def __init__(
+        self,
+        tap_name: str,
+        stream_name: str,
+        batch_config: BatchConfig,
+        schema: dict,
+    ) -> None:
+        """Initialize the batcher.
+
+        Args:
+            tap_name: The name of the tap.
+            stream_name: The name of the stream.
+            batch_config: The batch configuration.
+            schema: The JSON schema of the stream.
+        """
+        super().__init__(tap_name, stream_name, batch_config)
+        self.schema = schema
+
+    def get_batches(self, records: t.Iterator[dict]) -> t.Iterator[list[str]]:
+        """Yield manifest of batches.
+
+        Args:
+            records: The records to batch.
+
+        Yields:
+            A list of file paths (called a manifest).
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table_schema = arrow_schema(self.schema)
+        # IDs copied from the stream context may be integers
+        string_fields = [
+            field.name for field in table_schema if pa.types.is_string(field.type)
+        ]
+        decimal_fields = [
+            field.name for field in table_schema if pa.types.is_decimal(field.type)
+        ]
+        sync_id = f"{self.tap_name}--{self.stream_name}-{uuid4()}"
+        prefix = self.batch_config.storage.prefix or ""
+        compression = self.batch_config.encoding.compression
+        for i, chunk in enumerate(
+            lazy_chunked_generator(records, self.batch_config.batch_size),
+            start=1,
+        ):
+            filename = f"{prefix}{sync_id}={i}.parquet"
+            if compression == "gzip":
+                filename = f"{filename}.gz"
+            rows = list(chunk)
+            for row in rows:
+                for name in string_fields:
+                    value = row.get(name)
+                    if value is not None and not isinstance(value, str):
+                        row[name] = str(value)
+                for name in decimal_fields:
+                    value = row.get(name)
+                    if isinstance(value, decimal.Decimal):
+                        row[name] = round_decimal(value)
+            table = pa.Table.from_pylist(rows, schema=table_schema)
+            with self.batch_config.storage.fs() as fs:
+                with fs.open(filename, "wb") as f:
+                    pq.write_table(
+                        table,
+                        f,
+                        compression="GZIP" if compression == "gzip" else "snappy",
+                    )
+                file_url = fs.geturl(filename)
+            yield [file_url]
@@ -0,0 +1,77 @@
+"""Monthly and lifetime rollups of the daily analytics streams."""
+
+from __future__ import annotations
+
+import typing as t
+
+from tap_linkedin_ads.streams.ad_analytics.ad_analytics_base import AdAnalyticsBase
+
+if t.TYPE_CHECKING:
+    from singer_sdk.helpers.types import Context
+
+# Rollup periods, from finest to coarsest
+ROLLUP_PERIODS = ("MONTHLY", "ALL")
+
+
+class AdAnalyticsRollupStream(AdAnalyticsBase):
+    """Totals of an analytics stream per month or over the whole date range.
+
+    Rollups are summed from the rows of the source stream as it syncs, so they
+    cost no extra requests. When the source stream is not selected, the rows are
+    fetched by the first rollup stream of each partition instead.
+    """
+
+    source_stream_name: t.ClassVar[str]
+    period: t.ClassVar[str]
+
+    @property
+    def needs_full_range(self) -> bool:
+        """Return True, as totals must sum every window."""
+        return True
+
+    def estimate_requests(self, context: Context | None) -> int:
+        """Estimate the requests made to sync a partition, for `--plan`.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            No requests when the source stream is selected, or when a sibling
+            rollup fetches the rows, otherwise one per column group.
+        """
+        siblings = [
+            stream
+            for stream in self._tap.streams.values()
+            if getattr(stream, "source_stream_name", None) == self.source_stream_name
+            and stream.selected
+        ]
+        if self._tap.streams[self.source_stream_name].selected or (
+            siblings and siblings[0] is not self
+        ):
+            return 0
+        return super().estimate_requests(context)
+
+    def get_records(self, context: Context | None) -> t.Iterable[dict[str, t.Any]]:
+        """Return the rollup records of a partition.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            One record per period.
+        """
+        source = self._tap.streams[self.source_stream_name]
+        totals = source.pop_rollup(context, self.period)
+        if totals is None:
+            self.logger.info(
+                "No rows of %s were synced for %s, fetching them.",
+                self.source_stream_name,
+                context,
+            )
+            # Fill the totals of the sibling rollups too, so the rows are
+            # fetched once per partition
+            records = super().get_records(context)
+            for _ in source.accumulate_rollups(records, context, force=True):
+                pass
+            totals = source.pop_rollup(context, self.period)
+        return totals.rows() if totals else iter(())
@@ -0,0 +1,182 @@
+"""In-memory representation and aggregation of analytics rows."""
+
+from __future__ import annotations
+
+import typing as t
+from datetime import datetime, timezone
+from decimal import Decimal
+from functools import lru_cache
+
+_MISSING = object()
+
+# Metrics which cannot be summed across days
+NON_ADDITIVE_METRICS = frozenset({"approximateUniqueImpressions"})
+
+
+@lru_cache(maxsize=4096)
+def start_of_day(year: int, month: int, day: int) -> datetime:
+    """Return the start of a reporting day.
+
+    Args:
+        year: The year.
+        month: The month.
+        day: The day of the month.
+
+    Returns:
+        The start of the day, as a timezone-aware datetime.
+    """
+    return datetime(year, month, day).astimezone(timezone.utc)
+
+
+class RowLayout:
+    """Fixed slot layout of analytics rows, derived once from a stream schema."""
+
+    __slots__ = ("index", "names")
+
+    def __init__(self, names: t.Iterable[str]) -> None:
+        """Initialize the layout.
+
+        Args:
+            names: The property names, in slot order.
+        """
+        self.names = tuple(names)
+        self.index = {name: slot for slot, name in enumerate(self.names)}
+
+    @classmethod
+    def from_schema(cls, schema: dict) -> RowLayout:
+        """Create a layout with one slot per schema property.
+
+        Args:
+            schema: The JSON schema of the stream.
+
+        Returns:
+            The row layout.
+        """
+        return cls(schema.get("properties", {}))
+
+    def new_row(self) -> AnalyticsRow:
+        """Return an empty row using this layout.
+
+        Returns:
+            A new row.
+        """
+        return AnalyticsRow(self)
+
+
+class AnalyticsRow:
+    """Analytics row filled in place from several column groups.
+
+    Values live in a list indexed by the layout slots instead of a dict per row.
+    Keys missing from the schema are kept in a small overflow dict so that no
+    API data is dropped.
+    """
+
+    __slots__ = ("extra", "layout", "values")
+
+    def __init__(self, layout: RowLayout) -> None:
+        """Initialize an empty row.
+
+        Args:
+            layout: The slot layout of the row.
+        """
+        self.layout = layout
+        self.values: list[t.Any] = [_MISSING] * len(layout.names)
+        self.extra: dict[str, t.Any] | None = None
+
+    def update(self, data: t.Mapping[str, t.Any]) -> None:
+        """Copy the values of a column group into the row.
+
+        Args:
+            data: A record holding a subset of the row columns.
+        """
+        index = self.layout.index
+        values = self.values
+        for name, value in data.items():
+            slot = index.get(name)
+            if slot is not None:
+                values[slot] = value
+            elif self.extra is None:
+                self.extra = {name: value}
+            else:
+                self.extra[name] = value
+
+    def to_dict(self) -> dict[str, t.Any]:
+        """Return the row as a record dict.
+
+        Returns:
+            The record, with only the columns that were set.
+        """
+        record = {
+            name: value
+            for name, value in zip(self.layout.names, self.values)
+            if value is not _MISSING
+        }
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+
+class PeriodTotals:
+    """Running totals of analytics rows per month, or over the whole range.
+
+    Only the totals of each period are kept, not the rows themselves.
+    """
+
+    def __init__(self, period: str, metrics: t.Mapping[str, bool]) -> None:
+        """Initialize the totals.
+
+        Args:
+            period: `MONTHLY` or `ALL`.
+            metrics: The additive metrics, mapped to whether they are emitted as
+                strings.
+        """
+        self.period = period
+        self.metrics = metrics
+        self._buckets: dict[tuple[int, int] | None, dict[str, t.Any]] = {}
+        self._ranges: dict[tuple[int, int] | None, list[tuple[int, int, int]]] = {}
+
+    def add(self, row: t.Mapping[str, t.Any]) -> None:
+        """Add a row to the totals of its period.
+
+        Args:
+            row: An analytics record with a `dateRange`.
+        """
+        date_range = row.get("dateRange") or {}
+        start = date_range.get("start")
+        if not start:
+            return
+        end = date_range.get("end") or start
+        first = (start["year"], start["month"], start["day"])
+        last = (end["year"], end["month"], end["day"])
+        key = first[:2] if self.period == "MONTHLY" else None
+
+        totals = self._buckets.setdefault(key, {})
+        bounds = self._ranges.setdefault(key, [first, last])
+        bounds[0] = min(bounds[0], first)
+        bounds[1] = max(bounds[1], last)
+        for name in self.metrics:
+            value = row.get(name)
+            if value is None or isinstance(value, bool):
+                continue
+            if isinstance(value, str):
+                value = Decimal(value)
+            totals[name] = totals.get(name, 0) + value
+
+    def rows(self) -> t.Iterator[dict[str, t.Any]]:
+        """Return one record per period, in date order.
+
+        Yields:
+            The period totals, with the covered `dateRange` and the period `day`.
+        """
+        for key in sorted(self._buckets, key=lambda k: k or (0, 0)):
+            first, last = self._ranges[key]
+            record = {
+                name: str(value) if self.metrics[name] else value
+                for name, value in self._buckets[key].items()
+            }
+            record["dateRange"] = {
+                "start": dict(zip(("year", "month", "day"), first)),
+                "end": dict(zip(("year", "month", "day"), last)),
+            }
+            record["day"] = start_of_day(*first[:2], 1 if key else first[2])
+            yield record
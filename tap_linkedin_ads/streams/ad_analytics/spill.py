@@ -0,0 +1,104 @@
+"""On-disk store for merging analytics column groups that outgrow memory."""
+
+from __future__ import annotations
+
+import itertools
+import pickle
+import sqlite3
+import tempfile
+import typing as t
+from pathlib import Path
+
+# Rows read and written per statement while merging a column group
+CHUNK_SIZE = 1000
+
+
+def _chunks(records: t.Iterable[dict]) -> t.Iterator[list[dict]]:
+    iterator = iter(records)
+    while chunk := list(itertools.islice(iterator, CHUNK_SIZE)):
+        yield chunk
+
+
+class SpilledRows:
+    """Partial analytics rows kept in a temporary SQLite database.
+
+    Rows are addressed by their position in the first column group, and are
+    read back in that order, like the in-memory merge.
+    """
+
+    def __init__(self, directory: str | None = None) -> None:
+        """Create the temporary database.
+
+        Args:
+            directory: Directory of the database file, defaults to the system
+                temporary directory.
+        """
+        self._tmpdir = tempfile.TemporaryDirectory(
+            prefix="tap-linkedin-ads-",
+            dir=directory,
+        )
+        self._db = sqlite3.connect(Path(self._tmpdir.name) / "rows.db")
+        self._db.execute("PRAGMA journal_mode = OFF")
+        self._db.execute("PRAGMA synchronous = OFF")
+        self._db.execute(
+            "CREATE TABLE rows (pos INTEGER PRIMARY KEY, data BLOB)",
+        )
+        self.count = 0
+        self.matched = 0
+
+    def extend(self, records: t.Iterable[dict]) -> None:
+        """Add rows of the first column group.
+
+        Args:
+            records: The records, in API order.
+        """
+        for chunk in _chunks(records):
+            self._db.executemany(
+                "INSERT INTO rows VALUES (?, ?)",
+                (
+                    (self.count + offset, pickle.dumps(record))
+                    for offset, record in enumerate(chunk)
+                ),
+            )
+            self.count += len(chunk)
+        self.matched = self.count
+
+    def update(self, records: t.Iterable[dict]) -> None:
+        """Merge a further column group into the rows, by position.
+
+        Args:
+            records: The records of the column group, in API order.
+        """
+        matched = 0
+        for chunk in _chunks(records):
+            stored = self._db.execute(
+                "SELECT data FROM rows WHERE pos >= ? AND pos < ? ORDER BY pos",
+                (matched, matched + len(chunk)),
+            ).fetchall()
+            updates = []
+            for offset, ((data,), record) in enumerate(zip(stored, chunk)):
+                row = pickle.loads(data)  # noqa: S301
+                row.update(record)
+                updates.append((pickle.dumps(row), matched + offset))
+            self._db.executemany("UPDATE rows SET data = ? WHERE pos = ?", updates)
+            matched += len(updates)
+        # Rows missing from any column group are dropped, like with `zip`
+        self.matched = min(self.matched, matched)
+
+    def rows(self) -> t.Iterator[dict]:
+        """Return the merged rows, in the order of the first column group.
+
+        Yields:
+            The merged records.
+        """
+        cursor = self._db.execute(
+            "SELECT data FROM rows WHERE pos < ? ORDER BY pos",
+            (self.matched,),
+        )
+        for (data,) in cursor:
+            yield pickle.loads(data)  # noqa: S301
+
+    def close(self) -> None:
+        """Delete the database."""
+        self._db.close()
+        self._tmpdir.cleanup()
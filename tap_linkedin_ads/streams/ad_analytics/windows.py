@@ -0,0 +1,83 @@
+"""Date windows of analytics requests, and the date ranges already synced."""
+
+from __future__ import annotations
+
+import datetime
+import typing as t
+
+ONE_DAY = datetime.timedelta(days=1)
+
+DateRange = tuple[datetime.date, datetime.date]
+
+
+def date_windows(
+    start: datetime.date,
+    end: datetime.date,
+    days: int | None,
+) -> list[DateRange]:
+    """Split a date range into windows, newest first.
+
+    Args:
+        start: The first day.
+        end: The last day, included.
+        days: The number of days per window, or None for a single window.
+
+    Returns:
+        The first and last day of each window, from the most recent one.
+    """
+    if not days:
+        return [(start, end)]
+    windows = []
+    window_end = end
+    while window_end >= start:
+        window_start = max(window_end - datetime.timedelta(days=days - 1), start)
+        windows.append((window_start, window_end))
+        window_end = window_start - ONE_DAY
+    return windows
+
+
+def parse_ranges(ranges: t.Iterable[t.Sequence[str]]) -> list[DateRange]:
+    """Parse date ranges kept in the state.
+
+    Args:
+        ranges: The first and last day of each range, as ISO dates.
+
+    Returns:
+        The date ranges.
+    """
+    return [
+        (datetime.date.fromisoformat(first), datetime.date.fromisoformat(last))
+        for first, last in ranges
+    ]
+
+
+def add_range(ranges: list[DateRange], new: DateRange) -> list[DateRange]:
+    """Add a date range, merging overlapping and adjacent ranges.
+
+    Args:
+        ranges: Disjoint date ranges.
+        new: The date range to add.
+
+    Returns:
+        Disjoint, sorted date ranges covering the same days plus `new`.
+    """
+    merged: list[DateRange] = []
+    for first, last in sorted([*ranges, new]):
+        if merged and first <= merged[-1][1] + ONE_DAY:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def is_covered(ranges: t.Iterable[DateRange], window: DateRange) -> bool:
+    """Check whether a window lies within one of the date ranges.
+
+    Args:
+        ranges: Disjoint, merged date ranges.
+        window: The window.
+
+    Returns:
+        True if every day of the window is covered.
+    """
+    return any(first <= window[0] and window[1] <= last for first, last in ranges)
@@ -2,22 +2,70 @@
 
 from __future__ import annotations
 
+import contextlib
+import datetime
+import random
 import typing as t
+from email.utils import parsedate_to_datetime
 from functools import cached_property
+from urllib.parse import quote
 
+import backoff
 from singer_sdk import metrics
 from singer_sdk.authenticators import BearerTokenAuthenticator
+from singer_sdk.exceptions import RetriableAPIError
 from singer_sdk.helpers.jsonpath import extract_jsonpath
 from singer_sdk.pagination import BaseAPIPaginator  # noqa: TCH002  # noqa: TCH002
 from singer_sdk.streams import RESTStream
 
 from tap_linkedin_ads.auth import LinkedInAdsOAuthAuthenticator
+from tap_linkedin_ads.latency import timed_send
+from tap_linkedin_ads.prefetch import prefetch
+from tap_linkedin_ads.snapshots import content_hash
+from tap_linkedin_ads.tracing import KIND_CLIENT, current_span
+from tap_linkedin_ads.urn import make_urn, parse_urn
+
+# Default root URL of the API, under which the `/rest` and `/v2` endpoints live
+API_URL = "https://api.linkedin.com"
+
+# Entities fetched per BATCH_GET request
+BATCH_GET_MAX_IDS = 100
+# Longest BATCH_GET URL sent, below the limits of the API and proxies
+BATCH_GET_MAX_URL_LENGTH = 4000
+
+# Longest `Retry-After` wait obeyed, as a multiple of `retry_backoff_seconds`
+MAX_RETRY_AFTER_BACKOFFS = 30
 
 if t.TYPE_CHECKING:
     import requests
+    from backoff.types import Details
     from singer_sdk.helpers.types import Auth, Context
 
 
+def retry_after(response: requests.Response | None) -> float | None:
+    """Return the seconds a response asks to wait before retrying, if any.
+
+    Args:
+        response: The response, or None for errors without one.
+
+    Returns:
+        The `Retry-After` header value in seconds, from either a number of
+        seconds or a date, or None if the header is missing or invalid.
+    """
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((date - datetime.datetime.now(tz=date.tzinfo)).total_seconds(), 0)
+
+
 class LinkedInAdsStreamBase(RESTStream):
     """LinkedInAds stream class."""
 
@@ -28,10 +76,26 @@ class LinkedInAdsStreamBase(RESTStream):
     # Update this value if necessary or override `get_new_paginator`.
     next_page_token_jsonpath = "$.metadata.nextPageToken"  # noqa: S105
 
+    # Fields filled from the ID of a URN field, as {field: (urn_field, urn_type)}
+    urn_id_fields: t.ClassVar[dict[str, tuple[str, str]]] = {}
+
+    # Whether records are compared with the snapshot store before being emitted
+    change_detection: t.ClassVar[bool] = False
+    # Fields left out of the comparison, e.g. modification timestamps
+    snapshot_ignored_fields: t.ClassVar[frozenset[str]] = frozenset()
+
+    # Partitions of higher priority streams sync first under a request budget
+    priority: t.ClassVar[int] = 1
+
+    # Whether entities can be fetched by ID with BATCH_GET, via `refresh_ids`
+    supports_batch_get: t.ClassVar[bool] = False
+    # The URN entity type of BATCH_GET IDs, or None for plain IDs
+    batch_get_urn_type: t.ClassVar[str | None] = None
+
     @property
     def url_base(self) -> str:
         """Return the API URL root, configurable via tap settings."""
-        return "https://api.linkedin.com/rest"
+        return self.config.get("api_url", API_URL).rstrip("/") + "/rest"
 
     @cached_property
     def authenticator(self) -> Auth:
@@ -97,6 +161,146 @@ class LinkedInAdsStreamBase(RESTStream):
         """
         yield from extract_jsonpath(self.records_jsonpath, input=response.json())
 
+    @cached_property
+    def integer_properties(self) -> frozenset[str]:
+        """Return the names of the integer properties in the schema."""
+        return frozenset(
+            name
+            for name, prop in self.schema.get("properties", {}).items()
+            if "integer" in prop.get("type", [])
+        )
+
+    def post_process(self, row: dict, context: Context | None = None) -> dict | None:
+        """Fill ID fields from URN fields, interning the URNs.
+
+        Args:
+            row: Individual record in the stream.
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The resulting record dict, or `None` if the record should be excluded.
+        """
+        for field, (urn_field, urn_type) in self.urn_id_fields.items():
+            value = row.get(urn_field)
+            parsed = parse_urn(value) if isinstance(value, str) else None
+            if parsed is None:
+                continue
+            row[urn_field] = parsed.urn
+            if parsed.entity_type != urn_type:
+                continue
+            # IDs of some entity types, e.g. people, are not numeric
+            if field in self.integer_properties and parsed.id.isdigit():
+                row[field] = int(parsed.id)
+            else:
+                row[field] = parsed.id
+        return super().post_process(row, context)
+
+    def is_unchanged(self, record: dict) -> bool:
+        """Check whether a record equals the version last emitted.
+
+        Only selected fields count, except `snapshot_ignored_fields`.
+
+        Args:
+            record: The record.
+
+        Returns:
+            True if the snapshot store holds the same content for this record.
+        """
+        store = self._tap.snapshot_store
+        if store is None or not self.change_detection or not self.primary_keys:
+            return False
+        compared = {
+            name: value
+            for name, value in record.items()
+            if name not in self.snapshot_ignored_fields
+            and self.mask.get(("properties", name), True)
+        }
+        key = [record.get(name) for name in self.primary_keys]
+        return not store.changed(self.name, key, content_hash(compared))
+
+    def _write_record_message(self, record: dict) -> None:
+        """Write a RECORD message, unless the record did not change.
+
+        Unchanged records are still processed, so their child streams sync and
+        the bookmark advances.
+
+        Args:
+            record: A single stream record.
+        """
+        self._tap.progress.record(self.name)
+        if not self.is_unchanged(record):
+            super()._write_record_message(record)
+
+    def estimate_requests(self, context: Context | None) -> int:
+        """Estimate the requests made to sync a partition, for `--plan`.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The number of BATCH_GET requests of `refresh_ids`, otherwise one,
+            assuming a single page.
+        """
+        ids = self.partition_refresh_ids(context)
+        if ids is None:
+            return 1
+        return sum(1 for _ in self.batch_get_chunks(self.get_url(context), ids))
+
+    def partition_priority(self, context: Context | None) -> tuple[int, int]:  # noqa: ARG002
+        """Return the scheduling priority of a partition, highest first.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The stream priority, from `stream_priorities` or `priority`, and the
+            priority of the partition among the stream's partitions.
+        """
+        priorities = self.config.get("stream_priorities") or {}
+        return priorities.get(self.name, self.priority), 0
+
+    def sync(self, context: Context | None = None) -> None:
+        """Sync a partition of the stream, within its trace span.
+
+        The partition also counts in the progress of the run, and in the memory
+        report if enabled.
+
+        Args:
+            context: Stream partition or context dictionary.
+        """
+        progress = self._tap.progress
+        parent = self.parent_stream_type.name if self.parent_stream_type else None
+        progress.start(self.name, parent)
+        try:
+            with contextlib.ExitStack() as stack:
+                stack.enter_context(self._tap.tracer.partition(self.name, context))
+                profiler = self._tap.memory_profiler
+                if profiler is not None:
+                    stack.enter_context(profiler.partition(self.name, context))
+                super().sync(context)
+        finally:
+            progress.finish(self.name)
+
+    def _sync_children(self, child_context: Context | None) -> None:
+        """Sync the child streams of a record, or queue them under a budget.
+
+        Args:
+            child_context: The context of the child streams.
+        """
+        children = [
+            child_stream
+            for child_stream in self.child_streams
+            if child_stream.selected or child_stream.has_selected_descendents
+        ]
+        for child_stream in children:
+            self._tap.progress.discover(child_stream.name, self.name)
+        scheduler = self._tap.scheduler
+        if scheduler is None or child_context is None:
+            super()._sync_children(child_context)
+            return
+        for child_stream in children:
+            scheduler.push(child_stream, dict(child_context))
+
     def get_unencoded_params(self, context: Context) -> dict:  # noqa: ARG002
         """Return a dictionary of unencoded params.
 
@@ -108,56 +312,420 @@ class LinkedInAdsStreamBase(RESTStream):
         """
         return {}
 
-    def request_records(self, context: Context | None) -> t.Iterable[dict]:
+    def validate_response(self, response: requests.Response) -> None:
+        """Validate a response, retrying the ones cut short.
+
+        Args:
+            response: The HTTP response.
+
+        Raises:
+            RetriableAPIError: If the body is shorter than its Content-Length,
+                e.g. when the connection dropped, or the request is retriable.
+        """
+        super().validate_response(response)
+        expected = response.headers.get("Content-Length")
+        tell = getattr(response.raw, "tell", None)
+        if expected is not None and tell is not None and tell() < int(expected):
+            msg = (
+                f"Truncated response of {tell()} out of {expected} bytes for path: "
+                f"{self.path}"
+            )
+            raise RetriableAPIError(msg, response)
+
+    def backoff_wait_generator(self) -> t.Generator[float, None, None]:
+        """Wait exponentially longer between retries, unless the API says how long.
+
+        Yields:
+            The seconds to wait before each retry, from the `Retry-After` header
+            of the failed response if set, up to `MAX_RETRY_AFTER_BACKOFFS` times
+            `retry_backoff_seconds`.
+        """
+        factor = self.config.get("retry_backoff_seconds", 2)
+        max_retry_after = factor * MAX_RETRY_AFTER_BACKOFFS
+        waits = backoff.expo(factor=factor)
+        next(waits)
+        # Advance past the initial send of the backoff decorator
+        exception = yield  # type: ignore[misc]
+        while True:
+            wait = next(waits)
+            requested = retry_after(getattr(exception, "response", None))
+            if requested is not None:
+                wait = min(requested, max_retry_after)
+            exception = yield wait
+
+    def backoff_handler(self, details: Details) -> None:
+        """Log a retry, and count it in the trace span of the page.
+
+        Args:
+            details: The backoff invocation details.
+        """
+        super().backoff_handler(details)
+        current_span().add("retries")
+
+    def backoff_jitter(self, value: float) -> float:
+        """Add a random delay of up to the wait itself, and at most one second.
+
+        Args:
+            value: The wait in seconds.
+
+        Returns:
+            The wait with jitter, so that short waits stay short.
+        """
+        return value + random.uniform(0, min(value, 1))  # noqa: S311
+
+    def _request(
+        self,
+        prepared_request: requests.PreparedRequest,
+        context: Context | None,
+    ) -> requests.Response:
+        """Send a request with an adaptive timeout, hedging slow GET requests.
+
+        Each request sent, including retries and hedges, counts against the
+        request budget of the run.
+
+        Args:
+            prepared_request: The prepared request.
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The HTTP response.
+        """
+        tracker = self._tap.latency
+        timeout = self.timeout
+        if self.config.get("adaptive_timeouts"):
+            timeout = tracker.timeout(self.path, timeout)
+        hedge_after = (
+            tracker.percentile(self.path, 0.95)
+            if self.config.get("hedge_requests") and prepared_request.method == "GET"
+            else None
+        )
+
+        scheduler = self._tap.scheduler
+        tracer = self._tap.tracer
+
+        def send(
+            request: requests.PreparedRequest,
+            *,
+            hedge: bool = False,
+        ) -> requests.Response:
+            if scheduler is not None:
+                scheduler.budget.spend()
+            self._tap.progress.request(self.name)
+            with tracer.span(
+                request.method or "GET",
+                kind=KIND_CLIENT,
+                **{"http.request.method": request.method, "url.full": request.url},
+                hedge=hedge,
+            ) as span:
+                response = timed_send(
+                    tracker,
+                    self.path,
+                    self.requests_session,
+                    request,
+                    timeout=timeout,
+                    allow_redirects=self.allow_redirects,
+                )
+                span.set(
+                    **{
+                        "http.response.status_code": response.status_code,
+                        "http.response.body.size": len(response.content),
+                    },
+                )
+                if not response.ok:
+                    span.fail(f"HTTP {response.status_code}")
+                return response
+
+        if hedge_after is None:
+            response = send(prepared_request)
+        else:
+            response = tracker.hedge(
+                lambda: send(prepared_request),
+                lambda: send(prepared_request.copy(), hedge=True),
+                hedge_after,
+            )
+        self._write_request_duration_log(
+            endpoint=self.path,
+            response=response,
+            context=context,
+            extra_tags={"url": prepared_request.path_url}
+            if self._LOG_REQUEST_METRIC_URLS
+            else None,
+        )
+        self.validate_response(response)
+        return response
+
+    def _send(
+        self,
+        decorated_request: t.Callable[..., requests.Response],
+        prepared_request: requests.PreparedRequest,
+        context: Context | None,
+    ) -> requests.Response:
+        """Send a request, sharing the response of identical GET requests.
+
+        Args:
+            decorated_request: The request function, with retries.
+            prepared_request: The prepared request.
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The HTTP response.
+        """
+        if prepared_request.method != "GET" or not self.config.get(
+            "coalesce_requests",
+            True,
+        ):
+            return decorated_request(prepared_request, context)
+        return self._tap.request_group.do(
+            prepared_request.url,
+            lambda: decorated_request(prepared_request, context),
+        )
+
+    @property
+    def refresh_ids(self) -> dict[str, list] | None:
+        """Return the IDs fetched with BATCH_GET instead of listing, if any.
+
+        Returns:
+            The IDs of each account, by account ID.
+        """
+        if not self.supports_batch_get:
+            return None
+        return (self.config.get("refresh_ids") or {}).get(self.name)
+
+    def partition_refresh_ids(self, context: Context | None) -> list | None:
+        """Return the IDs of `refresh_ids` owned by the account of a partition.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The IDs, empty for accounts owning none, or None to list entities.
+        """
+        ids_by_account = self.refresh_ids
+        if ids_by_account is None:
+            return None
+        return ids_by_account.get(str((context or {}).get("account_id")), [])
+
+    def get_records(self, context: Context | None) -> t.Iterable[dict[str, t.Any]]:
+        """Return the records of a partition, fetching `refresh_ids` by ID.
+
+        Accounts owning none of the IDs are not requested.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Yields:
+            The post-processed records.
+        """
+        ids = self.partition_refresh_ids(context)
+        if ids is None:
+            yield from super().get_records(context)
+            return
+        if not ids:
+            return
+        for record in self.batch_get(context, ids):
+            row = self.post_process(record, context)
+            if row is not None:
+                yield row
+
+    def track_records(self, records: list[dict]) -> t.Iterable[dict]:
+        """Count the records of a page in the progress, if they have children.
+
+        Args:
+            records: The records of a page, before post-processing.
+
+        Returns:
+            The records.
+        """
+        if not self.child_streams:
+            return records
+        return self._tap.progress.fetch(self.name, records)
+
+    def batch_get_chunks(self, url: str, ids: t.Iterable) -> t.Iterator[list[str]]:
+        """Split IDs into BATCH_GET requests, under the ID and URL length limits.
+
+        Args:
+            url: The URL of the collection.
+            ids: The entity IDs, or URNs.
+
+        Yields:
+            The encoded IDs of each request.
+        """
+        chunk: list[str] = []
+        length = len(url) + len("?ids=List()")
+        for entity_id in ids:
+            value = str(entity_id)
+            if self.batch_get_urn_type and not value.startswith("urn:"):
+                value = make_urn(self.batch_get_urn_type, value)
+            encoded = quote(value, safe="")
+            if chunk and (
+                len(chunk) >= BATCH_GET_MAX_IDS
+                or length + len(encoded) + 1 > BATCH_GET_MAX_URL_LENGTH
+            ):
+                yield chunk
+                chunk = []
+                length = len(url) + len("?ids=List()")
+            chunk.append(encoded)
+            length += len(encoded) + 1
+        if chunk:
+            yield chunk
+
+    def batch_get(self, context: Context | None, ids: t.Iterable) -> t.Iterator[dict]:
+        """Fetch entities by ID with Rest.li BATCH_GET requests.
+
+        IDs the API could not return, e.g. because they belong to another
+        account or were deleted, are left out.
+
+        Args:
+            context: Stream partition or context dictionary.
+            ids: The entity IDs, or URNs.
+
+        Yields:
+            The entities, as returned by the API.
+        """
+        with metrics.http_request_counter(self.name, self.path) as request_counter:
+            request_counter.context = context
+            for records in self.batch_get_pages(context, ids):
+                request_counter.increment()
+                yield from self.track_records(records)
+
+    def batch_get_pages(
+        self,
+        context: Context | None,
+        ids: t.Iterable,
+    ) -> t.Iterator[list[dict]]:
+        """Send a BATCH_GET request for each chunk of IDs.
+
+        Args:
+            context: Stream partition or context dictionary.
+            ids: The entity IDs, or URNs.
+
+        Yields:
+            The entities returned by each request.
+        """
+        url = self.get_url(context)
+        decorated_request = self.request_decorator(self._request)
+        headers = {**self.http_headers, "X-RestLi-Method": "BATCH_GET"}
+        tracer = self._tap.tracer
+        for number, chunk in enumerate(self.batch_get_chunks(url, ids), start=1):
+            prepared_request = self.build_prepared_request(
+                method="GET",
+                url=url,
+                headers=headers,
+            )
+            # Added after preparing, so the Rest.li list syntax stays unencoded
+            prepared_request.url = f"{prepared_request.url}?ids=List({','.join(chunk)})"
+            with tracer.span("page", **{"page.number": number}) as span:
+                response = self._send(decorated_request, prepared_request, context)
+                self.update_sync_costs(prepared_request, response, context)
+                body = response.json()
+                span.set(
+                    **{
+                        "page.records": len(body.get("results", {})),
+                        "page.bytes": len(response.content),
+                    },
+                )
+            if body.get("errors"):
+                self.logger.info(
+                    "BATCH_GET of %s returned no entity for %d IDs.",
+                    self.name,
+                    len(body["errors"]),
+                )
+            yield list(body.get("results", {}).values())
+
+    def list_pages(self, context: Context | None) -> t.Iterator[list[dict]]:
+        """Request each page of records of a partition, before post-processing.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The records of each response, from BATCH_GET with `refresh_ids`.
+        """
+        ids = self.partition_refresh_ids(context)
+        if ids is not None:
+            return self.batch_get_pages(context, ids)
+        return self.request_pages(context, self.get_unencoded_params(context))
+
+    def request_records(
+        self,
+        context: Context | None,
+        unencoded_params: dict | None = None,
+    ) -> t.Iterable[dict]:
         """Request records from REST endpoint(s), returning response records.
 
-        If pagination is detected, pages will be recursed automatically.
+        If pagination is detected, pages will be recursed automatically. With
+        `prefetch_pages` set, the next pages are requested in the background
+        while the records of the current page are processed.
 
         Args:
             context: Stream partition or context dictionary.
+            unencoded_params: Unencoded params to use instead of
+                `get_unencoded_params`.
 
         Yields:
             An item for every record in the response.
         """
-        paginator = self.get_new_paginator()
-        decorated_request = self.request_decorator(self._request)
-        pages = 0
+        if unencoded_params is None:
+            unencoded_params = self.get_unencoded_params(context)
+        pages = self.request_pages(context, unencoded_params)
+        depth = self.config.get("prefetch_pages", 0)
+        if depth:
+            pages = prefetch(pages, depth, self._tap.flow_control)
 
         with metrics.http_request_counter(self.name, self.path) as request_counter:
             request_counter.context = context
+            for records in pages:
+                request_counter.increment()
+                yield from self.track_records(records)
 
-            while not paginator.finished:
-                prepared_request = self.prepare_request(
-                    context,
-                    next_page_token=paginator.current_value,
-                )
-                # Patch to add unencoded params to the path and url
-                if self.get_unencoded_params(context):
-                    prepared_request.url = (
-                        prepared_request.url
-                        + "&"
-                        + "&".join(
-                            [
-                                f"{k}={v}"
-                                for k, v in self.get_unencoded_params(context).items()
-                            ],
-                        )
+    def request_pages(
+        self,
+        context: Context | None,
+        unencoded_params: dict,
+    ) -> t.Iterator[list[dict]]:
+        """Request each page of records.
+
+        Args:
+            context: Stream partition or context dictionary.
+            unencoded_params: Unencoded params added to the URL of each request.
+
+        Yields:
+            The parsed records of every response, the last one possibly empty.
+        """
+        paginator = self.get_new_paginator()
+        decorated_request = self.request_decorator(self._request)
+        tracer = self._tap.tracer
+        pages = 0
+
+        while not paginator.finished:
+            prepared_request = self.prepare_request(
+                context,
+                next_page_token=paginator.current_value,
+            )
+            # Patch to add unencoded params to the path and url
+            if unencoded_params:
+                prepared_request.url = (
+                    prepared_request.url
+                    + "&"
+                    + "&".join(
+                        [f"{k}={v}" for k, v in unencoded_params.items()],
                     )
-                resp = decorated_request(prepared_request, context)
-                request_counter.increment()
+                )
+            with tracer.span("page", **{"page.number": pages + 1}) as span:
+                resp = self._send(decorated_request, prepared_request, context)
                 self.update_sync_costs(prepared_request, resp, context)
-                records = iter(self.parse_response(resp))
-                try:
-                    first_record = next(records)
-                except StopIteration:
-                    self.logger.info(
-                        "Pagination stopped after %d pages because no records were "
-                        "found in the last response",
-                        pages,
-                    )
-                    break
-                yield first_record
-                yield from records
-                pages += 1
+                records = list(self.parse_response(resp))
+                span.set(
+                    **{"page.records": len(records), "page.bytes": len(resp.content)},
+                )
+            yield records
+            if not records:
+                self.logger.info(
+                    "Pagination stopped after %d pages because no records were "
+                    "found in the last response",
+                    pages,
+                )
+                break
+            pages += 1
 
-                paginator.advance(resp)
+            paginator.advance(resp)
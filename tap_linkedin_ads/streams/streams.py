@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import copy
 import typing as t
 from datetime import datetime, timezone
 from importlib import resources
@@ -17,7 +18,10 @@ from singer_sdk.typing import (
     StringType,
 )
 
-from tap_linkedin_ads.streams.base_stream import LinkedInAdsStreamBase
+from tap_linkedin_ads.account_cache import AccountCache
+from tap_linkedin_ads.sharding import account_in_shard
+from tap_linkedin_ads.streams.base_stream import API_URL, LinkedInAdsStreamBase
+from tap_linkedin_ads.urn import make_urn, urn_id
 
 if t.TYPE_CHECKING:
     from singer_sdk.helpers.types import Context
@@ -34,6 +38,10 @@ class LinkedInAdsStream(LinkedInAdsStreamBase):
     # Note: manually filtering in post_process since the API doesnt have filter options
     replication_method = REPLICATION_INCREMENTAL
 
+    snapshot_ignored_fields: t.ClassVar[frozenset[str]] = frozenset(
+        {"changeAuditStamps", "lastModifiedAt", "last_modified_time"},
+    )
+
     def post_process(self, row: dict, context: dict | None = None) -> dict | None:
         """Post-process each record returned by the API."""
         if "changeAuditStamps" in row:
@@ -69,7 +77,8 @@ class LinkedInAdsStream(LinkedInAdsStreamBase):
         end_date = datetime.fromisoformat(self.config["end_date"]).replace(
             tzinfo=timezone.utc
         )
-        if date >= start_date and date <= end_date:
+        # Entities listed in `refresh_ids` are synced whatever their bookmark
+        if self.refresh_ids is not None or start_date <= date <= end_date:
             return super().post_process(row, context)
         return None
 
@@ -79,6 +88,10 @@ class AccountsStream(LinkedInAdsStream):
 
     name = "accounts"
     primary_keys: t.ClassVar[list[str]] = ["id"]
+    urn_id_fields: t.ClassVar[dict[str, tuple[str, str]]] = {
+        "reference_organization_id": ("reference", "organization"),
+        "reference_person_id": ("reference", "person"),
+    }
 
     schema = PropertiesList(
         Property(
@@ -139,6 +152,16 @@ class AccountsStream(LinkedInAdsStream):
             "owner_urn": record["reference"],
         }
 
+    def post_process(self, row: dict, context: dict | None = None) -> dict | None:
+        """Post-process each record returned by the API.
+
+        Accounts outside of the configured shard are dropped, which also skips
+        all of their child streams.
+        """
+        if not account_in_shard(row["id"], self.config):
+            return None
+        return super().post_process(row, context)
+
     def get_url_params(
         self,
         context: dict | None,
@@ -159,6 +182,52 @@ class AccountsStream(LinkedInAdsStream):
             **super().get_url_params(context, next_page_token),
         }
 
+    @property
+    def account_cache_key(self) -> str:
+        """Return the key of the accounts visible with the configured credentials."""
+        credentials = self.config.get("oauth_credentials") or {}
+        return AccountCache.cache_key(
+            self.config.get("access_token") or "",
+            credentials.get("client_id") or "",
+            credentials.get("refresh_token") or "",
+        )
+
+    def request_pages(
+        self,
+        context: Context | None,
+        unencoded_params: dict,
+    ) -> t.Iterator[list[dict]]:
+        """Request each page of accounts, or reuse the cached account list.
+
+        With `account_cache_path` set, the accounts listed by a previous run are
+        used until `account_cache_ttl_hours` pass or `refresh_account_cache` is
+        set. Cached accounts are still filtered by shard and replication key.
+
+        Args:
+            context: Stream partition or context dictionary.
+            unencoded_params: Unencoded params added to the URL of each request.
+
+        Yields:
+            The accounts of every response, or all cached accounts at once.
+        """
+        cache = self._tap.account_cache
+        if cache is None:
+            yield from super().request_pages(context, unencoded_params)
+            return
+        key = self.account_cache_key
+        accounts = None if self.config.get("refresh_account_cache") else cache.get(key)
+        if accounts is not None:
+            self.logger.info("Using %d cached accounts.", len(accounts))
+            yield accounts
+            return
+
+        accounts = []
+        for records in super().request_pages(context, unencoded_params):
+            # Records are post-processed in place once yielded
+            accounts.extend(copy.deepcopy(records))
+            yield records
+        cache.set(key, accounts)
+
 
 class AccountUsersStream(LinkedInAdsStream):
     """https://docs.microsoft.com/en-us/linkedin/marketing/integrations/ads/account-structure/create-and-manage-account-users#find-ad-account-users-by-accounts."""
@@ -166,7 +235,12 @@ class AccountUsersStream(LinkedInAdsStream):
     name = "account_users"
     parent_stream_type = AccountsStream
     primary_keys: t.ClassVar[list[str]] = ["account"]
+    priority = 0
     path = "/adAccountUsers"
+    urn_id_fields: t.ClassVar[dict[str, tuple[str, str]]] = {
+        "account_id": ("account", "sponsoredAccount"),
+        "user_person_id": ("user", "person"),
+    }
 
     schema = PropertiesList(
         Property("account", StringType),
@@ -227,7 +301,7 @@ class AccountUsersStream(LinkedInAdsStream):
             A dictionary of URL query parameters.
         """
         return {
-            "accounts": f"urn:li:sponsoredAccount:{context['account_id']}",
+            "accounts": make_urn("sponsoredAccount", context["account_id"]),
         }
 
 
@@ -236,7 +310,16 @@ class CampaignsStream(LinkedInAdsStream):
 
     name = "campaigns"
     primary_keys: t.ClassVar[list[str]] = ["id"]
+    change_detection = True
+    priority = 2
+    supports_batch_get = True
     parent_stream_type = AccountsStream
+    urn_id_fields: t.ClassVar[dict[str, tuple[str, str]]] = {
+        "account_id": ("account", "sponsoredAccount"),
+        "associated_entity_organization_id": ("associatedEntity", "organization"),
+        "associated_entity_person_id": ("associatedEntity", "person"),
+        "campaign_group_id": ("campaignGroup", "sponsoredCampaignGroup"),
+    }
     next_page_token_jsonpath = (
         "$.metadata.nextPageToken"  # Or override `get_next_page_token`.  # noqa: S105
     )
@@ -389,7 +472,7 @@ class CampaignsStream(LinkedInAdsStream):
         ),
         Property("associatedEntity", StringType),
         Property("associated_entity_organization_id", IntegerType),
-        Property("associated_entity_person_id", IntegerType),
+        Property("associated_entity_person_id", StringType),
         Property(
             "runSchedule",
             ObjectType(
@@ -542,6 +625,7 @@ class CampaignsStream(LinkedInAdsStream):
         """Return a context dictionary for a child stream."""
         return {
             "campaign_id": record["id"],
+            "campaign_status": record.get("status"),
         }
 
     def post_process(self, row: dict, context: dict | None = None) -> dict | None:
@@ -549,7 +633,6 @@ class CampaignsStream(LinkedInAdsStream):
         row["run_schedule_start"] = datetime.fromtimestamp(  # noqa: DTZ006
             int(row["runSchedule"]["start"]) / 1000,
         ).isoformat()
-        row["campaign_group_id"] = int(row["campaignGroup"].split(":")[3])
         return super().post_process(row, context)
 
 
@@ -559,6 +642,11 @@ class CampaignGroupsStream(LinkedInAdsStream):
     name = "campaign_groups"
     parent_stream_type = AccountsStream
     primary_keys: t.ClassVar[list[str]] = ["id"]
+    change_detection = True
+    supports_batch_get = True
+    urn_id_fields: t.ClassVar[dict[str, tuple[str, str]]] = {
+        "account_id": ("account", "sponsoredAccount"),
+    }
 
     schema = PropertiesList(
         Property(
@@ -672,6 +760,14 @@ class CreativesStream(LinkedInAdsStream):
     name = "creatives"
     parent_stream_type = AccountsStream
     primary_keys: t.ClassVar[list[str]] = ["id"]
+    change_detection = True
+    priority = 2
+    supports_batch_get = True
+    batch_get_urn_type = "sponsoredCreative"
+    urn_id_fields: t.ClassVar[dict[str, tuple[str, str]]] = {
+        "account_id": ("account", "sponsoredAccount"),
+        "campaign_id": ("campaign", "sponsoredCampaign"),
+    }
 
     schema = PropertiesList(
         Property("account", StringType),
@@ -746,9 +842,9 @@ class CreativesStream(LinkedInAdsStream):
 
     def get_child_context(self, record: dict, context: dict | None) -> dict:  # noqa: ARG002
         """Return a context dictionary for a child stream."""
-        creative_id = record["id"].split(":")[-1]
         return {
-            "creative_id": creative_id,
+            "creative_id": urn_id(record["id"]),
+            "creative_status": record.get("intendedStatus"),
         }
 
 
@@ -758,6 +854,12 @@ class VideoAdsStream(LinkedInAdsStream):
     name = "video_ads"
     path = "/adDirectSponsoredContents"
     parent_stream_type = AccountsStream
+    priority = 0
+    urn_id_fields: t.ClassVar[dict[str, tuple[str, str]]] = {
+        "account_id": ("account", "sponsoredAccount"),
+        "content_reference_share_id": ("content_reference", "share"),
+        "content_reference_ucg_post_id": ("content_reference", "ugcPost"),
+    }
 
     schema = PropertiesList(
         Property("account", StringType),
@@ -793,7 +895,7 @@ class VideoAdsStream(LinkedInAdsStream):
     @property
     def url_base(self) -> str:
         """Return the API URL root, configurable via tap settings."""
-        return "https://api.linkedin.com/v2"
+        return self.config.get("api_url", API_URL).rstrip("/") + "/v2"
 
     def get_url_params(
         self,
@@ -814,7 +916,7 @@ class VideoAdsStream(LinkedInAdsStream):
             raise ValueError(msg)
         return {
             "q": "account",
-            "account": f"urn:li:sponsoredAccount:{context['account_id']}",
+            "account": make_urn("sponsoredAccount", context["account_id"]),
             "owner": context["owner_urn"],
             **super().get_url_params(context, next_page_token),
         }
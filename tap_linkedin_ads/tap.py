@@ -3,17 +3,49 @@
 from __future__ import annotations
 
 import datetime
+import json
+import typing as t
+from collections import Counter
+from functools import cached_property
 
+import click
 from singer_sdk import Tap
 from singer_sdk import typing as th  # JSON schema typing helpers
+from singer_sdk._singerlib import StateMessage
 
+from tap_linkedin_ads.account_cache import AccountCache
+from tap_linkedin_ads.latency import LatencyTracker
+from tap_linkedin_ads.memory import MemoryProfiler
+from tap_linkedin_ads.plan import plan_report, plan_sync
+from tap_linkedin_ads.prefetch import FlowControl
+from tap_linkedin_ads.progress import ProgressTracker
+from tap_linkedin_ads.scheduling import (
+    BudgetExhaustedError,
+    RequestBudget,
+    Scheduler,
+)
+from tap_linkedin_ads.serialization import serialize_message
+from tap_linkedin_ads.single_flight import SingleFlight
+from tap_linkedin_ads.snapshots import SnapshotStore
 from tap_linkedin_ads.streams import streams
 from tap_linkedin_ads.streams.ad_analytics.ad_analytics_by_campaign import (
+    AdAnalyticsByCampaignLifetimeStream,
+    AdAnalyticsByCampaignMonthlyStream,
     AdAnalyticsByCampaignStream,
 )
 from tap_linkedin_ads.streams.ad_analytics.ad_analytics_by_creative import (
+    AdAnalyticsByCreativeLifetimeStream,
+    AdAnalyticsByCreativeMonthlyStream,
     AdAnalyticsByCreativeStream,
 )
+from tap_linkedin_ads.streams.ad_analytics.rollups import ROLLUP_PERIODS
+from tap_linkedin_ads.streams.base_stream import API_URL
+from tap_linkedin_ads.tracing import Tracer
+
+if t.TYPE_CHECKING:
+    from singer_sdk import Stream
+    from singer_sdk._singerlib.encoding._simple import Message
+    from singer_sdk.helpers.types import Context
 
 NOW = datetime.datetime.now(tz=datetime.timezone.utc)
 
@@ -23,6 +55,9 @@ class TapLinkedInAds(Tap):
 
     name = "tap-linkedin-ads"
 
+    # Queue of child partitions, while a sync with a request budget runs
+    scheduler: Scheduler | None = None
+
     config_jsonschema = th.PropertiesList(
         th.Property(
             "access_token",
@@ -54,6 +89,15 @@ class TapLinkedInAds(Tap):
             ),
             description="LinkedIn Ads OAuth Credentials",
         ),
+        th.Property(
+            "oauth_token_cache_path",
+            th.StringType,
+            description=(
+                "Local file used to cache OAuth access tokens between runs. Runs "
+                "sharing the file skip the token request while a cached token is "
+                "valid."
+            ),
+        ),
         th.Property(
             "start_date",
             th.DateTimeType,
@@ -67,6 +111,341 @@ class TapLinkedInAds(Tap):
             default=NOW.isoformat(),
             description="The latest record date to sync",
         ),
+        th.Property(
+            "time_granularity",
+            th.StringType,
+            default="DAILY",
+            allowed_values=["DAILY", "MONTHLY", "ALL"],
+            description=(
+                "Time granularity of the analytics streams. `ALL` returns one row "
+                "per entity for the whole date range."
+            ),
+        ),
+        th.Property(
+            "analytics_rollups",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Add streams with monthly and lifetime totals of the analytics "
+                "streams, summed locally from the fetched rows. Only periods "
+                "coarser than `time_granularity` are added."
+            ),
+        ),
+        th.Property(
+            "analytics_merge_memory_mb",
+            th.NumberType,
+            default=512,
+            description=(
+                "Approximate memory used to merge the column groups of one "
+                "analytics partition. Larger partitions are merged in a temporary "
+                "on-disk database. 0 disables spilling to disk."
+            ),
+        ),
+        th.Property(
+            "analytics_spill_dir",
+            th.StringType,
+            description=(
+                "Directory of the temporary databases used to merge large "
+                "analytics partitions. Defaults to the system temporary directory."
+            ),
+        ),
+        th.Property(
+            "analytics_window_days",
+            th.IntegerType,
+            description=(
+                "Split the date range of daily analytics into windows of this many "
+                "days, requested newest first. Synced windows are recorded in the "
+                "state."
+            ),
+        ),
+        th.Property(
+            "analytics_lookback_days",
+            th.IntegerType,
+            description=(
+                "With `analytics_window_days`, skip the windows synced by previous "
+                "runs, except the ones ending within this many days of `end_date`."
+            ),
+        ),
+        th.Property(
+            "snapshot_store_path",
+            th.StringType,
+            description=(
+                "Local SQLite file of content hashes of emitted campaigns, campaign "
+                "groups, creatives and analytics rows. When set, records whose "
+                "selected fields did not change since the last run are not emitted "
+                "again."
+            ),
+        ),
+        th.Property(
+            "analytics_change_detection",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Whether analytics rows are also skipped when unchanged, once "
+                "`snapshot_store_path` is set."
+            ),
+        ),
+        th.Property(
+            "account_cache_path",
+            th.StringType,
+            description=(
+                "Local file used to cache the list of ad accounts between runs. "
+                "Runs sharing the file skip account discovery while the cached "
+                "list is fresh."
+            ),
+        ),
+        th.Property(
+            "account_cache_ttl_hours",
+            th.NumberType,
+            default=24,
+            description="Hours during which a cached account list is used.",
+        ),
+        th.Property(
+            "refresh_account_cache",
+            th.BooleanType,
+            default=False,
+            description=(
+                "List the ad accounts from the API even if the cached list is "
+                "fresh, and cache the new list."
+            ),
+        ),
+        th.Property(
+            "account_ids",
+            th.ArrayType(th.StringType),
+            description=(
+                "Only sync these ad account IDs. Useful to split large agencies "
+                "across several tap processes."
+            ),
+        ),
+        th.Property(
+            "refresh_ids",
+            th.ObjectType(
+                th.Property(
+                    "campaigns",
+                    th.ObjectType(additional_properties=th.ArrayType(th.StringType)),
+                ),
+                th.Property(
+                    "campaign_groups",
+                    th.ObjectType(additional_properties=th.ArrayType(th.StringType)),
+                ),
+                th.Property(
+                    "creatives",
+                    th.ObjectType(additional_properties=th.ArrayType(th.StringType)),
+                ),
+            ),
+            description=(
+                "IDs of the campaigns, campaign groups or creatives to sync, by "
+                "stream name and then by ad account ID. Listed streams fetch only "
+                "these entities, up to 100 per request, instead of paging through "
+                "every account, and whatever their bookmark."
+            ),
+        ),
+        th.Property(
+            "shard_index",
+            th.IntegerType,
+            description=(
+                "Zero-based index of the account shard synced by this process. "
+                "Requires `shard_count`."
+            ),
+        ),
+        th.Property(
+            "shard_count",
+            th.IntegerType,
+            description=(
+                "Total number of account shards. Accounts are assigned to shards "
+                "by a stable hash of their ID."
+            ),
+        ),
+        th.Property(
+            "analytics_batch_config",
+            th.ObjectType(
+                th.Property(
+                    "encoding",
+                    th.ObjectType(
+                        th.Property(
+                            "format",
+                            th.StringType,
+                            allowed_values=["jsonl", "parquet"],
+                            description="Format to use for batch files.",
+                        ),
+                        th.Property(
+                            "compression",
+                            th.StringType,
+                            allowed_values=["gzip", "none"],
+                            description="Compression format to use for batch files.",
+                        ),
+                    ),
+                    description=(
+                        "Specifies the format and compression of the batch files."
+                    ),
+                ),
+                th.Property(
+                    "storage",
+                    th.ObjectType(
+                        th.Property(
+                            "root",
+                            th.StringType,
+                            description="Root path to use when writing batch files.",
+                        ),
+                        th.Property(
+                            "prefix",
+                            th.StringType,
+                            description="Prefix to use when writing batch files.",
+                        ),
+                    ),
+                    description=(
+                        "Defines the storage layer to use when writing batch files"
+                    ),
+                ),
+                th.Property(
+                    "batch_size",
+                    th.IntegerType,
+                    description="Maximum number of rows per batch file.",
+                ),
+            ),
+            description=(
+                "Batch config for the analytics streams only. Metrics are written "
+                "with numeric types. Overrides `batch_config` for these streams."
+            ),
+        ),
+        th.Property(
+            "api_url",
+            th.StringType,
+            default=API_URL,
+            description=(
+                "Root URL of the LinkedIn API, e.g. a proxy or a local stand-in "
+                "server. The `/rest` and `/v2` endpoints are requested under it."
+            ),
+        ),
+        th.Property(
+            "retry_backoff_seconds",
+            th.NumberType,
+            default=2,
+            description=(
+                "Wait before retrying a failed request, doubled on each retry. "
+                "Rate limited responses wait as long as their `Retry-After` header "
+                "asks instead, up to 30 times this value."
+            ),
+        ),
+        th.Property(
+            "coalesce_requests",
+            th.BooleanType,
+            default=True,
+            description=(
+                "Make identical API requests in flight at the same time only once. "
+                "Streams asking for a URL already being requested wait for and "
+                "share its response."
+            ),
+        ),
+        th.Property(
+            "adaptive_timeouts",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Derive the timeout of each endpoint from the latencies observed "
+                "during the run, down to 30 seconds, instead of always waiting 300 "
+                "seconds."
+            ),
+        ),
+        th.Property(
+            "hedge_requests",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Send a second, identical GET request when a request takes longer "
+                "than the 95th percentile latency of its endpoint. The first "
+                "response wins."
+            ),
+        ),
+        th.Property(
+            "prefetch_pages",
+            th.IntegerType,
+            default=0,
+            description=(
+                "Number of response pages requested in the background while the "
+                "records of the current page are processed. 0, the default, "
+                "disables prefetching."
+            ),
+        ),
+        th.Property(
+            "max_pages_in_flight",
+            th.IntegerType,
+            default=16,
+            description=(
+                "Maximum number of prefetched pages waiting to be emitted, across "
+                "all streams. Fetching pauses while the target is slower."
+            ),
+        ),
+        th.Property(
+            "max_records_in_flight",
+            th.IntegerType,
+            default=50000,
+            description=(
+                "Maximum number of prefetched records waiting to be emitted, across "
+                "all streams. Each stream may always hold one page."
+            ),
+        ),
+        th.Property(
+            "daily_request_quota",
+            th.IntegerType,
+            description=(
+                "Daily number of API requests allowed for the application, used by "
+                "`--plan` to report the share of the quota a sync would use."
+            ),
+        ),
+        th.Property(
+            "request_budget",
+            th.IntegerType,
+            description=(
+                "Maximum number of API requests of a run. Partitions are synced by "
+                "stream priority, and the ones left when the budget is spent are "
+                "recorded in the state as deferred."
+            ),
+        ),
+        th.Property(
+            "stream_priorities",
+            th.ObjectType(additional_properties=th.IntegerType),
+            description=(
+                "Priorities of streams under a `request_budget`, by stream name, "
+                "overriding the defaults. Higher priorities sync first."
+            ),
+        ),
+        th.Property(
+            "progress_interval_seconds",
+            th.NumberType,
+            default=60,
+            description=(
+                "Seconds between progress reports, logged as METRIC lines with the "
+                "partitions done and expected, records and requests per second, and "
+                "ETA of each stream and of the run. 0 disables them."
+            ),
+        ),
+        th.Property(
+            "trace_path",
+            th.StringType,
+            description=(
+                "Local file the trace spans of the run are written to, as OTLP JSON "
+                "lines: the run, each stream, partition and page, and each HTTP "
+                "request, with their accounts, campaigns, creatives, sizes and "
+                "retries."
+            ),
+        ),
+        th.Property(
+            "memory_report_path",
+            th.StringType,
+            description=(
+                "Local file to write a memory report to, as JSON lines. For each "
+                "partition: RSS, peak RSS, peak traced memory and top allocation "
+                "sites. Allocations are traced with tracemalloc, which slows the "
+                "sync down, so only set it to investigate memory use."
+            ),
+        ),
+        th.Property(
+            "memory_top_allocations",
+            th.IntegerType,
+            default=10,
+            description="Number of allocation sites reported per partition.",
+        ),
         th.Property(
             "user_agent",
             th.StringType,
@@ -75,6 +454,226 @@ class TapLinkedInAds(Tap):
         ),
     ).to_dict()
 
+    @cached_property
+    def request_group(self) -> SingleFlight:
+        """Return the group coalescing identical requests of all streams."""
+        return SingleFlight()
+
+    @cached_property
+    def latency(self) -> LatencyTracker:
+        """Return the latencies of the API endpoints seen in this run."""
+        return LatencyTracker()
+
+    @cached_property
+    def flow_control(self) -> FlowControl:
+        """Return the limits on pages and records fetched ahead of emission."""
+        return FlowControl(
+            self.config.get("max_pages_in_flight"),
+            self.config.get("max_records_in_flight"),
+        )
+
+    @cached_property
+    def progress(self) -> ProgressTracker:
+        """Return the progress of the run, reported periodically."""
+        return ProgressTracker(self.config.get("progress_interval_seconds", 60))
+
+    @cached_property
+    def memory_profiler(self) -> MemoryProfiler | None:
+        """Return the memory instrumentation of partitions, if configured."""
+        path = self.config.get("memory_report_path")
+        if not path:
+            return None
+        return MemoryProfiler(path, self.config.get("memory_top_allocations", 10))
+
+    @cached_property
+    def tracer(self) -> Tracer:
+        """Return the tracer of the run, recording nothing unless configured."""
+        return Tracer(self.config.get("trace_path"), self.name)
+
+    @cached_property
+    def account_cache(self) -> AccountCache | None:
+        """Return the cache of the ad account list, if configured."""
+        path = self.config.get("account_cache_path")
+        if not path:
+            return None
+        return AccountCache(path, self.config.get("account_cache_ttl_hours", 24) * 3600)
+
+    @cached_property
+    def snapshot_store(self) -> SnapshotStore | None:
+        """Return the store of emitted record hashes, if configured."""
+        path = self.config.get("snapshot_store_path")
+        return SnapshotStore(path) if path else None
+
+    def sync_all(self) -> None:
+        """Sync all streams, then save the hashes of the emitted records.
+
+        The hashes are only saved if the sync succeeds, so that the records of
+        a failed sync are emitted again by the next one.
+
+        With a `request_budget`, child partitions are queued while the parent
+        streams sync, then synced by priority. The progress is reported once
+        more at the end, and the memory report, if any, is completed.
+        """
+        budget = self.config.get("request_budget")
+        progress = self.progress
+        profiler = self.memory_profiler
+        if profiler is not None:
+            profiler.start()
+        succeeded = False
+        try:
+            with self.tracer.run():
+                if budget is None:
+                    super().sync_all()
+                else:
+                    self._sync_within_budget(budget)
+            succeeded = True
+        finally:
+            if progress.interval:
+                progress.report()
+            if profiler is not None:
+                profiler.close()
+            store = self.snapshot_store
+            if store is not None:
+                for stream_name, count in sorted(store.unchanged.items()):
+                    self.logger.info(
+                        "Skipped %d unchanged records of '%s'.",
+                        count,
+                        stream_name,
+                    )
+                store.close(commit=succeeded)
+
+    def _sync_within_budget(self, budget: int) -> None:
+        """Sync the parent streams, then the child partitions by priority.
+
+        Args:
+            budget: The maximum number of requests of the run.
+        """
+        self.scheduler = Scheduler(
+            RequestBudget(budget),
+            self._pop_deferred_partitions(),
+        )
+        try:
+            super().sync_all()
+        except BudgetExhaustedError:
+            self.logger.warning("The request budget was spent by parent streams.")
+        self.scheduler.run()
+        self._write_deferred_partitions(self.scheduler.deferred)
+
+    def _pop_deferred_partitions(self) -> list[tuple[Stream, Context | None]]:
+        """Remove the partitions deferred by the previous run from the state.
+
+        Partitions of streams not synced by this run are kept in the state.
+
+        Returns:
+            The stream and context of each deferred partition.
+        """
+        partitions = []
+        for stream_name, bookmark in self.state.get("bookmarks", {}).items():
+            stream = self.streams.get(stream_name)
+            if stream is None or not (
+                stream.selected or stream.has_selected_descendents
+            ):
+                continue
+            partitions.extend(
+                (stream, context) for context in bookmark.pop("deferred", [])
+            )
+        return partitions
+
+    def _write_deferred_partitions(
+        self,
+        deferred: list[tuple[Stream, Context | None]],
+    ) -> None:
+        """Record the partitions left out of this run in the state.
+
+        Args:
+            deferred: The deferred streams and partition contexts.
+        """
+        if not deferred:
+            return
+        bookmarks = self.state.setdefault("bookmarks", {})
+        for stream, context in deferred:
+            bookmark = bookmarks.setdefault(stream.name, {})
+            bookmark.setdefault("deferred", []).append(context or {})
+        counts = Counter(stream.name for stream, _ in deferred)
+        for stream_name, count in sorted(counts.items()):
+            self.logger.warning(
+                "Deferred %d partitions of '%s' to the next run.",
+                count,
+                stream_name,
+            )
+        self.write_message(StateMessage(value=self.state))
+
+    def plan(self) -> dict[str, t.Any]:
+        """Estimate the requests of a sync of the selected streams.
+
+        Only the streams with selected children are requested, to list the
+        partitions of their children.
+
+        Returns:
+            The plan of each stream, with totals.
+        """
+        return plan_report(self, plan_sync(self))
+
+    @classmethod
+    def invoke(  # type: ignore[override]
+        cls: type[TapLinkedInAds],
+        *,
+        plan: bool = False,
+        **kwargs: t.Any,
+    ) -> None:
+        """Invoke the tap's command line interface.
+
+        Args:
+            plan: Print the estimated requests of the sync instead of syncing.
+            **kwargs: The other options of the Singer tap command.
+        """
+        if not plan:
+            super().invoke(**kwargs)
+            return
+
+        config_files, parse_env_config = cls.config_from_cli_args(
+            *kwargs.get("config", ()),
+        )
+        tap = cls(
+            config=config_files,  # type: ignore[arg-type]
+            state=kwargs.get("state"),
+            catalog=kwargs.get("catalog"),
+            parse_env_config=parse_env_config,
+            validate_config=True,
+        )
+        click.echo(json.dumps(tap.plan(), indent=2))
+
+    @classmethod
+    def get_singer_command(cls: type[TapLinkedInAds]) -> click.Command:
+        """Add the `--plan` option to the Singer tap command.
+
+        Returns:
+            A click.Command object.
+        """
+        command = super().get_singer_command()
+        command.params.append(
+            click.Option(
+                ["--plan"],
+                is_flag=True,
+                help=(
+                    "Print the estimated requests, quota use and duration of the "
+                    "sync per stream, without syncing."
+                ),
+            ),
+        )
+        return command
+
+    def serialize_message(self, message: Message) -> str:
+        """Serialize a Singer message, using orjson when it is installed.
+
+        Args:
+            message: A Singer message object.
+
+        Returns:
+            A string of serialized JSON.
+        """
+        return serialize_message(message)
+
     def discover_streams(self) -> list[streams.LinkedInAdsStream]:
         """Return a list of discovered streams.
 
@@ -90,6 +689,40 @@ class TapLinkedInAds(Tap):
             streams.CampaignGroupsStream(self),
             streams.CreativesStream(self),
             streams.VideoAdsStream(self),
+            *self.discover_rollup_streams(),
+        ]
+
+    def discover_rollup_streams(self) -> list[streams.LinkedInAdsStream]:
+        """Return the rollup streams enabled by `analytics_rollups`.
+
+        Rollups are listed after the analytics streams, so they sync after them
+        for each campaign or creative and reuse their rows.
+
+        Returns:
+            A list of rollup streams.
+        """
+        if not self.config.get("analytics_rollups"):
+            return []
+        granularity = self.config.get("time_granularity") or "DAILY"
+        periods = (
+            ROLLUP_PERIODS[ROLLUP_PERIODS.index(granularity) + 1 :]
+            if granularity in ROLLUP_PERIODS
+            else ROLLUP_PERIODS
+        )
+        rollup_types = {
+            "MONTHLY": [
+                AdAnalyticsByCampaignMonthlyStream,
+                AdAnalyticsByCreativeMonthlyStream,
+            ],
+            "ALL": [
+                AdAnalyticsByCampaignLifetimeStream,
+                AdAnalyticsByCreativeLifetimeStream,
+            ],
+        }
+        return [
+            stream_type(self)
+            for period in periods
+            for stream_type in rollup_types[period]
         ]
 
 
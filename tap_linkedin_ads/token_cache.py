@@ -0,0 +1,47 @@
+"""File-backed cache of OAuth access tokens shared between tap runs."""
+
+from __future__ import annotations
+
+from tap_linkedin_ads.file_cache import JsonFileCache
+
+
+class TokenCache(JsonFileCache):
+    """Access tokens stored in a local JSON file, keyed by OAuth credentials."""
+
+    def get(self, key: str) -> dict | None:
+        """Return the cached token entry for a key.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            A dict with `access_token`, `issued_at` and `expires_at` (epoch
+            seconds, `expires_at` is None for tokens without expiry), or None
+            when nothing is cached.
+        """
+        with self.locked():
+            return self._read().get(key)
+
+    def set(
+        self,
+        key: str,
+        access_token: str,
+        issued_at: float,
+        expires_at: float | None,
+    ) -> None:
+        """Store a token, atomically replacing the cache file.
+
+        Args:
+            key: The cache key.
+            access_token: The access token.
+            issued_at: When the token was requested, as epoch seconds.
+            expires_at: The token expiry as epoch seconds, or None.
+        """
+        with self.locked():
+            entries = self._read()
+            entries[key] = {
+                "access_token": access_token,
+                "issued_at": issued_at,
+                "expires_at": expires_at,
+            }
+            self._write(entries)
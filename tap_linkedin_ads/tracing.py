@@ -0,0 +1,338 @@
+"""Trace spans of a run, written as OTLP JSON."""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import json
+import secrets
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+if t.TYPE_CHECKING:
+    import os
+
+    from singer_sdk.helpers.types import Context
+
+# Ended spans written to the file at once, as one OTLP request per line
+FLUSH_SPANS = 1000
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_CLIENT = 3
+
+# OTLP status code of failed spans
+STATUS_ERROR = 2
+
+# Context keys added as attributes to partition spans
+CONTEXT_ATTRIBUTES = ("account_id", "campaign_id", "creative_id")
+
+
+class Span:
+    """A timed operation, with attributes, within a trace."""
+
+    __slots__ = (
+        "attributes",
+        "end",
+        "error",
+        "kind",
+        "name",
+        "parent_id",
+        "span_id",
+        "start",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        parent_id: str | None,
+        kind: int,
+        attributes: dict[str, t.Any],
+    ) -> None:
+        """Start a span.
+
+        Args:
+            name: The span name.
+            parent_id: The ID of the parent span, or None for the root span.
+            kind: The OTLP span kind.
+            attributes: The initial attributes.
+        """
+        self.name = name
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = attributes
+        self.span_id = secrets.token_hex(8)
+        self.start = time.time_ns()
+        self.end = self.start
+        self.error: str | None = None
+
+    def set(self, **attributes: t.Any) -> None:
+        """Set attributes.
+
+        Args:
+            attributes: The attribute values, by name.
+        """
+        self.attributes.update(attributes)
+
+    def add(self, name: str, value: int = 1) -> None:
+        """Add to a counter attribute.
+
+        Args:
+            name: The attribute name.
+            value: The amount added.
+        """
+        self.attributes[name] = self.attributes.get(name, 0) + value
+
+    def fail(self, message: str) -> None:
+        """Mark the span as failed.
+
+        Args:
+            message: The error description.
+        """
+        self.error = message
+
+
+class _NullSpan(Span):
+    """The span of a disabled tracer, ignoring attributes."""
+
+    def __init__(self) -> None:
+        pass
+
+    def set(self, **attributes: t.Any) -> None:
+        pass
+
+    def add(self, name: str, value: int = 1) -> None:
+        pass
+
+    def fail(self, message: str) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+_current: contextvars.ContextVar[Span] = contextvars.ContextVar(
+    "current_span",
+    default=NULL_SPAN,
+)
+
+
+def current_span() -> Span:
+    """Return the innermost span of the current thread or task."""
+    return _current.get()
+
+
+def _attribute_value(value: t.Any) -> dict[str, t.Any]:  # noqa: ANN401
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Tracer:
+    """Spans of a run: run, stream, partition, page and HTTP request.
+
+    Spans nest within the span current in their thread. Background threads
+    started with a copy of the current context, e.g. to prefetch pages, nest
+    their spans within the span that started them. Ended spans are appended
+    to a file in batches, each line an OTLP JSON export request, as read by
+    trace viewers and the OpenTelemetry Collector. A tracer without a path
+    records nothing.
+    """
+
+    def __init__(self, path: str | os.PathLike | None, service: str) -> None:
+        """Initialize the tracer.
+
+        Args:
+            path: The path of the trace file, or None to disable tracing.
+            service: The service name of the spans.
+        """
+        self.path = Path(path).expanduser() if path else None
+        self.service = service
+        self.trace_id = secrets.token_hex(16)
+        self._ended: list[Span] = []
+        self._streams: dict[str, Span] = {}
+        self._root: Span | None = None
+        self._lock = threading.Lock()
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text("")
+
+    @property
+    def enabled(self) -> bool:
+        """Return whether spans are recorded."""
+        return self.path is not None
+
+    @contextlib.contextmanager
+    def span(
+        self,
+        name: str,
+        *,
+        parent: Span | None = None,
+        kind: int = KIND_INTERNAL,
+        **attributes: t.Any,
+    ) -> t.Iterator[Span]:
+        """Record a span around a block.
+
+        Args:
+            name: The span name.
+            parent: The parent span, defaults to the current span.
+            kind: The OTLP span kind.
+            attributes: The initial attributes.
+
+        Yields:
+            The span, current within the block.
+
+        Raises:
+            Exception: Any error of the block, also recorded in the span.
+        """
+        if not self.enabled:
+            yield NULL_SPAN
+            return
+        parent = parent or _current.get()
+        span = Span(
+            name,
+            None if parent is NULL_SPAN else parent.span_id,
+            kind,
+            {"thread.name": threading.current_thread().name, **attributes},
+        )
+        token = _current.set(span)
+        try:
+            yield span
+        except Exception as exc:
+            span.fail(f"{type(exc).__name__}: {exc}")
+            raise
+        finally:
+            _current.reset(token)
+            span.end = time.time_ns()
+            self._end(span)
+
+    @contextlib.contextmanager
+    def run(self, **attributes: t.Any) -> t.Iterator[Span]:
+        """Record the root span of a run, then write the remaining spans.
+
+        Args:
+            attributes: The attributes of the run.
+
+        Yields:
+            The root span.
+        """
+        try:
+            with self.span("sync", **attributes) as span:
+                self._root = span
+                yield span
+        finally:
+            self.close()
+
+    @contextlib.contextmanager
+    def partition(self, stream: str, context: Context | None) -> t.Iterator[Span]:
+        """Record the span of a stream partition, within the span of its stream.
+
+        The span of a stream lasts from the start of its first partition to the
+        end of its last one.
+
+        Args:
+            stream: The stream name.
+            context: The partition context.
+
+        Yields:
+            The partition span.
+        """
+        if not self.enabled:
+            yield NULL_SPAN
+            return
+        with self._lock:
+            stream_span = self._streams.get(stream)
+            if stream_span is None:
+                stream_span = self._streams[stream] = Span(
+                    stream,
+                    self._root.span_id if self._root else None,
+                    KIND_INTERNAL,
+                    {"stream": stream, "partitions": 0},
+                )
+            stream_span.add("partitions")
+        attributes = {
+            key: value
+            for key, value in (context or {}).items()
+            if key in CONTEXT_ATTRIBUTES and value is not None
+        }
+        try:
+            with self.span(
+                f"{stream} partition",
+                parent=stream_span,
+                stream=stream,
+                **attributes,
+            ) as span:
+                yield span
+        finally:
+            stream_span.end = max(stream_span.end, time.time_ns())
+
+    def _end(self, span: Span) -> None:
+        with self._lock:
+            self._ended.append(span)
+            if len(self._ended) < FLUSH_SPANS:
+                return
+            spans, self._ended = self._ended, []
+        self._write(spans)
+
+    def close(self) -> None:
+        """Write the spans not written yet, including the stream spans."""
+        if not self.enabled:
+            return
+        with self._lock:
+            spans = self._ended + list(self._streams.values())
+            self._ended = []
+            self._streams = {}
+        self._write(spans)
+
+    def _write(self, spans: list[Span]) -> None:
+        """Append spans to the file, as one OTLP JSON export request."""
+        if not spans or self.path is None:
+            return
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": self.service},
+                            },
+                        ],
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [self._otlp(span) for span in spans],
+                        },
+                    ],
+                },
+            ],
+        }
+        line = json.dumps(request, separators=(",", ":"))
+        with self._lock, self.path.open("a", encoding="utf-8") as file:
+            file.write(line + "\n")
+
+    def _otlp(self, span: Span) -> dict[str, t.Any]:
+        data = {
+            "traceId": self.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": span.kind,
+            "startTimeUnixNano": str(span.start),
+            "endTimeUnixNano": str(span.end),
+            "attributes": [
+                {"key": key, "value": _attribute_value(value)}
+                for key, value in span.attributes.items()
+            ],
+            "status": (
+                {"code": STATUS_ERROR, "message": span.error} if span.error else {}
+            ),
+        }
+        if span.parent_id is not None:
+            data["parentSpanId"] = span.parent_id
+        return data
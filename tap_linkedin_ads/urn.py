@@ -0,0 +1,84 @@
+"""Parsing of LinkedIn URNs such as `urn:li:sponsoredCampaign:123`."""
+
+from __future__ import annotations
+
+import sys
+import typing as t
+from functools import lru_cache
+
+
+class Urn(t.NamedTuple):
+    """A parsed LinkedIn URN."""
+
+    urn: str
+    namespace: str
+    entity_type: str
+    id: str
+
+
+@lru_cache(maxsize=2**16)
+def parse_urn(urn: str) -> Urn | None:
+    """Parse a URN, interning its parts.
+
+    Results are memoized, so the many repeats of the same account, campaign and
+    creative URNs share a single parsed value and a single string in memory.
+
+    Args:
+        urn: The URN string.
+
+    Returns:
+        The parsed URN, or None if the string is not a URN.
+    """
+    parts = urn.split(":", 3)
+    if len(parts) != 4 or parts[0] != "urn":  # noqa: PLR2004
+        return None
+    _, namespace, entity_type, entity_id = parts
+    return Urn(
+        sys.intern(urn),
+        sys.intern(namespace),
+        sys.intern(entity_type),
+        sys.intern(entity_id),
+    )
+
+
+def urn_id(urn: str, entity_type: str | None = None) -> str | None:
+    """Return the ID part of a URN.
+
+    Args:
+        urn: The URN string.
+        entity_type: If set, only URNs of this entity type are accepted.
+
+    Returns:
+        The entity ID, or None if the URN is invalid or of another type.
+    """
+    parsed = parse_urn(urn)
+    if parsed is None or (entity_type and parsed.entity_type != entity_type):
+        return None
+    return parsed.id
+
+
+def intern_urn(urn: str) -> str:
+    """Return the shared instance of a URN string.
+
+    Args:
+        urn: The URN string.
+
+    Returns:
+        An interned string equal to the URN.
+    """
+    parsed = parse_urn(urn)
+    return parsed.urn if parsed else urn
+
+
+@lru_cache(maxsize=2**16)
+def make_urn(entity_type: str, entity_id: t.Any) -> str:  # noqa: ANN401
+    """Build a LinkedIn URN.
+
+    Args:
+        entity_type: The URN entity type, e.g. `sponsoredAccount`.
+        entity_id: The entity ID.
+
+    Returns:
+        The URN string.
+    """
+    return sys.intern(f"urn:li:{entity_type}:{entity_id}")
@@ -0,0 +1,453 @@
+"""Local stand-in for the LinkedIn API, with injected latency and faults.
+
+The server answers the `/rest` and `/v2` endpoints the streams request, from a
+small generated set of accounts, campaigns and creatives. A `FaultProfile`
+delays responses and answers some requests with rate limits, server errors or
+pages cut short. Point the tap's `api_url` at it:
+
+    python -m tests.stub_api --profile rate_limit_storm --port 8080
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import datetime
+import json
+import math
+import random
+import re
+import threading
+import time
+import typing as t
+from collections import Counter
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import SplitResult, parse_qsl, unquote, urlsplit
+
+from tap_linkedin_ads.streams.ad_analytics.batching import DECIMAL_METRICS
+
+# Returns the delay of a response in seconds
+Latency = t.Callable[[random.Random], float]
+
+# 2024-01-02, the creation and modification time of every entity
+TIMESTAMP = 1704153600000
+# Decimal places of costs, as long as the API's
+COST_DECIMALS = "4712860814231262"
+
+DATE_RANGE = re.compile(
+    r"start:\(year:(\d+),month:(\d+),day:(\d+)\),"
+    r"end:\(year:(\d+),month:(\d+),day:(\d+)\)",
+)
+
+
+def fixed(seconds: float) -> Latency:
+    """Return a latency of always the same delay."""
+    return lambda _: seconds
+
+
+def uniform(low: float, high: float) -> Latency:
+    """Return a latency uniformly distributed between two delays."""
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median: float, sigma: float) -> Latency:
+    """Return a long-tailed latency, as usually seen from real APIs."""
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+NO_LATENCY = fixed(0)
+
+
+@dataclasses.dataclass(frozen=True)
+class FaultProfile:
+    """The latency and faults of the responses of the stand-in server."""
+
+    latency: Latency = NO_LATENCY
+    # Shares of requests answered with 429, a 5xx status, or a truncated page
+    rate_limit: float = 0
+    server_error: float = 0
+    truncate: float = 0
+    # Value of the Retry-After header of 429 responses
+    retry_after: int = 0
+    # Number of consecutive requests failing the same way once a fault starts
+    burst: int = 1
+    # Faults in a row for one URL, below the retries of the tap
+    max_faults_per_url: int = 2
+    seed: int = 0
+
+
+PROFILES = {
+    "clean": FaultProfile(),
+    "slow": FaultProfile(latency=lognormal(0.01, 0.8)),
+    "rate_limit_storm": FaultProfile(rate_limit=0.3, burst=4),
+    "server_error_bursts": FaultProfile(server_error=0.2, burst=3),
+    "truncated_pages": FaultProfile(truncate=0.2),
+}
+
+
+def _audit() -> dict:
+    return {"created": {"time": TIMESTAMP}, "lastModified": {"time": TIMESTAMP}}
+
+
+def _urn_id(urn: str) -> int:
+    return int(urn.rsplit(":", 1)[-1])
+
+
+class StubLinkedInAPI:
+    """A local LinkedIn API server, run in a background thread.
+
+    Use it as a context manager. `responses` counts the responses sent by
+    outcome, and `unresolved` lists the URLs whose last response was a fault.
+    """
+
+    def __init__(
+        self,
+        profile: FaultProfile | None = None,
+        *,
+        accounts: int = 2,
+        campaigns_per_account: int = 2,
+        page_size: int = 1,
+        port: int = 0,
+    ) -> None:
+        """Create the server and its entities.
+
+        Args:
+            profile: The latency and faults of responses, none by default.
+            accounts: The number of ad accounts.
+            campaigns_per_account: The number of campaigns of each account, each
+                with one creative.
+            page_size: The number of entities per page of listed entities.
+            port: The local port, or 0 for any free port.
+        """
+        self.profile = profile or FaultProfile()
+        self.page_size = page_size
+        self.accounts = list(range(1, accounts + 1))
+        self.campaigns = {
+            account: [account * 100 + i for i in range(campaigns_per_account)]
+            for account in self.accounts
+        }
+        self.responses: Counter[str] = Counter()
+        # The path and query of every request received
+        self.requests: list[str] = []
+        self._last_outcome: dict[str, str] = {}
+        self._faults_in_row: Counter[str] = Counter()
+        self._burst: tuple[str, int] | None = None
+        self._rng = random.Random(self.profile.seed)  # noqa: S311
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """Return the root URL, to set as `api_url`."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def unresolved(self) -> list[str]:
+        """Return the URLs never answered successfully after a fault."""
+        return [url for url, outcome in self._last_outcome.items() if outcome != "ok"]
+
+    def __enter__(self) -> StubLinkedInAPI:  # noqa: PYI034
+        """Start serving."""
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _fault(self, url: str) -> str | None:
+        """Draw the fault of a response, and the delay before it."""
+        profile = self.profile
+        with self._lock:
+            delay = profile.latency(self._rng)
+            fault = None
+            if self._burst is not None:
+                fault, left = self._burst
+                self._burst = (fault, left - 1) if left > 1 else None
+            else:
+                draw = self._rng.random()
+                for name, share in (
+                    ("429", profile.rate_limit),
+                    ("5xx", profile.server_error),
+                    ("truncated", profile.truncate),
+                ):
+                    if draw < share:
+                        fault = name
+                        if profile.burst > 1:
+                            self._burst = (name, profile.burst - 1)
+                        break
+                    draw -= share
+            if fault is not None and (
+                self._faults_in_row[url] >= profile.max_faults_per_url
+            ):
+                fault = None
+            self._faults_in_row[url] = self._faults_in_row[url] + 1 if fault else 0
+            self.requests.append(url)
+            self._last_outcome[url] = fault or "ok"
+            self.responses[fault or "ok"] += 1
+        time.sleep(delay)
+        return fault
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                fault = api._fault(self.path)  # noqa: SLF001
+                if fault == "429":
+                    self._send_json(
+                        HTTPStatus.TOO_MANY_REQUESTS,
+                        {"status": 429, "message": "Resource level throttle limit"},
+                        {"Retry-After": str(api.profile.retry_after)},
+                    )
+                    return
+                if fault == "5xx":
+                    status = api._rng.choice(  # noqa: SLF001
+                        [
+                            HTTPStatus.INTERNAL_SERVER_ERROR,
+                            HTTPStatus.BAD_GATEWAY,
+                            HTTPStatus.SERVICE_UNAVAILABLE,
+                            HTTPStatus.GATEWAY_TIMEOUT,
+                        ],
+                    )
+                    self._send_json(status, {"status": status, "message": "Error"})
+                    return
+                payload = api.respond(
+                    urlsplit(self.path),
+                    batch_get=self.headers.get("X-RestLi-Method") == "BATCH_GET",
+                )
+                if payload is None:
+                    self._send_json(HTTPStatus.NOT_FOUND, {"message": "Not found"})
+                    return
+                self._send_json(HTTPStatus.OK, payload, truncate=fault is not None)
+
+            def _send_json(
+                self,
+                status: int,
+                payload: dict,
+                headers: dict[str, str] | None = None,
+                *,
+                truncate: bool = False,
+            ) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if truncate:
+                    # The connection drops in the middle of the page
+                    self.wfile.write(body[: len(body) // 2])
+                    self.close_connection = True
+                    return
+                self.wfile.write(body)
+
+            def log_message(self, *args: t.Any) -> None:
+                pass
+
+        return Handler
+
+    def respond(self, url: SplitResult, *, batch_get: bool = False) -> dict | None:  # noqa: PLR0911
+        """Return the payload of a successful response.
+
+        Args:
+            url: The split request URL.
+            batch_get: Whether the request is a BATCH_GET of IDs.
+
+        Returns:
+            The JSON payload, or None for unknown endpoints.
+        """
+        # Rest.li parameters are sent unencoded, so keep "+" and such as is
+        params = dict(parse_qsl(url.query.replace("+", "%2B")))
+        parts = url.path.strip("/").split("/")
+        if parts[:2] == ["rest", "adAccounts"] and len(parts) == 2:
+            return self._page(
+                [self._account(account) for account in self.accounts],
+                params,
+            )
+        if parts[:2] == ["rest", "adAccounts"] and len(parts) == 4:
+            account = int(parts[2])
+            entities = self._entities(account, parts[3])
+            if entities is None:
+                return None
+            if batch_get:
+                ids = {str(_urn_id(unquote(i))) for i in _list(params["ids"])}
+                return {
+                    "results": {
+                        str(_urn_id(str(entity["id"]))): entity
+                        for entity in entities
+                        if str(_urn_id(str(entity["id"]))) in ids
+                    },
+                    "statuses": {},
+                    "errors": {},
+                }
+            return self._page(entities, params)
+        if parts == ["rest", "adAccountUsers"]:
+            account = _urn_id(params["accounts"])
+            return self._page(
+                [
+                    {
+                        "account": f"urn:li:sponsoredAccount:{account}",
+                        "user": f"urn:li:person:user{account}",
+                        "role": "VIEWER",
+                        "changeAuditStamps": _audit(),
+                    },
+                ],
+                params,
+            )
+        if parts == ["rest", "adAnalytics"]:
+            return {"elements": self._analytics(params), "paging": {}}
+        if parts == ["v2", "adDirectSponsoredContents"]:
+            return {"elements": [], "paging": {}}
+        return None
+
+    def _entities(self, account: int, endpoint: str) -> list[dict] | None:
+        if endpoint == "adCampaigns":
+            return [self._campaign(account, c) for c in self.campaigns[account]]
+        if endpoint == "adCampaignGroups":
+            return [self._campaign_group(account)]
+        if endpoint == "creatives":
+            return [self._creative(account, c) for c in self.campaigns[account]]
+        return None
+
+    def _page(self, elements: list[dict], params: dict[str, str]) -> dict:
+        start = int(params.get("pageToken", 0))
+        end = start + self.page_size
+        metadata = {"nextPageToken": str(end)} if end < len(elements) else {}
+        return {"elements": elements[start:end], "metadata": metadata}
+
+    @staticmethod
+    def _account(account: int) -> dict:
+        return {
+            "id": account,
+            "name": f"Account {account}",
+            "currency": "USD",
+            "status": "ACTIVE",
+            "type": "BUSINESS",
+            "reference": f"urn:li:organization:{account}",
+            "changeAuditStamps": _audit(),
+        }
+
+    @staticmethod
+    def _campaign(account: int, campaign: int) -> dict:
+        return {
+            "id": campaign,
+            "name": f"Campaign {campaign}",
+            "account": f"urn:li:sponsoredAccount:{account}",
+            "campaignGroup": f"urn:li:sponsoredCampaignGroup:{account}",
+            # People have alphanumeric IDs
+            "associatedEntity": (
+                f"urn:li:organization:{account}"
+                if campaign % 2
+                else f"urn:li:person:Person{campaign}"
+            ),
+            "status": "ACTIVE" if campaign % 2 else "PAUSED",
+            "runSchedule": {"start": TIMESTAMP},
+            "changeAuditStamps": _audit(),
+        }
+
+    @staticmethod
+    def _campaign_group(account: int) -> dict:
+        return {
+            "id": account,
+            "name": f"Group {account}",
+            "account": f"urn:li:sponsoredAccount:{account}",
+            "status": "ACTIVE",
+            "runSchedule": {"start": TIMESTAMP},
+            "changeAuditStamps": _audit(),
+        }
+
+    @staticmethod
+    def _creative(account: int, campaign: int) -> dict:
+        return {
+            "id": f"urn:li:sponsoredCreative:{campaign * 10}",
+            "account": f"urn:li:sponsoredAccount:{account}",
+            "campaign": f"urn:li:sponsoredCampaign:{campaign}",
+            "intendedStatus": "ACTIVE",
+            "createdAt": TIMESTAMP,
+            "lastModifiedAt": TIMESTAMP,
+        }
+
+    @staticmethod
+    def _analytics(params: dict[str, str]) -> list[dict]:
+        facet = "campaigns" if "campaigns" in params else "creatives"
+        match = DATE_RANGE.search(params["dateRange"])
+        if match is None:
+            return []
+        numbers = [int(value) for value in match.groups()]
+        start = datetime.date(*numbers[:3])
+        end = datetime.date(*numbers[3:])
+        fields = params["fields"].split(",")
+        rows = []
+        for urn in (unquote(value) for value in _list(params[facet])):
+            day = start
+            while day <= end:
+                row: dict[str, t.Any] = {"pivotValues": [urn]}
+                for field in fields:
+                    value = (_urn_id(urn) + day.toordinal() + len(field)) % 97
+                    if field == "dateRange":
+                        row[field] = {
+                            "start": {
+                                "year": day.year,
+                                "month": day.month,
+                                "day": day.day,
+                            },
+                            "end": {
+                                "year": day.year,
+                                "month": day.month,
+                                "day": day.day,
+                            },
+                        }
+                    elif field.startswith("cost"):
+                        # Costs come with many decimal places
+                        row[field] = f"{value}.{COST_DECIMALS}"
+                    elif field in {
+                        "conversionValueInLocalCurrency",
+                        "jobApplications",
+                        "registrations",
+                    }:
+                        row[field] = f"{value}.5"
+                    elif field in DECIMAL_METRICS:
+                        # The API returns these metrics as strings
+                        row[field] = str(value)
+                    elif field != "pivotValues":
+                        row[field] = value
+                rows.append(row)
+                day += datetime.timedelta(days=1)
+        return rows
+
+
+def _list(value: str) -> list[str]:
+    """Split a Rest.li `List(...)` parameter."""
+    return [item for item in value.removeprefix("List(")[:-1].split(",") if item]
+
+
+def main() -> None:
+    """Serve the stand-in API until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profile", choices=PROFILES, default="clean")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--accounts", type=int, default=2)
+    parser.add_argument("--campaigns-per-account", type=int, default=2)
+    args = parser.parse_args()
+    with StubLinkedInAPI(
+        PROFILES[args.profile],
+        accounts=args.accounts,
+        campaigns_per_account=args.campaigns_per_account,
+        port=args.port,
+    ) as api:
+        print(f"Serving the LinkedIn API at {api.url}")  # noqa: T201
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            print(dict(api.responses))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
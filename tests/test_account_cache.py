@@ -0,0 +1,14 @@
+"""Tests for the cache of the ad account list."""
+
+from tap_linkedin_ads.account_cache import AccountCache
+
+
+def test_accounts_are_cached_until_expiry(tmp_path) -> None:  # noqa: ANN001
+    """Cached accounts are returned while fresh, per credentials."""
+    path = tmp_path / "accounts.json"
+    key = AccountCache.cache_key("token")
+    AccountCache(path, ttl=3600).set(key, [{"id": 1}])
+
+    assert AccountCache(path, ttl=3600).get(key) == [{"id": 1}]
+    assert AccountCache(path, ttl=3600).get(AccountCache.cache_key("other")) is None
+    assert AccountCache(path, ttl=-1).get(key) is None
@@ -0,0 +1,127 @@
+"""Tests for the analytics streams against the local stand-in API."""
+
+from __future__ import annotations
+
+import contextlib
+import datetime
+import io
+import json
+from decimal import Decimal
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+
+from tap_linkedin_ads.streams.ad_analytics.ad_analytics_base import (
+    ANALYTICS_COLUMN_GROUPS,
+)
+from tap_linkedin_ads.streams.ad_analytics.batching import DECIMAL_METRICS
+from tap_linkedin_ads.tap import TapLinkedInAds
+from tests.stub_api import StubLinkedInAPI
+
+CONFIG = {
+    "access_token": "token",
+    "start_date": "2024-01-01T00:00:00Z",
+    "end_date": "2024-01-02T00:00:00Z",
+}
+
+CREATIVE = {"creative_id": "1000", "creative_status": "ACTIVE"}
+
+
+@pytest.mark.parametrize("batch", [False, True], ids=["records", "batches"])
+def test_string_metrics_are_cast(tmp_path, batch: bool) -> None:  # noqa: ANN001, FBT001
+    """Metrics of every column group are cast to the type of the schema."""
+    config = dict(CONFIG)
+    if batch:
+        config["analytics_batch_config"] = {
+            "encoding": {"format": "jsonl"},
+            "storage": {"root": tmp_path.as_uri()},
+        }
+    with StubLinkedInAPI(accounts=1) as api:
+        tap = TapLinkedInAds(
+            config={**config, "api_url": api.url},
+            parse_env_config=False,
+        )
+        stream = tap.streams["ad_analytics_by_creative"]
+        rows = list(stream.get_records(CREATIVE))
+
+    assert len(rows) == 2
+    for row in rows:
+        # Declared as an integer by the creative schema
+        assert isinstance(row["viralRegistrations"], int)
+        for name in (DECIMAL_METRICS & row.keys()) - {"viralRegistrations"}:
+            assert isinstance(row[name], Decimal if batch else str), name
+        assert isinstance(row["impressions"], int)
+    # Cast metrics of the second, third and fourth column groups
+    assert {"costInUsd", "costInLocalCurrency", "jobApplications"} <= rows[0].keys()
+
+
+@pytest.mark.parametrize(
+    ("stream_name", "pivot", "facet", "urn", "key"),
+    [
+        (
+            "ad_analytics_by_campaign",
+            "CAMPAIGN",
+            "campaigns",
+            "urn:li:sponsoredCampaign:100",
+            "campaign_id",
+        ),
+        (
+            "ad_analytics_by_creative",
+            "CREATIVE",
+            "creatives",
+            "urn:li:sponsoredCreative:1000",
+            "creative_id",
+        ),
+    ],
+)
+def test_column_groups_are_requested_and_merged(
+    stream_name: str,
+    pivot: str,
+    facet: str,
+    urn: str,
+    key: str,
+) -> None:
+    """Each column group is requested for the entity, and merged into one row."""
+    with StubLinkedInAPI(accounts=1, campaigns_per_account=1) as api:
+        tap = TapLinkedInAds(
+            config={**CONFIG, "api_url": api.url},
+            parse_env_config=False,
+        )
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            tap.sync_all()
+
+    requests = [
+        dict(parse_qsl(urlsplit(url).query))
+        for url in api.requests
+        if urlsplit(url).path == "/rest/adAnalytics" and f"pivot=(value:{pivot})" in url
+    ]
+    assert [params.pop("fields") for params in requests] == list(
+        ANALYTICS_COLUMN_GROUPS,
+    )
+    assert all(
+        params
+        == {
+            "q": "analytics",
+            "pivot": f"(value:{pivot})",
+            "timeGranularity": "(value:DAILY)",
+            facet: f"List({urn})",
+            "dateRange": (
+                "(start:(year:2024,month:1,day:1),end:(year:2024,month:1,day:2))"
+            ),
+        }
+        for params in requests
+    )
+
+    rows = [
+        message["record"]
+        for message in map(json.loads, out.getvalue().splitlines())
+        if message["type"] == "RECORD" and message["stream"] == stream_name
+    ]
+    assert [row["day"][:10] for row in rows] == ["2024-01-01", "2024-01-02"]
+    for offset, row in enumerate(rows):
+        assert str(row[key]) == urn.rsplit(":", 1)[-1]
+        # Metrics of every group, as computed by the stand-in API
+        ordinal = datetime.date(2024, 1, 1).toordinal() + offset
+        for name in ("clicks", "landingPageClicks", "likes", "impressions"):
+            assert row[name] == (int(row[key]) + ordinal + len(name)) % 97, name
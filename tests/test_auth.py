@@ -0,0 +1,124 @@
+"""Tests for OAuth token refresh and the shared token cache."""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+from singer_sdk.authenticators import OAuthAuthenticator
+
+from tap_linkedin_ads.auth import LinkedInAdsOAuthAuthenticator
+from tap_linkedin_ads.tap import TapLinkedInAds
+from tap_linkedin_ads.token_cache import TokenCache
+
+
+@pytest.fixture
+def token_requests(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Replace the token endpoint, and return the refresh tokens it was sent."""
+    sent: list[str] = []
+
+    def update_access_token(self: OAuthAuthenticator) -> None:
+        sent.append(self.config["oauth_credentials"]["refresh_token"])
+        self.access_token = f"access-{len(sent)}"
+        self.expires_in = 3600
+        self.last_refreshed = datetime.now(tz=timezone.utc)
+
+    monkeypatch.setattr(OAuthAuthenticator, "update_access_token", update_access_token)
+    return sent
+
+
+def new_authenticator(
+    cache_path: str,
+    refresh: str = "refresh",
+) -> LinkedInAdsOAuthAuthenticator:
+    """Return a new authenticator, as created by a separate run."""
+    tap = TapLinkedInAds(
+        config={
+            "oauth_credentials": {
+                "client_id": "client",
+                "client_secret": "secret",
+                "refresh_token": refresh,
+            },
+            "oauth_token_cache_path": str(cache_path),
+            "start_date": "2024-01-01T00:00:00Z",
+        },
+        parse_env_config=False,
+    )
+    # A subclass escapes the singleton instance of the authenticator class
+    authenticator_class = type("Authenticator", (LinkedInAdsOAuthAuthenticator,), {})
+    return authenticator_class.create_for_stream(tap.streams["accounts"])
+
+
+def test_cached_token_is_reused_across_runs(tmp_path, token_requests) -> None:  # noqa: ANN001
+    """Runs with the same credentials share a token, others get their own."""
+    path = tmp_path / "tokens.json"
+    first = new_authenticator(path)
+    first.update_access_token()
+    second = new_authenticator(path)
+    second.update_access_token()
+    assert token_requests == ["refresh"]
+    assert second.access_token == first.access_token
+    assert second.is_token_valid()
+
+    other = new_authenticator(path, refresh="other")
+    other.update_access_token()
+    assert token_requests == ["refresh", "other"]
+    assert other.access_token != first.access_token
+    # Credentials are only stored as a hash
+    assert "refresh" not in path.read_text()
+
+
+@pytest.mark.parametrize(
+    ("issued_ago", "lifetime", "reused"),
+    [
+        (60, 3600, True),
+        # 61 seconds left is within the refresh margin of a one hour token
+        (3539, 3600, False),
+        (3700, 3600, False),
+    ],
+    ids=["fresh", "expiring", "expired"],
+)
+def test_cached_token_is_refreshed_before_expiry(
+    tmp_path,  # noqa: ANN001
+    token_requests,  # noqa: ANN001
+    issued_ago: int,
+    lifetime: int,
+    reused: bool,  # noqa: FBT001
+) -> None:
+    """The refresh margin applies to the full lifetime of a cached token."""
+    path = tmp_path / "tokens.json"
+    issued_at = time.time() - issued_ago
+    cache = TokenCache(path)
+    key = TokenCache.cache_key("client", "refresh")
+    cache.set(key, "cached", issued_at, issued_at + lifetime)
+    cached = cache.get(key)["access_token"]
+    authenticator = new_authenticator(path)
+    authenticator.update_access_token()
+    assert (authenticator.access_token == cached) is reused
+    assert token_requests == ([] if reused else ["refresh"])
+
+
+def test_concurrent_writes_keep_every_entry(tmp_path) -> None:  # noqa: ANN001
+    """Concurrent writers, each with its own cache, never lose or corrupt entries."""
+    path = tmp_path / "tokens.json"
+
+    def write(worker: int) -> None:
+        cache = TokenCache(path)
+        for i in range(20):
+            cache.set(f"{worker}-{i}", "token", 0, None)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    cache = TokenCache(path)
+    assert all(cache.get(f"{n}-{i}") for n in range(8) for i in range(20))
+    # Temporary files were renamed over the cache file
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "tokens.json",
+        "tokens.json.lock",
+    ]
@@ -0,0 +1,86 @@
+"""Tests for fetching entities by ID with BATCH_GET."""
+
+import contextlib
+import io
+import json
+from urllib.parse import urlsplit
+
+from tap_linkedin_ads.streams.base_stream import BATCH_GET_MAX_URL_LENGTH
+from tap_linkedin_ads.tap import TapLinkedInAds
+from tests.stub_api import StubLinkedInAPI
+
+CONFIG = {
+    "access_token": "token",
+    "start_date": "2024-01-01T00:00:00Z",
+    "refresh_ids": {"creatives": {"1": ["1", "urn:li:sponsoredCreative:2"]}},
+}
+
+
+def test_ids_are_chunked_under_limits() -> None:
+    """IDs are split by count and URL length, creatives as URNs."""
+    tap = TapLinkedInAds(config=CONFIG, parse_env_config=False)
+    creatives = tap.streams["creatives"]
+    campaigns = tap.streams["campaigns"]
+    url = "https://api.linkedin.com/rest/adAccounts/1/creatives"
+
+    ids = creatives.partition_refresh_ids({"account_id": 1})
+    assert ids == ["1", "urn:li:sponsoredCreative:2"]
+    assert creatives.partition_refresh_ids({"account_id": 2}) == []
+    assert campaigns.partition_refresh_ids({"account_id": 1}) is None
+    (chunk,) = creatives.batch_get_chunks(url, ids)
+    assert chunk == [
+        "urn%3Ali%3AsponsoredCreative%3A1",
+        "urn%3Ali%3AsponsoredCreative%3A2",
+    ]
+
+    chunks = list(campaigns.batch_get_chunks(url, range(250)))
+    assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+
+    chunks = list(creatives.batch_get_chunks(url, range(10**12, 10**12 + 100)))
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert len(f"{url}?ids=List({','.join(chunk)})") <= BATCH_GET_MAX_URL_LENGTH
+
+
+def test_only_accounts_owning_ids_are_requested() -> None:
+    """Each account is asked for its own IDs, whatever the stream bookmark."""
+    context = {"account_id": 1, "owner_urn": "urn:li:organization:1"}
+    with StubLinkedInAPI(accounts=5) as api:
+        tap = TapLinkedInAds(
+            config={
+                "access_token": "token",
+                "start_date": "2024-01-01T00:00:00Z",
+                "end_date": "2024-01-03T00:00:00Z",
+                "api_url": api.url,
+                "refresh_ids": {"campaigns": {"1": ["100", "101"]}},
+            },
+            # Later than the last modification of every campaign
+            state={
+                "bookmarks": {
+                    "campaigns": {
+                        "partitions": [
+                            {
+                                "context": context,
+                                "replication_key": "last_modified_time",
+                                "replication_key_value": "2024-02-01T00:00:00+00:00",
+                            },
+                        ],
+                    },
+                },
+            },
+            parse_env_config=False,
+        )
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            tap.sync_all()
+
+    campaign_requests = [
+        url for url in api.requests if urlsplit(url).path.endswith("/adCampaigns")
+    ]
+    assert campaign_requests == ["/rest/adAccounts/1/adCampaigns?ids=List(100,101)"]
+    campaigns = [
+        message["record"]["id"]
+        for message in map(json.loads, out.getvalue().splitlines())
+        if message["type"] == "RECORD" and message["stream"] == "campaigns"
+    ]
+    assert sorted(campaigns) == [100, 101]
@@ -0,0 +1,126 @@
+"""Tests for the typed batch files of the analytics streams."""
+
+from __future__ import annotations
+
+import contextlib
+import gzip
+import io
+import json
+from decimal import Decimal
+from urllib.parse import urlparse
+
+import pytest
+
+from tap_linkedin_ads.streams.ad_analytics.batching import (
+    arrow_schema,
+    round_decimal,
+    typed_schema,
+)
+from tap_linkedin_ads.tap import TapLinkedInAds
+from tests.stub_api import COST_DECIMALS, StubLinkedInAPI
+
+COST_FRACTION = Decimal(f"0.{COST_DECIMALS}")
+
+SCHEMA = {
+    "properties": {
+        "costInUsd": {"type": ["string", "null"]},
+        "impressions": {"type": ["integer", "null"]},
+        "day": {"type": ["string", "null"]},
+        "pivotValues": {"type": ["array", "null"], "items": {"type": ["string"]}},
+        "dateRange": {
+            "type": ["object", "null"],
+            "properties": {"start": {"type": ["object", "null"], "properties": {}}},
+        },
+    },
+}
+
+
+def test_typed_schema_types_metrics_and_day() -> None:
+    """String metrics become numbers and `day` a date-time, in a copy."""
+    typed = typed_schema(SCHEMA)
+    assert typed["properties"]["costInUsd"] == {"type": ["number", "null"]}
+    assert typed["properties"]["day"]["format"] == "date-time"
+    assert typed["properties"]["impressions"] == SCHEMA["properties"]["impressions"]
+    assert SCHEMA["properties"]["costInUsd"] == {"type": ["string", "null"]}
+
+
+def test_arrow_schema_follows_json_schema() -> None:
+    """Each JSON schema type maps to one Arrow type."""
+    pa = pytest.importorskip("pyarrow")
+    schema = arrow_schema(typed_schema(SCHEMA))
+    assert schema.field("costInUsd").type == pa.decimal128(38, 18)
+    assert schema.field("impressions").type == pa.int64()
+    assert schema.field("day").type == pa.timestamp("us", tz="UTC")
+    assert schema.field("pivotValues").type == pa.list_(pa.string())
+    assert pa.types.is_struct(schema.field("dateRange").type)
+
+
+def test_long_decimals_are_rounded() -> None:
+    """Decimals beyond the column scale are rounded half to even, others kept."""
+    assert round_decimal(COST_FRACTION) is COST_FRACTION
+    assert round_decimal(Decimal("1.0000000000000000005")) == Decimal(1)
+    assert round_decimal(Decimal("1.0000000000000000015")) == Decimal(
+        "1.000000000000000002",
+    )
+    assert round_decimal(Decimal(10**19)) == Decimal(10**19)
+
+
+def _batches(tmp_path, encoding: dict) -> dict[str, list[str]]:  # noqa: ANN001
+    """Sync against the stand-in API, and return the batch files of each stream."""
+    with StubLinkedInAPI(accounts=1) as api:
+        tap = TapLinkedInAds(
+            config={
+                "access_token": "token",
+                "start_date": "2024-01-01T00:00:00Z",
+                "end_date": "2024-01-03T00:00:00Z",
+                "api_url": api.url,
+                "analytics_batch_config": {
+                    "encoding": encoding,
+                    "storage": {"root": tmp_path.as_uri()},
+                },
+            },
+            parse_env_config=False,
+        )
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            tap.sync_all()
+    files: dict[str, list[str]] = {}
+    for message in map(json.loads, out.getvalue().splitlines()):
+        if message["type"] == "RECORD":
+            assert not message["stream"].startswith("ad_analytics")
+        if message["type"] == "BATCH":
+            assert message["encoding"] == encoding
+            paths = [urlparse(url).path for url in message["manifest"]]
+            files.setdefault(message["stream"], []).extend(paths)
+    return files
+
+
+def test_jsonl_batches_hold_every_row(tmp_path) -> None:  # noqa: ANN001
+    """Analytics rows are written to JSONL batch files instead of records."""
+    files = _batches(tmp_path, {"format": "jsonl", "compression": "gzip"})
+    assert set(files) == {"ad_analytics_by_campaign", "ad_analytics_by_creative"}
+    rows = []
+    for path in files["ad_analytics_by_campaign"]:
+        with gzip.open(path, "rt") as file:
+            rows.extend(json.loads(line, parse_float=Decimal) for line in file)
+    # Two campaigns over three days
+    assert len(rows) == 6
+    assert all(row["costInUsd"] % 1 == COST_FRACTION for row in rows)
+
+
+def test_parquet_batches_are_typed(tmp_path) -> None:  # noqa: ANN001
+    """Every Parquet file has the column types of the stream schema."""
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    files = _batches(tmp_path, {"format": "parquet", "compression": "gzip"})
+    tables = [pq.read_table(path) for path in files["ad_analytics_by_creative"]]
+    assert sum(table.num_rows for table in tables) == 6
+    for table in tables:
+        assert table.schema == tables[0].schema
+        assert table.schema.field("costInUsd").type == pa.decimal128(38, 18)
+        assert table.schema.field("viralRegistrations").type == pa.int64()
+        assert table.schema.field("day").type == pa.timestamp("us", tz="UTC")
+    cost = tables[0].column("costInUsd")[0].as_py()
+    assert isinstance(cost, Decimal)
+    # Costs keep every decimal place of the API
+    assert cost % 1 == COST_FRACTION
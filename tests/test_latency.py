@@ -0,0 +1,198 @@
+"""Tests for adaptive timeouts and hedged requests."""
+
+from __future__ import annotations
+
+import threading
+import typing as t
+
+import pytest
+
+from tap_linkedin_ads import latency
+from tap_linkedin_ads.latency import MIN_SAMPLES, MIN_TIMEOUT, LatencyTracker
+from tap_linkedin_ads.scheduling import RequestBudget
+from tap_linkedin_ads.streams import base_stream
+from tap_linkedin_ads.tap import TapLinkedInAds
+from tests.stub_api import StubLinkedInAPI
+
+
+def test_timeout_follows_latency() -> None:
+    """Timeouts adapt to the endpoint latency once enough requests were seen."""
+    tracker = LatencyTracker()
+    assert tracker.timeout("/adAnalytics", 300) == 300
+
+    for _ in range(MIN_SAMPLES):
+        tracker.record("/adAnalytics", 20.0)
+    assert tracker.percentile("/adAnalytics", 0.95) == 20.0
+    assert tracker.timeout("/adAnalytics", 300) == 100.0
+
+    for _ in range(MIN_SAMPLES):
+        tracker.record("/adAccounts", 0.1)
+    assert tracker.timeout("/adAccounts", 300) == MIN_TIMEOUT
+
+
+@pytest.mark.parametrize(
+    ("config", "timeout"),
+    [({}, 300), ({"adaptive_timeouts": True}, MIN_TIMEOUT)],
+    ids=["default", "adaptive"],
+)
+def test_adaptive_timeouts_are_opt_in(
+    monkeypatch: pytest.MonkeyPatch,
+    config: dict,
+    timeout: float,
+) -> None:
+    """Requests wait the full timeout, unless adaptive timeouts are enabled."""
+    timeouts: list[float] = []
+    timed_send = base_stream.timed_send
+
+    def record_timeout(*args: t.Any, timeout: float, **kwargs: t.Any) -> t.Any:  # noqa: ANN401
+        timeouts.append(timeout)
+        return timed_send(*args, timeout=timeout, **kwargs)
+
+    monkeypatch.setattr(base_stream, "timed_send", record_timeout)
+    with StubLinkedInAPI(accounts=1) as api:
+        tap = TapLinkedInAds(
+            config={
+                "access_token": "token",
+                "start_date": "2024-01-01T00:00:00Z",
+                "api_url": api.url,
+                **config,
+            },
+            parse_env_config=False,
+        )
+        stream = tap.streams["accounts"]
+        for _ in range(MIN_SAMPLES):
+            tap.latency.record(stream.path, 0.01)
+        list(stream.request_records(None))
+    assert timeouts == [timeout]
+
+
+def test_hedge_returns_first_response() -> None:
+    """A slow call is hedged, and the faster backup wins."""
+    tracker = LatencyTracker()
+    release = threading.Event()
+
+    def slow() -> str:
+        release.wait(5)
+        return "primary"
+
+    assert tracker.hedge(slow, lambda: "backup", delay=0.01) == "backup"
+    release.set()
+    assert tracker.hedges == 1
+    assert tracker.hedge_wins == 1
+
+    assert tracker.hedge(lambda: "primary", lambda: "backup", delay=1) == "primary"
+    assert tracker.hedges == 1
+
+
+def test_hedges_in_flight_are_bounded() -> None:
+    """Once every hedge slot is held by a loser, calls run unhedged and inline."""
+    tracker = LatencyTracker(max_hedges=1)
+    release = threading.Event()
+
+    def slow() -> str:
+        release.wait(5)
+        return "primary"
+
+    assert tracker.hedge(slow, lambda: "backup", delay=0.01) == "backup"
+    threads: list[threading.Thread] = []
+
+    def current() -> str:
+        threads.append(threading.current_thread())
+        return "primary"
+
+    # The loser still holds the slot, but does not hold up the next call
+    assert tracker.hedge(current, lambda: "backup", delay=0) == "primary"
+    assert threads == [threading.current_thread()]
+    assert tracker.hedges == 1
+
+    # The slot is free again once the loser completed
+    release.set()
+    for thread in threading.enumerate():
+        if thread.name.startswith("hedge-"):
+            thread.join()
+    release = threading.Event()
+    assert tracker.hedge(slow, lambda: "backup", delay=0.01) == "backup"
+    release.set()
+    assert tracker.hedges == 2
+
+
+def test_hedge_slot_is_released_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A primary completing just as the backup starts releases the slot once."""
+    first = latency._Race.first  # noqa: SLF001
+    errors: list[BaseException] = []
+    monkeypatch.setattr(threading, "excepthook", lambda args: errors.append(args))
+
+    def first_after_primary(
+        race: latency._Race,
+        timeout: float | None = None,
+    ) -> latency._Outcome | None:
+        if timeout is None:
+            return first(race)
+        # Time out only once the primary call completed
+        for thread in threading.enumerate():
+            if thread.name == "hedge-primary":
+                thread.join()
+        return None
+
+    monkeypatch.setattr(latency._Race, "first", first_after_primary)  # noqa: SLF001
+    tracker = LatencyTracker(max_hedges=1)
+    release = threading.Event()
+
+    def backup() -> str:
+        release.wait(5)
+        return "backup"
+
+    assert tracker.hedge(lambda: "primary", backup, delay=0) == "primary"
+    threads: list[threading.Thread] = []
+
+    def current() -> str:
+        threads.append(threading.current_thread())
+        return "primary"
+
+    # The backup still holds the slot
+    assert tracker.hedge(current, backup, delay=0) == "primary"
+    assert threads == [threading.current_thread()]
+    release.set()
+    for thread in threading.enumerate():
+        if thread.name.startswith("hedge-"):
+            thread.join()
+    assert errors == []
+    assert tracker.hedges == 1
+
+
+def test_hedges_spend_the_request_budget() -> None:
+    """A hedge is a request like any other, and fails once the budget is spent."""
+    tracker = LatencyTracker()
+    budget = RequestBudget(1)
+    release = threading.Event()
+
+    def primary() -> str:
+        budget.spend()
+        release.wait(5)
+        return "primary"
+
+    def backup() -> str:
+        try:
+            budget.spend()
+        finally:
+            release.set()
+        return "backup"
+
+    result = tracker.hedge(primary, backup, delay=0.01)
+    assert result == "primary"
+    assert tracker.hedges == 1
+    assert tracker.hedge_wins == 0
+    assert budget.used == 1
+
+
+def test_mean_latency() -> None:
+    """Mean latencies are given per endpoint or across all endpoints."""
+    tracker = LatencyTracker()
+    assert tracker.mean() is None
+
+    tracker.record("/adAccounts", 1.0)
+    tracker.record("/adAccounts", 2.0)
+    tracker.record("/adAnalytics", 6.0)
+    assert tracker.mean("/adAccounts") == 1.5
+    assert tracker.mean("/adCampaigns") is None
+    assert tracker.mean() == 3.0
@@ -0,0 +1,73 @@
+"""Tests for the memory report of a run."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+from collections import Counter
+
+from tap_linkedin_ads.memory import MemoryProfiler
+from tap_linkedin_ads.tap import TapLinkedInAds
+from tests.stub_api import StubLinkedInAPI
+from tests.test_spill import _column_groups
+
+CONFIG = {
+    "access_token": "token",
+    "start_date": "2024-01-01T00:00:00Z",
+    "end_date": "2024-01-05T00:00:00Z",
+}
+
+
+def test_report_has_a_line_per_partition(tmp_path) -> None:  # noqa: ANN001
+    """Each partition is reported, then the peaks of each stream."""
+    path = tmp_path / "memory.jsonl"
+    with StubLinkedInAPI() as api:
+        tap = TapLinkedInAds(
+            config={
+                **CONFIG,
+                "api_url": api.url,
+                "memory_report_path": str(path),
+                "memory_top_allocations": 3,
+            },
+            parse_env_config=False,
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            tap.sync_all()
+
+    *partitions, summary = [json.loads(line) for line in path.read_text().splitlines()]
+    counts = Counter(entry["stream"] for entry in partitions)
+    assert counts["accounts"] == 1
+    assert counts["campaigns"] == 2
+    for entry in partitions:
+        assert entry["peak_traced_bytes"] >= entry["traced_bytes"] > 0
+        assert len(entry["top_allocations"]) == 3
+    # A parent partition peaks at least as high as its child partitions
+    accounts = next(entry for entry in partitions if entry["stream"] == "accounts")
+    assert accounts["peak_traced_bytes"] == max(
+        entry["peak_traced_bytes"] for entry in partitions
+    )
+    assert summary["summary"]["campaigns"]["partitions"] == 2
+    assert set(summary["summary"]) == set(counts)
+
+
+def test_merged_rows_stay_compact(tmp_path) -> None:  # noqa: ANN001
+    """Merging column groups holds about a compact row per day, not a dict."""
+    days = 2000
+    tap = TapLinkedInAds(config=CONFIG, parse_env_config=False)
+    stream = tap.streams["ad_analytics_by_campaign"]
+    column_groups = _column_groups(days)
+    # Build the row layout before measuring
+    list(stream.merge_column_groups(*_column_groups(2)))
+
+    profiler = MemoryProfiler(tmp_path / "memory.jsonl", top=0)
+    profiler.start()
+    try:
+        with profiler.measure() as usage:
+            rows = sum(1 for _ in stream.merge_column_groups(*column_groups))
+    finally:
+        profiler.close()
+
+    assert rows == days - 1
+    assert (usage.peak - usage.start) / days < 1500
+    assert usage.allocated < 64 * 1024
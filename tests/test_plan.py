@@ -0,0 +1,75 @@
+"""Tests for the dry-run plan of a sync."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+
+from click.testing import CliRunner
+
+from tap_linkedin_ads.tap import TapLinkedInAds
+from tests.stub_api import StubLinkedInAPI
+
+CONFIG = {
+    "access_token": "token",
+    "start_date": "2024-01-01T00:00:00Z",
+    "end_date": "2024-01-03T00:00:00Z",
+    "daily_request_quota": 100,
+}
+
+
+def test_plan_matches_the_sync() -> None:
+    """Parents are listed, children estimated, and the total is what a sync sends."""
+    with StubLinkedInAPI() as api:
+        tap = TapLinkedInAds(
+            config={**CONFIG, "api_url": api.url},
+            parse_env_config=False,
+        )
+        report = tap.plan()
+        listing = len(api.requests)
+        with contextlib.redirect_stdout(io.StringIO()):
+            TapLinkedInAds(
+                config={**CONFIG, "api_url": api.url},
+                parse_env_config=False,
+            ).sync_all()
+        synced = len(api.requests) - listing
+
+    plans = {
+        plan["stream"]: (plan["partitions"], plan["requests"], plan["listed"])
+        for plan in report["streams"]
+    }
+    # Two accounts of two campaigns, each with a creative, one entity per page
+    assert plans == {
+        "accounts": (1, 2, True),
+        "account_users": (2, 2, False),
+        "campaigns": (2, 4, True),
+        "campaign_groups": (2, 2, False),
+        "creatives": (2, 4, True),
+        "video_ads": (2, 2, False),
+        # One request per column group of each campaign or creative
+        "ad_analytics_by_campaign": (4, 16, False),
+        "ad_analytics_by_creative": (4, 16, False),
+    }
+    assert listing == 2 + 4 + 4
+    assert report["requests"] == synced == 48
+    assert report["quota_used"] == 0.48
+
+
+def test_plan_option_prints_the_report(tmp_path) -> None:  # noqa: ANN001
+    """`--plan` prints the report instead of syncing."""
+    config_path = tmp_path / "config.json"
+    with StubLinkedInAPI(accounts=1, campaigns_per_account=1) as api:
+        config_path.write_text(json.dumps({**CONFIG, "api_url": api.url}))
+        result = CliRunner().invoke(
+            TapLinkedInAds.cli,
+            ["--config", str(config_path), "--plan"],
+        )
+        paths = {request.split("?")[0] for request in api.requests}
+
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.stdout)
+    assert report["requests"] == sum(plan["requests"] for plan in report["streams"])
+    assert "ad_analytics_by_campaign" in {plan["stream"] for plan in report["streams"]}
+    # Only the parent streams were listed
+    assert "/rest/adAnalytics" not in paths
@@ -0,0 +1,119 @@
+"""Tests for background page prefetching."""
+
+from __future__ import annotations
+
+import threading
+import typing as t
+
+import pytest
+
+from tap_linkedin_ads.prefetch import FlowControl, prefetch
+
+
+def test_items_are_produced_ahead() -> None:
+    """Pages are produced in order, ahead of the consumer."""
+    produced = []
+    ahead = threading.Event()
+
+    def pages() -> list:
+        for page in range(3):
+            produced.append(page)
+            if page == 1:
+                ahead.set()
+            yield [page]
+
+    items = prefetch(pages(), depth=1)
+    assert next(items) == [0]
+    assert ahead.wait(5)
+    assert list(items) == [[1], [2]]
+    assert produced == [0, 1, 2]
+
+
+def test_errors_reach_the_consumer() -> None:
+    """Exceptions of the producer are raised while iterating."""
+
+    def pages() -> list:
+        yield [1]
+        msg = "boom"
+        raise RuntimeError(msg)
+
+    items = prefetch(pages(), depth=2)
+    assert next(items) == [1]
+    with pytest.raises(RuntimeError, match="boom"):
+        next(items)
+
+
+def test_closing_stops_the_producer() -> None:
+    """The producer stops requesting pages once the consumer is closed."""
+    stopped = threading.Event()
+
+    def pages() -> list:
+        try:
+            page = 0
+            while True:
+                yield [page]
+                page += 1
+        finally:
+            stopped.set()
+
+    items = prefetch(pages(), depth=1)
+    assert next(items) == [0]
+    items.close()
+    assert stopped.wait(5)
+
+
+class WatchedFlowControl(FlowControl):
+    """Flow control telling when a producer is held back by the limits."""
+
+    def __init__(self, max_pages: int | None, max_records: int | None) -> None:
+        """Initialize the limits."""
+        super().__init__(max_pages, max_records)
+        self.held_back = threading.Event()
+
+    def acquire(
+        self,
+        records: int,
+        idle: t.Callable[[], bool],
+        closed: threading.Event,
+    ) -> bool:
+        """Wait until a page can be held, setting `held_back` if it does not fit."""
+
+        def watched_idle() -> bool:
+            # Only asked once the page does not fit in the limits
+            self.held_back.set()
+            return idle()
+
+        return super().acquire(records, watched_idle, closed)
+
+
+def test_flow_control_limits_records_in_flight() -> None:
+    """Producers wait while the shared record limit is reached."""
+    flow = WatchedFlowControl(max_pages=None, max_records=3)
+    produced = []
+
+    def pages() -> list:
+        for page in range(4):
+            produced.append(page)
+            yield [page, page]
+
+    items = prefetch(pages(), depth=4, flow=flow)
+    assert next(items) == [0, 0]
+    # The second page is fetched, but waits as 2 + 2 records exceed the limit
+    assert flow.held_back.wait(5)
+    assert produced == [0, 1]
+    assert flow.records == 2
+
+    assert list(items) == [[1, 1], [2, 2], [3, 3]]
+    assert flow.pages == 0
+    assert flow.records == 0
+
+
+def test_flow_control_admits_one_page_per_prefetcher() -> None:
+    """A prefetcher holding no page is admitted even when the limits are reached."""
+    flow = FlowControl(max_pages=1, max_records=None)
+    outer = prefetch(iter([[1], [2]]), depth=1, flow=flow)
+    assert next(outer) == [1]
+    inner = prefetch(iter([[10], [20]]), depth=1, flow=flow)
+    assert list(inner) == [[10], [20]]
+    assert list(outer) == [[2]]
+    assert flow.pages == 0
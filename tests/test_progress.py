@@ -0,0 +1,56 @@
+"""Tests for progress and ETA reporting."""
+
+import json
+import logging
+
+import pytest
+
+from tap_linkedin_ads.progress import PROGRESS_METRIC, ProgressTracker
+
+
+def test_totals_are_extrapolated_until_parents_are_done(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Child totals count pending parent records and unstarted parent partitions."""
+    now = [0.0]
+    tracker = ProgressTracker(10, clock=lambda: now[0])
+
+    tracker.start("accounts", None)
+    accounts = tracker.fetch("accounts", [{"id": 1}, {"id": 2}])
+    next(accounts)
+    tracker.discover("campaigns", "accounts")
+    # One campaigns partition per account, the second one not processed yet
+    assert tracker.total("campaigns") == 2
+
+    tracker.start("campaigns", "accounts")
+    campaigns = tracker.fetch("campaigns", [{}] * 4)
+    next(campaigns)
+    tracker.discover("analytics", "campaigns")
+    tracker.start("analytics", "campaigns")
+    tracker.request("analytics")
+    tracker.finish("analytics")
+    # 1 done, 3 pending in this account, and as many in the other account
+    assert tracker.total("analytics") == 8
+    assert not tracker.is_final("analytics")
+
+    now[0] = 10
+    with caplog.at_level(logging.INFO):
+        tracker.record("analytics")
+    points = [
+        json.loads(record.message.removeprefix("METRIC: ")) for record in caplog.records
+    ]
+    assert {point["metric"] for point in points} == {PROGRESS_METRIC}
+    analytics, run = points[-2:]
+    assert analytics["tags"]["stream"] == "analytics"
+    assert analytics["value"] == 0.125
+    assert analytics["tags"]["eta_seconds"] == 70
+    assert run["tags"]["requests"] == 1
+
+    for _ in campaigns:
+        pass
+    tracker.finish("campaigns")
+    for _ in accounts:
+        pass
+    tracker.finish("accounts")
+    assert tracker.is_final("campaigns")
+    assert tracker.total("campaigns") == 1
@@ -0,0 +1,147 @@
+"""Syncs against the local stand-in API under each fault profile."""
+
+from __future__ import annotations
+
+import contextlib
+import datetime
+import email.utils
+import io
+import json
+import typing as t
+
+import pytest
+import requests
+from singer_sdk.exceptions import RetriableAPIError
+
+from tap_linkedin_ads.streams.base_stream import (
+    MAX_RETRY_AFTER_BACKOFFS,
+    LinkedInAdsStreamBase,
+    retry_after,
+)
+from tap_linkedin_ads.tap import TapLinkedInAds
+from tests.stub_api import PROFILES, StubLinkedInAPI
+
+if t.TYPE_CHECKING:
+    from backoff.types import Details
+
+CONFIG = {
+    "access_token": "token",
+    "start_date": "2024-01-01T00:00:00Z",
+    "end_date": "2024-01-05T00:00:00Z",
+    "retry_backoff_seconds": 0.01,
+}
+
+
+def run_tap(api: StubLinkedInAPI, **config: object) -> tuple[list, dict]:
+    """Sync every stream from the stand-in API.
+
+    Returns:
+        The records and the last state.
+    """
+    tap = TapLinkedInAds(
+        config={**CONFIG, "api_url": api.url, **config},
+        parse_env_config=False,
+    )
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        tap.sync_all()
+    messages = [json.loads(line) for line in out.getvalue().splitlines()]
+    records = sorted(
+        json.dumps([m["stream"], m["record"]], sort_keys=True)
+        for m in messages
+        if m["type"] == "RECORD"
+    )
+    states = [m["value"] for m in messages if m["type"] == "STATE"]
+    return records, states[-1]
+
+
+@pytest.fixture(scope="module")
+def baseline() -> tuple[list, dict, int]:
+    """Return the records, state and request count of a sync without faults."""
+    with StubLinkedInAPI() as api:
+        records, state = run_tap(api)
+    return records, state, len(api.requests)
+
+
+@pytest.fixture
+def retry_waits(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Return the waits before each retry, as they are made."""
+    waits: list[float] = []
+    handler = LinkedInAdsStreamBase.backoff_handler
+
+    def backoff_handler(self: LinkedInAdsStreamBase, details: Details) -> None:
+        waits.append(details["wait"])
+        handler(self, details)
+
+    monkeypatch.setattr(LinkedInAdsStreamBase, "backoff_handler", backoff_handler)
+    return waits
+
+
+@pytest.mark.parametrize(
+    ("profile", "config"),
+    [
+        ("slow", {}),
+        # Backing off for a minute is not needed, as Retry-After is obeyed
+        ("rate_limit_storm", {"retry_backoff_seconds": 60}),
+        ("server_error_bursts", {}),
+        ("truncated_pages", {}),
+    ],
+)
+def test_sync_survives_faults(
+    baseline: tuple[list, dict, int],
+    retry_waits: list[float],
+    profile: str,
+    config: dict,
+) -> None:
+    """Every fault is retried once, and the output matches a sync without faults."""
+    records, state, requests_sent = baseline
+    with StubLinkedInAPI(PROFILES[profile]) as api:
+        assert run_tap(api, **config) == (records, state)
+
+    assert api.unresolved == []
+    faults = len(api.requests) - api.responses["ok"]
+    assert api.responses["ok"] == requests_sent
+    assert len(retry_waits) == faults
+    if profile == "slow":
+        assert faults == 0
+    else:
+        assert faults > 0
+    if profile == "rate_limit_storm":
+        # The stand-in API asks to retry right away
+        assert set(retry_waits) == {0}
+
+
+def test_retry_after_is_capped() -> None:
+    """Waits asked by Retry-After are capped, others back off exponentially."""
+    tap = TapLinkedInAds(
+        config={**CONFIG, "retry_backoff_seconds": 2},
+        parse_env_config=False,
+    )
+    waits = tap.streams["accounts"].backoff_wait_generator()
+    next(waits)
+    response = requests.Response()
+    error = RetriableAPIError("Rate limited", response)
+    response.headers["Retry-After"] = "10"
+    assert waits.send(error) == 10
+    response.headers["Retry-After"] = "3600"
+    assert waits.send(error) == 2 * MAX_RETRY_AFTER_BACKOFFS
+    del response.headers["Retry-After"]
+    assert waits.send(error) == 2 * 2**2
+
+
+def test_retry_after_is_parsed() -> None:
+    """Retry-After is read from seconds or a date."""
+    response = requests.Response()
+    assert retry_after(None) is None
+    assert retry_after(response) is None
+
+    response.headers["Retry-After"] = "3"
+    assert retry_after(response) == 3
+    response.headers["Retry-After"] = "soon"
+    assert retry_after(response) is None
+
+    later = datetime.datetime.now(tz=datetime.timezone.utc) + datetime.timedelta(
+        seconds=30,
+    )
+    response.headers["Retry-After"] = email.utils.format_datetime(later)
+    assert 25 < retry_after(response) <= 30
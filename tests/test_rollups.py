@@ -0,0 +1,40 @@
+"""Tests for local rollups of analytics rows."""
+
+from tap_linkedin_ads.streams.ad_analytics.rows import PeriodTotals
+
+
+def _row(month: int, day: int, clicks: int, cost: str) -> dict:
+    date = {"year": 2024, "month": month, "day": day}
+    return {
+        "dateRange": {"start": date, "end": date},
+        "clicks": clicks,
+        "costInUsd": cost,
+    }
+
+
+def test_monthly_totals() -> None:
+    """Daily rows are summed per month, keeping string metrics as strings."""
+    totals = PeriodTotals("MONTHLY", {"clicks": False, "costInUsd": True})
+    for row in (_row(2, 3, 1, "0.5"), _row(1, 30, 2, "1.25"), _row(1, 31, 3, "2")):
+        totals.add(row)
+
+    january, february = totals.rows()
+    assert january["clicks"] == 5
+    assert january["costInUsd"] == "3.25"
+    assert january["dateRange"]["start"]["day"] == 30
+    assert january["dateRange"]["end"]["day"] == 31
+    assert january["day"].day == 1
+    assert february["clicks"] == 1
+
+
+def test_lifetime_totals() -> None:
+    """All rows are summed into a single record covering the whole range."""
+    totals = PeriodTotals("ALL", {"clicks": False})
+    for row in (_row(2, 3, 1, "0"), _row(1, 30, 2, "0")):
+        totals.add(row)
+
+    (lifetime,) = totals.rows()
+    assert lifetime["clicks"] == 3
+    assert "costInUsd" not in lifetime
+    assert lifetime["dateRange"]["start"] == {"year": 2024, "month": 1, "day": 30}
+    assert lifetime["dateRange"]["end"] == {"year": 2024, "month": 2, "day": 3}
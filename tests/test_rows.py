@@ -0,0 +1,65 @@
+"""Tests for the slot layout of merged analytics rows."""
+
+import pytest
+
+from tap_linkedin_ads.streams.ad_analytics.rows import RowLayout
+from tap_linkedin_ads.tap import TapLinkedInAds
+
+LAYOUT = RowLayout.from_schema(
+    {"properties": {"clicks": {}, "impressions": {}, "costInUsd": {}}},
+)
+
+
+def test_column_groups_fill_slots() -> None:
+    """Each group fills its own slots, and only columns set are emitted."""
+    row = LAYOUT.new_row()
+    row.update({"costInUsd": "1.5"})
+    row.update({"clicks": 3, "impressions": None})
+    # Later groups overwrite the columns they hold
+    row.update({"clicks": 4})
+    record = row.to_dict()
+    assert record == {"clicks": 4, "impressions": None, "costInUsd": "1.5"}
+    # Columns come out in schema order
+    assert list(record) == ["clicks", "impressions", "costInUsd"]
+    assert LAYOUT.new_row().to_dict() == {}
+
+
+def test_keys_outside_the_layout_are_kept() -> None:
+    """Columns missing from the schema are kept, after the schema columns."""
+    row = LAYOUT.new_row()
+    row.update({"newMetric": 1, "clicks": 2})
+    row.update({"newMetric": 3, "otherMetric": 4})
+    assert row.to_dict() == {"clicks": 2, "newMetric": 3, "otherMetric": 4}
+    assert list(row.to_dict()) == ["clicks", "newMetric", "otherMetric"]
+
+
+@pytest.mark.parametrize(
+    ("lengths", "merged"),
+    [
+        ((3, 3, 3), 3),
+        # Rows missing from a later group are dropped, even if the next is longer
+        ((3, 1, 3), 1),
+        # Extra rows of later groups are ignored
+        ((2, 3, 3), 2),
+        ((0, 3), 0),
+    ],
+)
+def test_groups_of_unequal_length_are_truncated(
+    lengths: tuple[int, ...],
+    merged: int,
+) -> None:
+    """Groups are matched by position, like `zip`, down to the shortest group."""
+    tap = TapLinkedInAds(
+        config={"access_token": "token", "start_date": "2024-01-01T00:00:00Z"},
+        parse_env_config=False,
+    )
+    stream = tap.streams["ad_analytics_by_campaign"]
+    groups = [
+        [{f"group{number}": position} for position in range(length)]
+        for number, length in enumerate(lengths)
+    ]
+    rows = list(stream.merge_column_groups(*groups))
+    assert rows == [
+        {f"group{number}": position for number in range(len(lengths))}
+        for position in range(merged)
+    ]
@@ -0,0 +1,122 @@
+"""Tests for the request budget and priority scheduling."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+from collections import Counter
+
+import pytest
+
+from tap_linkedin_ads.scheduling import (
+    BudgetExhaustedError,
+    RequestBudget,
+    Scheduler,
+)
+from tap_linkedin_ads.tap import TapLinkedInAds
+from tests.stub_api import StubLinkedInAPI
+
+
+class _Stream:
+    def __init__(self, name: str, priority: int, requests: int, synced: list) -> None:
+        self.name = name
+        self.priority = priority
+        self.requests = requests
+        self.synced = synced
+        self.budget: RequestBudget | None = None
+
+    def partition_priority(self, context: dict) -> tuple[int, int]:
+        return self.priority, int(context.get("status") == "ACTIVE")
+
+    def estimate_requests(self, context: dict) -> int:  # noqa: ARG002
+        return self.requests
+
+    def sync(self, context: dict) -> None:
+        for _ in range(self.requests):
+            self.budget.spend()
+        self.synced.append((self.name, context["id"]))
+
+
+def test_budget_is_enforced() -> None:
+    """Requests beyond the budget are refused."""
+    budget = RequestBudget(2)
+    budget.spend()
+    budget.spend()
+    assert budget.remaining == 0
+    with pytest.raises(BudgetExhaustedError):
+        budget.spend()
+
+
+def test_partitions_run_by_priority_until_budget_is_spent() -> None:
+    """Higher priority partitions run first, and the rest is deferred."""
+    budget = RequestBudget(9)
+    synced: list = []
+    analytics = _Stream("analytics", 3, 4, synced)
+    users = _Stream("users", 0, 1, synced)
+    for stream in (analytics, users):
+        stream.budget = budget
+    scheduler = Scheduler(budget, [(analytics, {"id": 3})])
+
+    scheduler.push(users, {"id": 1})
+    scheduler.push(analytics, {"id": 1})
+    scheduler.push(analytics, {"id": 2, "status": "ACTIVE"})
+    # Partitions deferred by the previous run are queued once, even if pushed again
+    scheduler.push(analytics, {"id": 3})
+    scheduler.run()
+
+    # Active first, then the partition deferred by the previous run
+    assert synced == [("analytics", 2), ("analytics", 3)]
+    assert [(s.name, c["id"]) for s, c in scheduler.deferred] == [
+        ("analytics", 1),
+        ("users", 1),
+    ]
+    assert budget.used == 8
+
+
+def run_tap(
+    api: StubLinkedInAPI,
+    budget: int,
+    state: dict | None = None,
+) -> tuple[Counter, dict]:
+    """Sync every stream under a request budget.
+
+    Returns:
+        The record count of each stream, and the last state.
+    """
+    tap = TapLinkedInAds(
+        config={
+            "access_token": "token",
+            "start_date": "2024-01-01T00:00:00Z",
+            "end_date": "2024-01-03T00:00:00Z",
+            "api_url": api.url,
+            "request_budget": budget,
+        },
+        state=state,
+        parse_env_config=False,
+    )
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        tap.sync_all()
+    messages = [json.loads(line) for line in out.getvalue().splitlines()]
+    records = Counter(m["stream"] for m in messages if m["type"] == "RECORD")
+    return records, [m["value"] for m in messages if m["type"] == "STATE"][-1]
+
+
+def test_deferred_partitions_run_without_their_parent() -> None:
+    """Deferred partitions run next time, even if their parent is not synced again."""
+    with StubLinkedInAPI() as api:
+        first, state = run_tap(api, 14)
+        assert state["bookmarks"]["campaigns"]["deferred"] == [
+            {"account_id": 2, "owner_urn": "urn:li:organization:2"},
+        ]
+        assert first["ad_analytics_by_campaign"] == 6
+        # No account is synced again, as none changed since the bookmark
+        state["bookmarks"]["accounts"]["replication_key_value"] = "2024-02-01"
+        second, state = run_tap(api, 100, state)
+
+    assert second["accounts"] == 0
+    # Campaigns of the second account, and then their analytics, over three days
+    assert second["campaigns"] == 2
+    assert second["ad_analytics_by_campaign"] == 6
+    assert all("deferred" not in bookmark for bookmark in state["bookmarks"].values())
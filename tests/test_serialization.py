@@ -0,0 +1,42 @@
+"""Tests for Singer message serialization."""
+
+import datetime
+import decimal
+
+import pytest
+from singer_sdk._singerlib import Message, RecordMessage, StateMessage
+from singer_sdk._singerlib.json import serialize_json
+
+from tap_linkedin_ads import serialization
+from tap_linkedin_ads.serialization import serialize_message
+
+
+def _messages() -> list[Message]:
+    return [
+        RecordMessage(
+            stream="ad_analytics_by_campaign",
+            record={
+                "day": datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+                "costInUsd": decimal.Decimal("1.50"),
+                "clicks": 3,
+                "campaign_id": None,
+            },
+            time_extracted=datetime.datetime.now(tz=datetime.timezone.utc),
+        ),
+        StateMessage(value={"bookmarks": {"accounts": {}}}),
+    ]
+
+
+def test_matches_sdk_encoder() -> None:
+    """The fast path writes the same JSON as the SDK encoder."""
+    for message in _messages():
+        assert serialize_message(message) == serialize_json(message.to_dict())
+
+
+def test_fallback_without_orjson(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without orjson, the SDK encoder writes the same lines as the fast path."""
+    pytest.importorskip("orjson")
+    messages = _messages()
+    fast = [serialize_message(message) for message in messages]
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert [serialize_message(message) for message in messages] == fast
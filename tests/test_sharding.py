@@ -0,0 +1,54 @@
+"""Tests for account sharding."""
+
+import pytest
+
+from tap_linkedin_ads.sharding import account_in_shard, merge_states
+
+
+def test_shards_are_disjoint_and_complete() -> None:
+    """Every account lands in exactly one shard."""
+    account_ids = range(1000, 1100)
+    shards = [
+        {
+            a
+            for a in account_ids
+            if account_in_shard(a, {"shard_index": i, "shard_count": 3})
+        }
+        for i in range(3)
+    ]
+    assert set.union(*shards) == set(account_ids)
+    assert sum(len(s) for s in shards) == len(account_ids)
+
+
+def test_explicit_account_ids() -> None:
+    """Only listed accounts are synced."""
+    config = {"account_ids": ["1", "2"]}
+    assert account_in_shard(1, config)
+    assert not account_in_shard(3, config)
+
+
+def test_invalid_shard_config() -> None:
+    """Inconsistent shard settings are rejected."""
+    with pytest.raises(ValueError, match="shard_count"):
+        account_in_shard(1, {"shard_index": 0})
+    with pytest.raises(ValueError, match="Invalid shard"):
+        account_in_shard(1, {"shard_index": 2, "shard_count": 2})
+
+
+def test_merge_states() -> None:
+    """Shard states are combined by partition context."""
+    first = {
+        "bookmarks": {
+            "accounts": {"replication_key_value": "2024-01-01T00:00:00+00:00"},
+            "campaigns": {"partitions": [{"context": {"account_id": 1}}]},
+        },
+    }
+    second = {
+        "bookmarks": {
+            "accounts": {"replication_key_value": "2024-02-01T00:00:00+00:00"},
+            "campaigns": {"partitions": [{"context": {"account_id": 2}}]},
+        },
+    }
+    merged = merge_states(first, second)["bookmarks"]
+    assert merged["accounts"]["replication_key_value"] == "2024-02-01T00:00:00+00:00"
+    assert len(merged["campaigns"]["partitions"]) == 2
@@ -0,0 +1,61 @@
+"""Tests for request coalescing."""
+
+import threading
+import time
+
+import pytest
+
+from tap_linkedin_ads.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_result() -> None:
+    """Callers of a key in flight wait for the first call instead of repeating it."""
+    group = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_call() -> str:
+        calls.append(1)
+        started.set()
+        release.wait()
+        return "response"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(group.do("a", slow_call)))
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=lambda: results.append(group.do("a", list)))
+    follower.start()
+    # Only release the first call once the follower waits for it
+    deadline = time.monotonic() + 5
+    while not group.shared and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert results == ["response", "response"]
+    assert len(calls) == 1
+    assert group.shared == 1
+
+
+def test_completed_calls_are_not_reused() -> None:
+    """Once a call completed, the next caller of its key runs it again."""
+    group = SingleFlight()
+    assert group.do("a", lambda: 1) == 1
+    assert group.do("a", lambda: 2) == 2
+    assert group.shared == 0
+
+
+def test_errors_are_not_kept() -> None:
+    """A failed call is retried by the next caller."""
+    group = SingleFlight()
+
+    def fail() -> None:
+        msg = "boom"
+        raise RuntimeError(msg)
+
+    with pytest.raises(RuntimeError):
+        group.do("a", fail)
+    assert group.do("a", lambda: "ok") == "ok"
@@ -0,0 +1,147 @@
+"""Tests for the snapshot store of emitted records."""
+
+import contextlib
+import gzip
+import io
+import json
+from pathlib import Path
+from urllib.parse import urlparse
+
+import pytest
+
+from tap_linkedin_ads.snapshots import SnapshotStore, content_hash
+from tap_linkedin_ads.streams.streams import CreativesStream
+from tap_linkedin_ads.tap import TapLinkedInAds
+from tests.stub_api import StubLinkedInAPI
+
+
+def test_only_changed_records_are_reported(tmp_path) -> None:  # noqa: ANN001
+    """A record is changed when new, or when its content hash differs."""
+    path = tmp_path / "snapshots.db"
+    store = SnapshotStore(path)
+    assert store.changed("campaigns", [1], content_hash({"status": "ACTIVE"}))
+    assert not store.changed("campaigns", [1], content_hash({"status": "ACTIVE"}))
+    assert store.changed("creatives", [1], content_hash({"status": "ACTIVE"}))
+    store.close()
+
+    # Hashes persist across runs
+    store = SnapshotStore(path)
+    assert not store.changed("campaigns", [1], content_hash({"status": "ACTIVE"}))
+    assert store.changed("campaigns", [1], content_hash({"status": "PAUSED"}))
+    assert store.unchanged == {"campaigns": 1}
+    store.close()
+
+
+def test_content_hash_ignores_key_order() -> None:
+    """Equal records hash equally, whatever the order of their fields."""
+    assert content_hash({"a": 1, "b": [2]}) == content_hash({"b": [2], "a": 1})
+    assert content_hash({"a": 1}) != content_hash({"a": "1"})
+
+
+def test_hashes_of_a_failed_run_are_discarded(tmp_path) -> None:  # noqa: ANN001
+    """Records of a sync that failed partway are emitted again by the next one."""
+    config = {
+        "access_token": "token",
+        "start_date": "2024-01-01T00:00:00Z",
+        "end_date": "2024-01-02T00:00:00Z",
+        "snapshot_store_path": str(tmp_path / "snapshots.db"),
+    }
+
+    def sync(api: StubLinkedInAPI, out: io.StringIO) -> list[int]:
+        tap = TapLinkedInAds(
+            config={**config, "api_url": api.url},
+            parse_env_config=False,
+        )
+        with contextlib.redirect_stdout(out):
+            tap.sync_all()
+        return campaign_ids(out)
+
+    def campaign_ids(out: io.StringIO) -> list[int]:
+        messages = [json.loads(line) for line in out.getvalue().splitlines()]
+        return sorted(
+            message["record"]["id"]
+            for message in messages
+            if message["type"] == "RECORD" and message["stream"] == "campaigns"
+        )
+
+    def fail(*_: object) -> None:
+        msg = "Connection lost"
+        raise RuntimeError(msg)
+
+    with StubLinkedInAPI(accounts=1) as api:
+        out = io.StringIO()
+        with pytest.MonkeyPatch.context() as patch:
+            # Creatives sync after campaigns
+            patch.setattr(CreativesStream, "get_records", fail)
+            with pytest.raises(RuntimeError, match="Connection lost"):
+                sync(api, out)
+        assert campaign_ids(out) == [100, 101]
+        assert sync(api, io.StringIO()) == [100, 101]
+        assert sync(api, io.StringIO()) == []
+
+
+def _analytics_rows(config: dict, api: StubLinkedInAPI) -> dict[str, list[dict]]:
+    """Sync, and return the analytics rows of each stream, records or batches."""
+    tap = TapLinkedInAds(config={**config, "api_url": api.url}, parse_env_config=False)
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        tap.sync_all()
+    rows: dict[str, list[dict]] = {
+        "ad_analytics_by_campaign": [],
+        "ad_analytics_by_creative": [],
+    }
+    for message in map(json.loads, out.getvalue().splitlines()):
+        if message.get("stream") not in rows:
+            continue
+        if message["type"] == "RECORD":
+            rows[message["stream"]].append(message["record"])
+        elif message["type"] == "BATCH":
+            for url in message["manifest"]:
+                # Batch files are gzipped whatever the compression
+                with gzip.open(Path(urlparse(url).path), "rt") as file:
+                    rows[message["stream"]].extend(map(json.loads, file))
+    return rows
+
+
+@pytest.mark.parametrize("batch", [False, True], ids=["records", "batches"])
+def test_unchanged_analytics_rows_are_skipped(tmp_path, batch: bool) -> None:  # noqa: ANN001, FBT001
+    """Analytics rows are keyed by entity and day, and skipped when unchanged."""
+    config = {
+        "access_token": "token",
+        "start_date": "2024-01-01T00:00:00Z",
+        "end_date": "2024-01-03T00:00:00Z",
+        "snapshot_store_path": str(tmp_path / "snapshots.db"),
+        "analytics_change_detection": True,
+    }
+    if batch:
+        config["analytics_batch_config"] = {
+            "encoding": {"format": "jsonl", "compression": "none"},
+            "storage": {"root": (tmp_path / "batches").as_uri()},
+        }
+    with StubLinkedInAPI(accounts=1) as api:
+        first = _analytics_rows(config, api)
+        second = _analytics_rows(config, api)
+
+    for stream_name, key in (
+        ("ad_analytics_by_campaign", "campaign_id"),
+        ("ad_analytics_by_creative", "creative_id"),
+    ):
+        keys = {(row[key], row["day"]) for row in first[stream_name]}
+        # Two entities over three days
+        assert len(keys) == len(first[stream_name]) == 6
+        assert second[stream_name] == []
+
+
+def test_analytics_change_detection_is_opt_in(tmp_path) -> None:  # noqa: ANN001
+    """Without `analytics_change_detection`, every analytics row is emitted."""
+    config = {
+        "access_token": "token",
+        "start_date": "2024-01-01T00:00:00Z",
+        "end_date": "2024-01-03T00:00:00Z",
+        "snapshot_store_path": str(tmp_path / "snapshots.db"),
+    }
+    with StubLinkedInAPI(accounts=1) as api:
+        first = _analytics_rows(config, api)
+        second = _analytics_rows(config, api)
+    assert second == first
+    assert len(second["ad_analytics_by_campaign"]) == 6
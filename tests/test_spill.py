@@ -0,0 +1,93 @@
+"""Tests for merging analytics column groups on disk."""
+
+import datetime
+
+from tap_linkedin_ads.tap import TapLinkedInAds
+
+CONFIG = {
+    "access_token": "token",
+    "start_date": "2024-01-01T00:00:00Z",
+    "end_date": "2024-01-31T00:00:00Z",
+}
+
+
+def _column_groups(days: int) -> tuple:
+    dates = [{"year": 2024, "month": 1, "day": day} for day in range(1, days + 1)]
+    first = [{"dateRange": {"start": date, "end": date}} for date in dates]
+    second = [{"clicks": day} for day in range(1, days + 1)]
+    # The last row is missing from the third group, so it is dropped
+    third = [{"impressions": day * 10} for day in range(1, days)]
+    return first, second, third
+
+
+def _merge(config: dict, days: int) -> list:
+    tap = TapLinkedInAds(config=config, parse_env_config=False)
+    stream = tap.streams["ad_analytics_by_campaign"]
+    return list(stream.merge_column_groups(*_column_groups(days)))
+
+
+def test_spilled_merge_matches_memory_merge(tmp_path) -> None:  # noqa: ANN001
+    """Rows merged on disk equal the rows merged in memory."""
+    in_memory = _merge(CONFIG, 30)
+    spilled = _merge(
+        {
+            **CONFIG,
+            "analytics_merge_memory_mb": 0.001,
+            "analytics_spill_dir": str(tmp_path),
+        },
+        30,
+    )
+    assert spilled == in_memory
+    assert len(spilled) == 29
+    assert spilled[0] == {
+        "dateRange": {
+            "start": {"year": 2024, "month": 1, "day": 1},
+            "end": {"year": 2024, "month": 1, "day": 1},
+        },
+        "clicks": 1,
+        "impressions": 10,
+    }
+    # The temporary database is removed once the rows were read
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spilled_rows_keep_the_api_order(tmp_path) -> None:  # noqa: ANN001
+    """Rows out of date order come back in the same sequence from both paths."""
+    # Several rows per day, with the days out of order
+    days = [3, 1, 2, 1, 3, 2, 1]
+    first = [
+        {"dateRange": {"start": {"year": 2024, "month": 1, "day": day}}} for day in days
+    ]
+    second = [{"clicks": position} for position in range(len(days))]
+
+    def merge(config: dict) -> list:
+        tap = TapLinkedInAds(config=config, parse_env_config=False)
+        stream = tap.streams["ad_analytics_by_campaign"]
+        return list(stream.merge_column_groups(first, second))
+
+    in_memory = merge(CONFIG)
+    spilled = merge(
+        {
+            **CONFIG,
+            "analytics_merge_memory_mb": 0.000001,
+            "analytics_spill_dir": str(tmp_path),
+        },
+    )
+    assert spilled == in_memory
+    assert [row["clicks"] for row in spilled] == list(range(len(days)))
+
+
+def test_dates_survive_spilling(tmp_path) -> None:  # noqa: ANN001
+    """Values which are not JSON types are kept as is."""
+    day = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    tap = TapLinkedInAds(
+        config={
+            **CONFIG,
+            "analytics_merge_memory_mb": 0.000001,
+            "analytics_spill_dir": str(tmp_path),
+        },
+        parse_env_config=False,
+    )
+    stream = tap.streams["ad_analytics_by_campaign"]
+    rows = list(stream.merge_column_groups([{"day": day}, {"day": day}], [{}, {}]))
+    assert rows == [{"day": day}, {"day": day}]
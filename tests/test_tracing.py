@@ -0,0 +1,70 @@
+"""Tests for the trace spans of a run."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+from collections import Counter
+
+from tap_linkedin_ads.tap import TapLinkedInAds
+from tests.stub_api import PROFILES, StubLinkedInAPI
+
+
+def test_spans_nest_from_run_to_request(tmp_path) -> None:  # noqa: ANN001
+    """Requests nest in pages, partitions, streams and the run, with retries."""
+    path = tmp_path / "trace.jsonl"
+    with StubLinkedInAPI(PROFILES["server_error_bursts"]) as api:
+        tap = TapLinkedInAds(
+            config={
+                "access_token": "token",
+                "start_date": "2024-01-01T00:00:00Z",
+                "end_date": "2024-01-05T00:00:00Z",
+                "api_url": api.url,
+                "retry_backoff_seconds": 0.01,
+                "trace_path": str(path),
+            },
+            parse_env_config=False,
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            tap.sync_all()
+
+    spans = [
+        span
+        for line in path.read_text().splitlines()
+        for resource in json.loads(line)["resourceSpans"]
+        for scope in resource["scopeSpans"]
+        for span in scope["spans"]
+    ]
+    by_id = {span["spanId"]: span for span in spans}
+    attributes = {
+        span["spanId"]: {
+            a["key"]: next(iter(a["value"].values())) for a in span["attributes"]
+        }
+        for span in spans
+    }
+
+    def ancestors(span: dict) -> list[str]:
+        names = []
+        while "parentSpanId" in span:
+            span = by_id[span["parentSpanId"]]
+            names.append(span["name"])
+        return names
+
+    requests = [span for span in spans if span["name"] == "GET"]
+    assert len(requests) == sum(api.responses.values())
+    for span in requests:
+        page, partition, stream, run = ancestors(span)
+        assert (page, partition, run) == ("page", f"{stream} partition", "sync")
+    assert [span["name"] for span in spans if "parentSpanId" not in span] == ["sync"]
+
+    failed = Counter(span["status"].get("code") for span in requests)
+    assert failed[2] == api.responses["5xx"]
+    retries = sum(int(a.get("retries", 0)) for a in attributes.values())
+    assert retries == api.responses["5xx"]
+    partitions = [
+        attributes[span["spanId"]]
+        for span in spans
+        if span["name"] == "ad_analytics_by_creative partition"
+    ]
+    assert all("creative_id" in partition for partition in partitions)
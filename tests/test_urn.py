@@ -0,0 +1,68 @@
+"""Tests for URN parsing."""
+
+import contextlib
+import io
+import json
+
+from tap_linkedin_ads.tap import TapLinkedInAds
+from tap_linkedin_ads.urn import intern_urn, make_urn, parse_urn, urn_id
+from tests.stub_api import StubLinkedInAPI
+
+
+def test_parse_urn() -> None:
+    """URNs are split into their namespace, type and ID."""
+    parsed = parse_urn("urn:li:sponsoredCampaignGroup:123")
+    assert parsed is not None
+    assert parsed.entity_type == "sponsoredCampaignGroup"
+    assert parsed.id == "123"
+    assert parse_urn("not-a-urn") is None
+
+
+def test_urn_id_checks_entity_type() -> None:
+    """IDs are only returned for the requested entity type."""
+    assert urn_id("urn:li:organization:5", "organization") == "5"
+    assert urn_id("urn:li:person:abc", "organization") is None
+
+
+def test_repeated_urns_share_one_string() -> None:
+    """Equal URN strings are interned to the same object."""
+    account_id = 42
+    first = intern_urn(f"urn:li:sponsoredAccount:{account_id}")
+    second = intern_urn(f"urn:li:sponsoredAccount:{account_id}")
+    assert first is second
+    assert make_urn("sponsoredAccount", account_id) is first
+
+
+def test_id_fields_are_filled_from_urns() -> None:
+    """Numeric IDs are cast to integers, other IDs are kept as strings."""
+    with StubLinkedInAPI(accounts=1) as api:
+        tap = TapLinkedInAds(
+            config={
+                "access_token": "token",
+                "start_date": "2024-01-01T00:00:00Z",
+                "end_date": "2024-01-02T00:00:00Z",
+                "api_url": api.url,
+            },
+            parse_env_config=False,
+        )
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            tap.sync_all()
+
+    campaigns = sorted(
+        (
+            message["record"]
+            for message in map(json.loads, out.getvalue().splitlines())
+            if message["type"] == "RECORD" and message["stream"] == "campaigns"
+        ),
+        key=lambda record: record["id"],
+    )
+    assert len(campaigns) == 2
+    for campaign in campaigns:
+        assert campaign["account_id"] == 1
+        assert campaign["campaign_group_id"] == 1
+    by_person, by_organization = campaigns
+    assert by_organization["associated_entity_organization_id"] == 1
+    assert "associated_entity_person_id" not in by_organization
+    assert by_person["associated_entity_person_id"] == "Person100"
+    assert "associated_entity_organization_id" not in by_person
@@ -0,0 +1,35 @@
+"""Tests for analytics date windows and synced ranges."""
+
+from datetime import date
+
+from tap_linkedin_ads.streams.ad_analytics.windows import (
+    add_range,
+    date_windows,
+    is_covered,
+    parse_ranges,
+)
+
+
+def test_windows_are_newest_first() -> None:
+    """The date range is split from its end, the oldest window being shorter."""
+    windows = date_windows(date(2024, 1, 1), date(2024, 1, 10), 4)
+    assert windows == [
+        (date(2024, 1, 7), date(2024, 1, 10)),
+        (date(2024, 1, 3), date(2024, 1, 6)),
+        (date(2024, 1, 1), date(2024, 1, 2)),
+    ]
+    assert date_windows(date(2024, 1, 1), date(2024, 1, 10), None) == [
+        (date(2024, 1, 1), date(2024, 1, 10)),
+    ]
+
+
+def test_synced_ranges_track_gaps() -> None:
+    """Adjacent windows merge, and a missing window leaves a gap."""
+    ranges = parse_ranges([["2024-01-07", "2024-01-10"]])
+    ranges = add_range(ranges, (date(2024, 1, 1), date(2024, 1, 2)))
+    assert len(ranges) == 2
+    assert not is_covered(ranges, (date(2024, 1, 3), date(2024, 1, 6)))
+
+    ranges = add_range(ranges, (date(2024, 1, 3), date(2024, 1, 6)))
+    assert ranges == [(date(2024, 1, 1), date(2024, 1, 10))]
+    assert is_covered(ranges, (date(2024, 1, 3), date(2024, 1, 6)))